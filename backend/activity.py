@@ -0,0 +1,100 @@
+from typing import Any, Dict, Optional, Tuple
+
+# Comentarios y adjuntos de tickets. Cada alta o baja mueve el contador
+# desnormalizado del ticket (comments_count / attachments_count) en la misma
+# transacción. El UPDATE del ticket va primero: verifica permisos, bloquea la
+# fila (las escrituras concurrentes sobre el mismo ticket se ordenan) y fija
+# un único orden de bloqueo Tickets -> Comments/Attachments.
+# Son funciones `func(cursor, ...)` para AsyncDatabase.transaction.
+
+COUNTERS = {"Comments": "comments_count", "Attachments": "attachments_count"}
+AUTHOR_COLUMNS = {"Comments": "user_id", "Attachments": "uploaded_by"}
+
+COUNTER_UPDATE = """
+    UPDATE t SET {counter} = t.{counter} {op} 1
+    OUTPUT INSERTED.id, INSERTED.user_id, INSERTED.{counter},
+           CONVERT(VARCHAR(18), INSERTED.row_version, 1) as version
+    FROM Tickets t
+    WHERE {where}
+"""
+
+INSERT_COMMENT = """
+    INSERT INTO Comments (ticket_id, user_id, comment)
+    OUTPUT INSERTED.id, INSERTED.ticket_id, INSERTED.user_id, INSERTED.comment, INSERTED.created_at
+    VALUES (?, ?, ?)
+"""
+
+INSERT_ATTACHMENT = """
+    INSERT INTO Attachments (ticket_id, filename, file_url, file_size, uploaded_by, sha256, content_type)
+    OUTPUT INSERTED.id, INSERTED.uploaded_at
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _fetch_row(cursor) -> Optional[Dict[str, Any]]:
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+
+def _bump(cursor, table: str, op: str, where: str, params: tuple) -> Optional[Dict[str, Any]]:
+    cursor.execute(COUNTER_UPDATE.format(counter=COUNTERS[table], op=op, where=where), params)
+    return _fetch_row(cursor)
+
+
+def _add(cursor, table: str, ticket_id: int, owner_id: Optional[int], insert: str, params: tuple):
+    where = "t.id = ?"
+    ticket_params = (ticket_id,)
+    if owner_id is not None:
+        where += " AND t.user_id = ?"
+        ticket_params += (owner_id,)
+    ticket = _bump(cursor, table, "+", where, ticket_params)
+    if ticket is None:
+        return None
+    cursor.execute(insert, params)
+    return ticket, _fetch_row(cursor)
+
+
+def _delete(cursor, table: str, ticket_id: int, item_id: int, author_id: Optional[int]) -> Optional[Dict[str, Any]]:
+    exists = f"SELECT 1 FROM {table} x WHERE x.id = ? AND x.ticket_id = t.id"
+    params = (ticket_id, item_id)
+    if author_id is not None:
+        exists += f" AND x.{AUTHOR_COLUMNS[table]} = ?"
+        params += (author_id,)
+    ticket = _bump(cursor, table, "-", f"t.id = ? AND EXISTS ({exists})", params)
+    if ticket is not None:
+        cursor.execute(f"DELETE FROM {table} WHERE id = ?", (item_id,))
+    return ticket
+
+
+def add_comment(
+    cursor, ticket_id: int, user_id: int, comment: str, owner_id: Optional[int] = None
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Agregar un comentario; (ticket, comentario) o None si el ticket no existe / no es de `owner_id`"""
+    return _add(cursor, "Comments", ticket_id, owner_id, INSERT_COMMENT, (ticket_id, user_id, comment))
+
+
+def delete_comment(
+    cursor, ticket_id: int, comment_id: int, author_id: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Eliminar un comentario del ticket (solo de `author_id` si se indica); el ticket o None"""
+    return _delete(cursor, "Comments", ticket_id, comment_id, author_id)
+
+
+def add_attachment(
+    cursor, ticket_id: int, filename: str, file_url: str, file_size: int, uploaded_by: int,
+    sha256: Optional[str], content_type: Optional[str], owner_id: Optional[int] = None
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Registrar un adjunto; (ticket, adjunto) o None si el ticket no existe / no es de `owner_id`"""
+    return _add(
+        cursor, "Attachments", ticket_id, owner_id, INSERT_ATTACHMENT,
+        (ticket_id, filename, file_url, file_size, uploaded_by, sha256, content_type),
+    )
+
+
+def delete_attachment(
+    cursor, ticket_id: int, attachment_id: int, uploader_id: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """Eliminar el registro de un adjunto (el archivo queda: puede estar deduplicado); el ticket o None"""
+    return _delete(cursor, "Attachments", ticket_id, attachment_id, uploader_id)
@@ -0,0 +1,251 @@
+import asyncio
+import heapq
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import pyodbc
+
+from bulk import drop_tables, stage_rows
+from database import AsyncDatabase
+
+# Carga que aporta un ticket pendiente a su técnico según la prioridad
+PRIORITY_WEIGHTS = {"baja": 1, "media": 2, "alta": 4, "urgente": 8}
+OPEN_STATUSES = ("abierto", "en_proceso")
+
+TECHNICIANS_QUERY = "SELECT id, username FROM Users WHERE role = 'tecnico'"
+# Sale entero de idx_tickets_queue (assigned_to, status + INCLUDE priority)
+OPEN_ASSIGNED_QUERY = """
+    SELECT id, assigned_to, priority
+    FROM Tickets
+    WHERE assigned_to IS NOT NULL AND status IN ('abierto', 'en_proceso')
+"""
+
+# Backlog a repartir: primero lo urgente y, dentro de cada prioridad, lo más
+# antiguo. UPDLOCK + READPAST: dos drenajes simultáneos no toman los mismos tickets.
+BACKLOG_QUERY = """
+    SELECT TOP (?) id, priority
+    FROM Tickets WITH (UPDLOCK, READPAST, ROWLOCK)
+    WHERE assigned_to IS NULL AND status IN ('abierto', 'en_proceso')
+    ORDER BY CASE priority WHEN 'urgente' THEN 0 WHEN 'alta' THEN 1 WHEN 'media' THEN 2 ELSE 3 END,
+             created_at, id
+"""
+ASSIGNMENTS_TABLE = "#assignments"
+
+
+def weight(priority: Optional[str]) -> int:
+    return PRIORITY_WEIGHTS.get(priority, PRIORITY_WEIGHTS["media"])
+
+
+class AssignmentEngine:
+    """Cola de prioridad de técnicos por carga pendiente (ponderada por prioridad)
+
+    La carga de cada técnico es la suma de los pesos de sus tickets abiertos
+    o en proceso. Un heap de (carga, id) entrega el menos cargado en
+    O(log n); las entradas viejas se descartan al llegar a la cima (borrado
+    perezoso) en lugar de buscarlas dentro del heap.
+
+    Se reconstruye desde la base al iniciar (y cada `resync_interval`
+    segundos, para absorber escrituras de otros procesos) y los handlers de
+    escritura lo mantienen al día con `track` / `forget`.
+    """
+
+    def __init__(self, resync_interval: float = 60.0):
+        self.resync_interval = resync_interval
+        self._lock = threading.Lock()
+        self._load: Dict[int, int] = {}
+        self._names: Dict[int, str] = {}
+        # Tickets pendientes asignados a un técnico: id -> (técnico, peso)
+        self._tickets: Dict[int, Tuple[int, int]] = {}
+        self._heap: List[Tuple[int, int]] = []
+        self._task: Optional[asyncio.Task] = None
+        self.rebuilds = 0
+
+    # ---------- estado interno (con el lock tomado) ----------
+
+    def _push(self, technician_id: int):
+        heapq.heappush(self._heap, (self._load[technician_id], technician_id))
+        # Demasiadas entradas obsoletas: rehacer el heap en O(n)
+        if len(self._heap) > 2 * len(self._load) + 64:
+            self._heap = [(load, tid) for tid, load in self._load.items()]
+            heapq.heapify(self._heap)
+
+    def _charge(self, technician_id: int, delta: int):
+        if technician_id in self._load:
+            self._load[technician_id] += delta
+            self._push(technician_id)
+
+    def _least_loaded(self) -> Optional[int]:
+        while self._heap:
+            load, technician_id = self._heap[0]
+            if self._load.get(technician_id) == load:
+                return technician_id
+            heapq.heappop(self._heap)
+        return None
+
+    # ---------- API ----------
+
+    def rebuild(self, technicians: Iterable[Dict[str, Any]], tickets: Iterable[Dict[str, Any]]):
+        """Reemplazar el estado con técnicos (id, username) y tickets pendientes (id, assigned_to, priority)"""
+        names = {row["id"]: row["username"] for row in technicians}
+        load = dict.fromkeys(names, 0)
+        assigned = {}
+        for row in tickets:
+            if row["assigned_to"] in load:
+                assigned[row["id"]] = (row["assigned_to"], weight(row["priority"]))
+                load[row["assigned_to"]] += assigned[row["id"]][1]
+        heap = [(value, tid) for tid, value in load.items()]
+        heapq.heapify(heap)
+        with self._lock:
+            self._names, self._load, self._tickets, self._heap = names, load, assigned, heap
+            self.rebuilds += 1
+
+    async def load(self, adb: AsyncDatabase):
+        """Reconstruir desde la base (dos lecturas cubiertas por índices)"""
+        technicians = await adb.fetch_all(TECHNICIANS_QUERY)
+        tickets = await adb.fetch_all(OPEN_ASSIGNED_QUERY)
+        self.rebuild(technicians, tickets)
+
+    def start(self, adb: AsyncDatabase):
+        """Resincronizar periódicamente (llamar dentro del event loop)"""
+        if self._task is None and self.resync_interval > 0:
+            self._task = asyncio.create_task(self._resync(adb))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _resync(self, adb: AsyncDatabase):
+        while True:
+            await asyncio.sleep(self.resync_interval)
+            try:
+                await self.load(adb)
+            except Exception as e:
+                print(f"⚠️  No se pudo resincronizar la asignación automática: {e}")
+
+    def add_technician(self, technician_id: int, username: str):
+        with self._lock:
+            if technician_id not in self._load:
+                self._names[technician_id] = username
+                self._load[technician_id] = 0
+                self._push(technician_id)
+
+    def name(self, technician_id: int) -> Optional[str]:
+        return self._names.get(technician_id)
+
+    def reserve(self, priority: str) -> Optional[int]:
+        """Elegir el técnico menos cargado y cargarle el ticket; None si no hay técnicos
+
+        La carga se toma antes de escribir el ticket para que peticiones
+        concurrentes no elijan todas al mismo técnico; `release` la devuelve.
+        """
+        with self._lock:
+            technician_id = self._least_loaded()
+            if technician_id is not None:
+                self._charge(technician_id, weight(priority))
+            return technician_id
+
+    def reserve_many(self, priorities: Sequence[str]) -> List[Optional[int]]:
+        """`reserve` para varios tickets a la vez (un lote): técnico por ticket, en orden
+
+        Cada reserva carga al elegido antes de la siguiente, así un lote se
+        reparte entre técnicos en lugar de caer entero en el menos cargado.
+        """
+        with self._lock:
+            technicians = []
+            for priority in priorities:
+                technician_id = self._least_loaded()
+                if technician_id is not None:
+                    self._charge(technician_id, weight(priority))
+                technicians.append(technician_id)
+            return technicians
+
+    def release(self, technician_id: int, priority: str):
+        """Devolver una carga tomada con `reserve`"""
+        with self._lock:
+            self._charge(technician_id, -weight(priority))
+
+    def plan(self, tickets: Sequence[Tuple[int, str]]) -> List[Tuple[int, int]]:
+        """Repartir tickets (id, priority) en orden: [(id, técnico)]
+
+        Trabaja sobre una copia de las cargas (O(t + k log t)); el estado
+        real se actualiza con `track` cuando las asignaciones se confirman.
+        """
+        with self._lock:
+            heap = [(load, tid) for tid, load in self._load.items()]
+        if not heap:
+            return []
+        heapq.heapify(heap)
+        assignments = []
+        for ticket_id, priority in tickets:
+            load, technician_id = heap[0]
+            heapq.heapreplace(heap, (load + weight(priority), technician_id))
+            assignments.append((ticket_id, technician_id))
+        return assignments
+
+    def track(self, ticket: Dict[str, Any]):
+        """Aplicar el estado nuevo de un ticket escrito (id, assigned_to, status, priority)"""
+        with self._lock:
+            current = None
+            if ticket.get("assigned_to") in self._load and ticket.get("status") in OPEN_STATUSES:
+                current = (ticket["assigned_to"], weight(ticket.get("priority")))
+            previous = self._tickets.pop(ticket["id"], None)
+            if current is not None:
+                self._tickets[ticket["id"]] = current
+            if previous == current:
+                return
+            if previous is not None:
+                self._charge(previous[0], -previous[1])
+            if current is not None:
+                self._charge(*current)
+
+    def forget(self, ticket_id: int):
+        """Quitar un ticket eliminado"""
+        with self._lock:
+            previous = self._tickets.pop(ticket_id, None)
+            if previous is not None:
+                self._charge(previous[0], -previous[1])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "technicians": len(self._load),
+                "tracked_tickets": len(self._tickets),
+                "rebuilds": self.rebuilds,
+            }
+
+
+def drain_backlog(cursor, plan: Callable[[Sequence[Tuple[int, str]]], List[Tuple[int, int]]], limit: int) -> List[Dict[str, Any]]:
+    """Asignar hasta `limit` tickets sin técnico en una transacción
+
+    Lee el backlog con bloqueo de actualización, lo reparte con `plan` y
+    aplica todas las asignaciones en un único UPDATE desde una tabla
+    temporal. Retorna las filas asignadas (id, user_id, assigned_to,
+    status, priority, version).
+    """
+    cursor.execute(BACKLOG_QUERY, (limit,))
+    assignments = plan([(row[0], row[1]) for row in cursor.fetchall()])
+    if not assignments:
+        return []
+    try:
+        drop_tables(cursor, ASSIGNMENTS_TABLE)
+        stage_rows(
+            cursor,
+            ASSIGNMENTS_TABLE,
+            "id INT NOT NULL PRIMARY KEY, assigned_to INT NOT NULL",
+            assignments,
+            [(pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_INTEGER, 0, 0)],
+        )
+        cursor.execute(f"""
+            UPDATE t SET assigned_to = s.assigned_to, updated_at = GETDATE()
+            OUTPUT INSERTED.id, INSERTED.user_id, INSERTED.assigned_to, INSERTED.status,
+                   INSERTED.priority, CONVERT(VARCHAR(18), INSERTED.row_version, 1)
+            FROM Tickets t
+            JOIN {ASSIGNMENTS_TABLE} s ON s.id = t.id
+            WHERE t.assigned_to IS NULL
+        """)
+        columns = ("id", "user_id", "assigned_to", "status", "priority", "version")
+        return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    finally:
+        drop_tables(cursor, ASSIGNMENTS_TABLE)
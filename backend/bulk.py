@@ -0,0 +1,197 @@
+import re
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pyodbc
+
+TICKET_STATUSES = ("abierto", "en_proceso", "resuelto", "cerrado")
+TICKET_PRIORITIES = ("baja", "media", "alta", "urgente")
+
+# Tablas temporales por conexión; se eliminan al terminar cada lote
+STAGING_TABLE = "#bulk_tickets"
+RESULTS_TABLE = "#bulk_results"
+
+# Comas que separan columnas (no las de tipos como DECIMAL(10, 2))
+_COLUMN_SEPARATOR = re.compile(r",(?![^()]*\))")
+
+VERSION_OUTPUT = "CONVERT(VARCHAR(18), {alias}.row_version, 1)"
+
+
+def item_error(index: int, status_code: int, detail: str, ticket_id: Optional[int] = None) -> Dict[str, Any]:
+    result = {"index": index, "status": status_code, "detail": detail}
+    if ticket_id is not None:
+        result["id"] = ticket_id
+    return result
+
+
+def validate_values(status: Optional[str] = None, priority: Optional[str] = None) -> Optional[str]:
+    """Detectar valores que violarían los CHECK de Tickets (y abortarían el lote entero)"""
+    if status is not None and status not in TICKET_STATUSES:
+        return f"Estado inválido: {status}"
+    if priority is not None and priority not in TICKET_PRIORITIES:
+        return f"Prioridad inválida: {priority}"
+    return None
+
+
+def drop_tables(cursor, *tables: str):
+    """Eliminar tablas temporales si existen (sin ocultar un error previo)"""
+    try:
+        cursor.execute(" ".join(
+            f"IF OBJECT_ID('tempdb..{table}') IS NOT NULL DROP TABLE {table};" for table in tables
+        ))
+    except pyodbc.Error:
+        # La conexión lo resolverá al hacer rollback
+        pass
+
+
+def stage_rows(cursor, table: str, columns: str, rows: List[tuple], input_sizes: List[tuple]):
+    """Crear `table` y cargar `rows` con fast_executemany (un solo envío)
+
+    `columns` es la definición DDL; el INSERT usa los nombres en el mismo orden.
+    """
+    cursor.execute(f"CREATE TABLE {table} ({columns})")
+    names = ", ".join(column.split()[0] for column in _COLUMN_SEPARATOR.split(columns))
+    placeholders = ", ".join("?" for _ in input_sizes)
+    cursor.fast_executemany = True
+    cursor.setinputsizes(input_sizes)
+    try:
+        cursor.executemany(f"INSERT INTO {table} ({names}) VALUES ({placeholders})", rows)
+    finally:
+        cursor.fast_executemany = False
+        cursor.setinputsizes(None)
+
+
+def _drop_staging(cursor):
+    drop_tables(cursor, STAGING_TABLE, RESULTS_TABLE)
+
+
+def _stage(cursor, columns: str, rows: List[tuple], input_sizes: List[tuple]):
+    _drop_staging(cursor)
+    cursor.execute(
+        f"CREATE TABLE {RESULTS_TABLE} (item_index INT NOT NULL PRIMARY KEY, id INT NOT NULL, user_id INT NULL, version VARCHAR(18) NULL)"
+    )
+    stage_rows(cursor, STAGING_TABLE, f"item_index INT NOT NULL PRIMARY KEY, {columns}", rows, input_sizes)
+
+
+def bulk_create(
+    cursor,
+    user_id: int,
+    items: Sequence[Tuple[int, str, Optional[str], str, Optional[int]]],
+) -> Dict[int, Dict[str, Any]]:
+    """Insertar tickets (index, title, description, priority, assigned_to) de `user_id`
+
+    MERGE ... ON 1 = 0 permite que el OUTPUT devuelva el índice del ítem junto
+    al id generado, algo que INSERT ... SELECT no expone.
+    """
+    if not items:
+        return {}
+    assignees = {item[0]: item[4] for item in items}
+    try:
+        _stage(
+            cursor,
+            "title NVARCHAR(255) NOT NULL, description NVARCHAR(MAX) NULL, priority NVARCHAR(50) NOT NULL, "
+            "assigned_to INT NULL",
+            list(items),
+            [(pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_WVARCHAR, 255, 0),
+             (pyodbc.SQL_WLONGVARCHAR, 0, 0), (pyodbc.SQL_WVARCHAR, 50, 0), (pyodbc.SQL_INTEGER, 0, 0)],
+        )
+        cursor.execute(f"""
+            MERGE Tickets AS t
+            USING {STAGING_TABLE} AS s ON 1 = 0
+            WHEN NOT MATCHED THEN
+                INSERT (user_id, title, description, priority, assigned_to)
+                VALUES (?, s.title, s.description, s.priority, s.assigned_to)
+            OUTPUT s.item_index, INSERTED.id, INSERTED.user_id, {VERSION_OUTPUT.format(alias='INSERTED')}
+            INTO {RESULTS_TABLE} (item_index, id, user_id, version);
+        """, (user_id,))
+        cursor.execute(f"SELECT item_index, id, version FROM {RESULTS_TABLE}")
+        return {
+            index: {
+                "index": index, "status": 201, "id": ticket_id, "user_id": user_id,
+                "assigned_to": assignees[index], "version": version,
+            }
+            for index, ticket_id, version in cursor.fetchall()
+        }
+    finally:
+        _drop_staging(cursor)
+
+
+def bulk_update(
+    cursor,
+    items: Sequence[Tuple[int, int, Optional[str], Optional[str], Optional[int]]],
+) -> Dict[int, Dict[str, Any]]:
+    """Actualizar estado/prioridad/asignado de tickets (index, id, status, priority, assigned_to)
+
+    Los valores nulos conservan el valor actual. Los ítems que no se
+    actualizaron se clasifican en la misma transacción (404 o asignado inválido).
+    """
+    if not items:
+        return {}
+    try:
+        _stage(
+            cursor,
+            "id INT NOT NULL, status NVARCHAR(50) NULL, priority NVARCHAR(50) NULL, assigned_to INT NULL",
+            list(items),
+            [(pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_WVARCHAR, 50, 0),
+             (pyodbc.SQL_WVARCHAR, 50, 0), (pyodbc.SQL_INTEGER, 0, 0)],
+        )
+        cursor.execute(f"""
+            UPDATE t SET
+                status = COALESCE(s.status, t.status),
+                priority = COALESCE(s.priority, t.priority),
+                assigned_to = COALESCE(s.assigned_to, t.assigned_to),
+                updated_at = GETDATE()
+            OUTPUT s.item_index, INSERTED.id, INSERTED.user_id, {VERSION_OUTPUT.format(alias='INSERTED')}
+            INTO {RESULTS_TABLE} (item_index, id, user_id, version)
+            FROM Tickets t
+            JOIN {STAGING_TABLE} s ON s.id = t.id
+            WHERE s.assigned_to IS NULL OR EXISTS (SELECT 1 FROM Users u WHERE u.id = s.assigned_to)
+        """)
+        return _collect(cursor, 200)
+    finally:
+        _drop_staging(cursor)
+
+
+def bulk_delete(cursor, items: Sequence[Tuple[int, int]]) -> Dict[int, Dict[str, Any]]:
+    """Eliminar tickets (index, id); comentarios y adjuntos caen por cascada"""
+    if not items:
+        return {}
+    try:
+        _stage(
+            cursor,
+            "id INT NOT NULL",
+            list(items),
+            [(pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_INTEGER, 0, 0)],
+        )
+        cursor.execute(f"""
+            DELETE t
+            OUTPUT s.item_index, DELETED.id, DELETED.user_id, NULL
+            INTO {RESULTS_TABLE} (item_index, id, user_id, version)
+            FROM Tickets t
+            JOIN {STAGING_TABLE} s ON s.id = t.id
+        """)
+        return _collect(cursor, 200)
+    finally:
+        _drop_staging(cursor)
+
+
+def _collect(cursor, success_status: int) -> Dict[int, Dict[str, Any]]:
+    """Resultado por ítem a partir de la tabla de resultados y del staging"""
+    cursor.execute(f"""
+        SELECT s.item_index, s.id, r.user_id, r.version,
+               CASE WHEN r.item_index IS NOT NULL THEN 1 ELSE 0 END AS done,
+               CASE WHEN t.id IS NOT NULL THEN 1 ELSE 0 END AS ticket_exists
+        FROM {STAGING_TABLE} s
+        LEFT JOIN {RESULTS_TABLE} r ON r.item_index = s.item_index
+        LEFT JOIN Tickets t ON t.id = s.id
+    """)
+    results = {}
+    for index, ticket_id, user_id, version, done, ticket_exists in cursor.fetchall():
+        if done:
+            results[index] = {"index": index, "status": success_status, "id": ticket_id, "user_id": user_id}
+            if version is not None:
+                results[index]["version"] = version
+        elif not ticket_exists:
+            results[index] = item_error(index, 404, "Ticket no encontrado", ticket_id)
+        else:
+            results[index] = item_error(index, 422, "Usuario asignado inexistente", ticket_id)
+    return results
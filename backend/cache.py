@@ -0,0 +1,300 @@
+import asyncio
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Cache en memoria con expiración por TTL y desalojo LRU"""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Retornar el valor vigente de `key` o `default`"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            value, expires_at = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Guardar `value` bajo `key` durante `ttl` segundos"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        """Invalidar una entrada"""
+        with self._lock:
+            return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self):
+        """Vaciar el cache"""
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores de aciertos y fallos"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave en una sola ejecución
+
+    Mientras la primera llamada está en curso, las siguientes esperan su
+    resultado en lugar de repetir el trabajo (protección contra estampidas).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        # shield: cancelar a un solicitante no cancela el trabajo compartido
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+
+    def forget(self, key: Hashable):
+        """Que las próximas llamadas no se unan a la ejecución en curso"""
+        self._inflight.pop(key, None)
+
+    def clear(self):
+        """Que ninguna llamada nueva se una a las ejecuciones en curso"""
+        self._inflight.clear()
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+
+# ==================== CACHE DE LECTURAS ====================
+
+
+class CacheBackend:
+    """Almacenamiento del cache de lecturas
+
+    Las implementaciones retornan None en un fallo de cache; los valores
+    None no se guardan.
+    """
+
+    name = "base"
+
+    async def get(self, key: str) -> Any:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float):
+        raise NotImplementedError
+
+    async def delete(self, *keys: str):
+        raise NotImplementedError
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name}
+
+    async def close(self):
+        pass
+
+
+class MemoryBackend(CacheBackend):
+    """Backend en proceso: LRU con TTL (también sirve de fake en pruebas locales)"""
+
+    name = "memory"
+
+    def __init__(self, maxsize: int = 10000, ttl: float = 30.0):
+        self.cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def get(self, key: str) -> Any:
+        return self.cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        self.cache.set(key, value, ttl)
+
+    async def delete(self, *keys: str):
+        for key in keys:
+            self.cache.delete(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, **self.cache.stats()}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (bytes, bytearray)):
+        # rowversion y otros binarios: mismo formato '0x...' que CONVERT(..., 1)
+        return "0x" + bytes(value).hex().upper()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def encode_value(value: Any) -> str:
+    """Codificar un valor cacheable como JSON (lo que guarda RedisBackend)"""
+    return json.dumps(value, default=_json_default)
+
+
+def decode_value(raw: Any) -> Any:
+    return json.loads(raw)
+
+
+class RedisBackend(CacheBackend):
+    """Backend compartido entre workers (requiere el paquete opcional `redis`)
+
+    Los valores se guardan como JSON: las fechas vuelven como texto ISO (los
+    modelos de respuesta las convierten de nuevo) y los binarios como '0x...'.
+    `client` permite pasar un cliente ya creado.
+    """
+
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "proyev:", client: Any = None):
+        if client is None:
+            import redis.asyncio as redis
+
+            client = redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+
+    async def get(self, key: str) -> Any:
+        raw = await self.client.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return decode_value(raw)
+
+    async def set(self, key: str, value: Any, ttl: float):
+        payload = encode_value(value)
+        await self.client.set(self.prefix + key, payload, ex=max(1, math.ceil(ttl)))
+
+    async def delete(self, *keys: str):
+        if keys:
+            await self.client.delete(*(self.prefix + key for key in keys))
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.name, "hits": self.hits, "misses": self.misses}
+
+    async def close(self):
+        await self.client.close()
+
+
+def create_backend(kind: str, url: str = "", maxsize: int = 10000, ttl: float = 30.0) -> CacheBackend:
+    """Backend según configuración: 'memory' (por defecto) o 'redis'"""
+    if kind == "redis":
+        return RedisBackend(url)
+    if kind != "memory":
+        raise ValueError(f"Backend de cache inválido: {kind}")
+    return MemoryBackend(maxsize=maxsize, ttl=ttl)
+
+
+class ReadThroughCache:
+    """Cache read-through con single-flight e invalidación explícita
+
+    Si un backend externo falla, la lectura sigue contra la base de datos.
+    Una invalidación durante una carga en curso impide que esa carga guarde
+    su resultado (podría ser anterior a la escritura).
+    """
+
+    def __init__(self, backend: CacheBackend, ttl: float = 30.0):
+        self.backend = backend
+        self.ttl = ttl
+        self._flight = SingleFlight()
+        self._loading: Dict[str, object] = {}
+        self._stale = set()
+        self.loads = 0
+        self.errors = 0
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Valor cacheado de `key` o el resultado de `loader` (una sola carga por clave)"""
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ Error leyendo cache ({key}): {e}")
+            value = None
+        if value is not None:
+            return value
+        return await self._flight.do(key, lambda: self._load(key, loader))
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+        token = object()
+        self._loading[key] = token
+        try:
+            value = await loader()
+            self.loads += 1
+            if value is not None and token not in self._stale:
+                try:
+                    await self.backend.set(key, value, self.ttl)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"❌ Error guardando en cache ({key}): {e}")
+            return value
+        finally:
+            self._stale.discard(token)
+            if self._loading.get(key) is token:
+                del self._loading[key]
+
+    async def invalidate(self, *keys: str):
+        """Descartar claves tras una escritura"""
+        for key in keys:
+            token = self._loading.get(key)
+            if token is not None:
+                self._stale.add(token)
+                self._flight.forget(key)
+        try:
+            await self.backend.delete(*keys)
+        except Exception as e:
+            self.errors += 1
+            print(f"❌ Error invalidando cache ({', '.join(keys)}): {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del cache de lecturas"""
+        return {**self.backend.stats(), "loads": self.loads, "errors": self.errors, "ttl": self.ttl}
+
+    async def close(self):
+        await self.backend.close()
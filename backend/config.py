@@ -15,10 +15,30 @@ class Settings:
     DB_PORT: str = os.getenv('DB_PORT', '1433')
     DB_DRIVER: str = os.getenv('DB_DRIVER', 'ODBC Driver 18 for SQL Server')
     
+    # Pool de conexiones
+    DB_POOL_MIN_SIZE: int = int(os.getenv('DB_POOL_MIN_SIZE', '2'))
+    DB_POOL_MAX_SIZE: int = int(os.getenv('DB_POOL_MAX_SIZE', '10'))
+    DB_POOL_TIMEOUT: float = float(os.getenv('DB_POOL_TIMEOUT', '30'))  # segundos de espera en checkout
+    DB_POOL_RECYCLE: float = float(os.getenv('DB_POOL_RECYCLE', '1800'))  # vida máxima de una conexión
+    DB_POOL_IDLE_TIMEOUT: float = float(os.getenv('DB_POOL_IDLE_TIMEOUT', '300'))
+    DB_POOL_PRE_PING: bool = os.getenv('DB_POOL_PRE_PING', 'True').lower() == 'true'
+    
     # JWT
     SECRET_KEY: str = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
     ALGORITHM: str = os.getenv('ALGORITHM', 'HS256')
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv('ACCESS_TOKEN_EXPIRE_MINUTES', '30'))
+    # Confiar en los claims firmados del token (username, email, role) sin consultar Users
+    AUTH_TRUST_TOKEN_CLAIMS: bool = os.getenv('AUTH_TRUST_TOKEN_CLAIMS', 'False').lower() == 'true'
+    PRINCIPAL_CACHE_SIZE: int = int(os.getenv('PRINCIPAL_CACHE_SIZE', '10000'))
+    PRINCIPAL_CACHE_TTL: float = float(os.getenv('PRINCIPAL_CACHE_TTL', '60'))  # segundos
+    
+    # Contraseñas (bcrypt)
+    BCRYPT_ROUNDS: int = int(os.getenv('BCRYPT_ROUNDS', '12'))
+    PASSWORD_EXECUTOR: str = os.getenv('PASSWORD_EXECUTOR', 'process')  # process, thread o inline
+    PASSWORD_WORKERS: int = int(os.getenv('PASSWORD_WORKERS', '0'))  # 0 = número de CPUs
+    PASSWORD_MAX_CONCURRENCY: int = int(os.getenv('PASSWORD_MAX_CONCURRENCY', '0'))  # 0 = PASSWORD_WORKERS
+    PASSWORD_MAX_QUEUE: int = int(os.getenv('PASSWORD_MAX_QUEUE', '100'))
+    PASSWORD_QUEUE_TIMEOUT: float = float(os.getenv('PASSWORD_QUEUE_TIMEOUT', '10'))
     
     # FastAPI
     API_HOST: str = os.getenv('API_HOST', '0.0.0.0')
@@ -26,10 +46,64 @@ class Settings:
     DEBUG: bool = os.getenv('DEBUG', 'True').lower() == 'true'
     CORS_ORIGINS: list = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
     
+    # Cache de lecturas por id: 'memory' (LRU+TTL en proceso) o 'redis' (compartido, paquete opcional)
+    RESPONSE_CACHE_BACKEND: str = os.getenv('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_URL: str = os.getenv('RESPONSE_CACHE_URL', '')
+    RESPONSE_CACHE_SIZE: int = int(os.getenv('RESPONSE_CACHE_SIZE', '10000'))
+    RESPONSE_CACHE_TTL: float = float(os.getenv('RESPONSE_CACHE_TTL', '30'))  # segundos
+    
+    # Log de queries lentas (SLOW_QUERY_MS=0 lo desactiva)
+    SLOW_QUERY_MS: float = float(os.getenv('SLOW_QUERY_MS', '500'))
+    SLOW_QUERY_LOG_FILE: str = os.getenv('SLOW_QUERY_LOG_FILE', './logs/slow_queries.log')
+    SLOW_QUERY_LOG_MAX_BYTES: int = int(os.getenv('SLOW_QUERY_LOG_MAX_BYTES', '10485760'))  # 10MB
+    SLOW_QUERY_LOG_BACKUPS: int = int(os.getenv('SLOW_QUERY_LOG_BACKUPS', '5'))
+    # Captura de plan para una muestra de queries lentas: '' (no), 'statistics' o 'showplan'
+    SLOW_QUERY_PLAN: str = os.getenv('SLOW_QUERY_PLAN', '')
+    SLOW_QUERY_PLAN_SAMPLE: float = float(os.getenv('SLOW_QUERY_PLAN_SAMPLE', '0.1'))
+    
+    # Cambios de tickets en vivo (SSE)
+    EVENTS_HISTORY_SIZE: int = int(os.getenv('EVENTS_HISTORY_SIZE', '1000'))  # eventos para reanudar con Last-Event-ID
+    EVENTS_QUEUE_SIZE: int = int(os.getenv('EVENTS_QUEUE_SIZE', '100'))  # eventos pendientes por conexión
+    EVENTS_HEARTBEAT: float = float(os.getenv('EVENTS_HEARTBEAT', '15'))  # segundos
+    
+    # Estadísticas
+    STATS_CACHE_TTL: float = float(os.getenv('STATS_CACHE_TTL', '5'))  # segundos
+    STATS_SOURCE: str = os.getenv('STATS_SOURCE', 'query')  # query o counters (vistas indexadas)
+    
+    # Asignación automática de tickets nuevos al técnico con menos carga
+    # ('' la desactiva; p. ej. 'urgente,alta' o 'baja,media,alta,urgente')
+    AUTO_ASSIGN_PRIORITIES: set = {p for p in os.getenv('AUTO_ASSIGN_PRIORITIES', '').split(',') if p}
+    ASSIGNMENT_RESYNC_INTERVAL: float = float(os.getenv('ASSIGNMENT_RESYNC_INTERVAL', '60'))  # segundos, 0 = nunca
+    
+    # Búsqueda de texto completo: documentos que aporta cada índice (top_n_by_rank)
+    SEARCH_MAX_CANDIDATES: int = int(os.getenv('SEARCH_MAX_CANDIDATES', '1000'))
+    
+    # Paginación
+    TICKETS_PAGE_MAX: int = int(os.getenv('TICKETS_PAGE_MAX', '500'))
+    BULK_MAX_ITEMS: int = int(os.getenv('BULK_MAX_ITEMS', '5000'))  # ítems por operación masiva
+    EXPORT_BATCH_SIZE: int = int(os.getenv('EXPORT_BATCH_SIZE', '1000'))  # filas por lote (una consulta) en exportaciones
+    
+    # Importación masiva de tickets
+    IMPORT_BATCH_SIZE: int = int(os.getenv('IMPORT_BATCH_SIZE', '5000'))  # registros por transacción
+    IMPORT_MAX_ERRORS: int = int(os.getenv('IMPORT_MAX_ERRORS', '100'))  # rechazos detallados en el reporte
+    IMPORT_MAX_SIZE: int = int(os.getenv('IMPORT_MAX_SIZE', '2147483648'))  # 2GB
+    IMPORT_LEASE_SECONDS: int = int(os.getenv('IMPORT_LEASE_SECONDS', '300'))  # se renueva en cada lote
+    IMPORT_JOB_RETENTION: float = float(os.getenv('IMPORT_JOB_RETENTION', '3600'))  # segundos en memoria tras terminar
+    
     # Uploads
     UPLOAD_FOLDER: str = os.getenv('UPLOAD_FOLDER', './uploads')
     MAX_UPLOAD_SIZE: int = int(os.getenv('MAX_UPLOAD_SIZE', '5242880'))  # 5MB
     ALLOWED_EXTENSIONS: set = set(os.getenv('ALLOWED_EXTENSIONS', 'jpg,jpeg,png,gif,pdf').split(','))
+    # Entrega por proxy frontal: '' (la API envía el archivo), 'nginx' (X-Accel-Redirect) o 'sendfile' (X-Sendfile)
+    UPLOADS_ACCEL_MODE: str = os.getenv('UPLOADS_ACCEL_MODE', '')
+    UPLOADS_ACCEL_PREFIX: str = os.getenv('UPLOADS_ACCEL_PREFIX', '/protected-uploads/')
+    
+    # Miniaturas y vistas previas (WebP) de imágenes y PDF
+    THUMBNAILS_ENABLED: bool = os.getenv('THUMBNAILS_ENABLED', 'True').lower() == 'true'
+    THUMBNAIL_SIZES: list = [int(size) for size in os.getenv('THUMBNAIL_SIZES', '128,512').split(',')]
+    THUMBNAIL_PREVIEW_SIZE: int = int(os.getenv('THUMBNAIL_PREVIEW_SIZE', '1024'))
+    THUMBNAIL_WORKERS: int = int(os.getenv('THUMBNAIL_WORKERS', '2'))
+    THUMBNAIL_QUEUE_SIZE: int = int(os.getenv('THUMBNAIL_QUEUE_SIZE', '100'))
     
     @property
     def connection_string(self) -> str:
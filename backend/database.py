@@ -1,14 +1,321 @@
+import asyncio
+import contextvars
+import dataclasses
+import functools
 import pyodbc
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from config import settings
+import metrics
+from querylog import SlowQueryLog, is_read_only
 from contextlib import contextmanager
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Sequence, Tuple
+
+# El pool propio reemplaza al pooling del driver manager de ODBC
+pyodbc.pooling = False
+
+
+class PoolTimeoutError(Exception):
+    """No se obtuvo una conexión del pool dentro del tiempo de espera"""
+
+
+class _PooledConnection:
+    """Conexión física administrada por el pool"""
+
+    __slots__ = ("conn", "created_at", "last_used")
+
+    def __init__(self, conn):
+        now = time.monotonic()
+        self.conn = conn
+        self.created_at = now
+        self.last_used = now
+
+
+class ConnectionPool:
+    """Pool acotado de conexiones pyodbc con validación y reciclaje"""
+
+    def __init__(
+        self,
+        connection_string: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        timeout: float = 30.0,
+        recycle: float = 1800.0,
+        idle_timeout: float = 300.0,
+        pre_ping: bool = True,
+        connect=None,
+        on_checkout=None,
+    ):
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("Tamaños de pool inválidos")
+        self.connection_string = connection_string
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.recycle = recycle
+        self.idle_timeout = idle_timeout
+        self.pre_ping = pre_ping
+        self._connect = connect or pyodbc.connect
+        self._on_checkout = on_checkout
+        self._idle: deque = deque()
+        self._size = 0
+        self._closed = False
+        self._last_prune = time.monotonic()
+        self._cond = threading.Condition(threading.Lock())
+        self._stats = {
+            "connections_created": 0,
+            "connections_discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "timeouts": 0,
+            "ping_failures": 0,
+            "wait_time_total": 0.0,
+        }
+
+    # ---------- ciclo de vida de conexiones físicas ----------
+
+    def _open(self) -> _PooledConnection:
+        conn = self._connect(self.connection_string)
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return _PooledConnection(conn)
+
+    def _close(self, pooled: _PooledConnection):
+        try:
+            pooled.conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, pooled: _PooledConnection, now: float) -> bool:
+        if self.recycle and now - pooled.created_at > self.recycle:
+            return True
+        if self.idle_timeout and now - pooled.last_used > self.idle_timeout:
+            return True
+        return False
+
+    def _ping(self, pooled: _PooledConnection) -> bool:
+        try:
+            cursor = pooled.conn.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def fill(self):
+        """Abrir conexiones hasta alcanzar el tamaño mínimo"""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                pooled = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify()
+
+    # ---------- checkout / checkin ----------
+
+    def acquire(self, timeout: Optional[float] = None) -> _PooledConnection:
+        """Obtener una conexión válida del pool, esperando si está agotado"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+        waited = False
+
+        while True:
+            pooled = None
+            create = False
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("El pool de conexiones está cerrado")
+                    if self._idle:
+                        pooled = self._idle.pop()
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        create = True
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._stats["timeouts"] += 1
+                        raise PoolTimeoutError(
+                            f"Pool agotado: {self.max_size} conexiones en uso tras {timeout:.1f}s"
+                        )
+                    if not waited:
+                        waited = True
+                        self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+
+            if create:
+                try:
+                    pooled = self._open()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            else:
+                now = time.monotonic()
+                if self._is_expired(pooled, now):
+                    self._discard(pooled)
+                    continue
+                if self.pre_ping and not self._ping(pooled):
+                    with self._cond:
+                        self._stats["ping_failures"] += 1
+                    self._discard(pooled)
+                    continue
+
+            waited_for = time.monotonic() - start
+            with self._cond:
+                self._stats["checkouts"] += 1
+                self._stats["wait_time_total"] += waited_for
+            if self._on_checkout is not None:
+                self._on_checkout(waited_for)
+            return pooled
+
+    def release(self, pooled: _PooledConnection, discard: bool = False):
+        """Devolver una conexión al pool o descartarla si está rota"""
+        if discard:
+            self._discard(pooled)
+            return
+        now = time.monotonic()
+        pooled.last_used = now
+        with self._cond:
+            if not self._closed:
+                self._idle.append(pooled)
+                self._cond.notify()
+                due = self.idle_timeout and now - self._last_prune > self.idle_timeout / 2
+                if due:
+                    self._last_prune = now
+            else:
+                due = None
+        if due is None:
+            self._discard(pooled)
+        elif due:
+            self.prune()
+
+    def _discard(self, pooled: _PooledConnection):
+        self._close(pooled)
+        with self._cond:
+            self._size -= 1
+            self._stats["connections_discarded"] += 1
+            self._cond.notify()
+
+    def prune(self):
+        """Cerrar conexiones ociosas expiradas respetando el tamaño mínimo"""
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            keep = deque()
+            while self._idle:
+                pooled = self._idle.popleft()
+                if self._size - len(expired) > self.min_size and self._is_expired(pooled, now):
+                    expired.append(pooled)
+                else:
+                    keep.append(pooled)
+            self._idle = keep
+        for pooled in expired:
+            self._discard(pooled)
+
+    def close(self):
+        """Cerrar todas las conexiones ociosas y rechazar nuevos checkouts"""
+        with self._cond:
+            self._closed = True
+            idle = list(self._idle)
+            self._idle.clear()
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> Dict[str, Any]:
+        """Estadísticas del pool para monitoreo"""
+        with self._cond:
+            data = dict(self._stats)
+            data.update({
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+            })
+        data["wait_time_total"] = round(data["wait_time_total"], 6)
+        return data
+
+
+# ---------- materialización de filas ----------
+
+def dict_rows(columns: Sequence[str], rows: List[Any]) -> List[Dict[str, Any]]:
+    """Un dict por fila (forma por defecto)"""
+    return [dict(zip(columns, row)) for row in rows]
+
+
+class Rows(list):
+    """Filas del driver tal cual (tuplas); las columnas se guardan una sola vez"""
+
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Sequence[str], rows: List[Any]):
+        super().__init__(rows)
+        self.columns = tuple(columns)
+
+
+def tuple_rows(columns: Sequence[str], rows: List[Any]) -> Rows:
+    """Sin copiar las filas: acceso por posición según `Rows.columns`"""
+    return Rows(columns, rows)
+
+
+@functools.lru_cache(maxsize=256)
+def record_type(columns: Tuple[str, ...]) -> type:
+    """Dataclass con __slots__ para un conjunto de columnas (se crea una vez)"""
+    return dataclasses.make_dataclass("Record", columns, slots=True)
+
+
+def record_rows(columns: Sequence[str], rows: List[Any]) -> List[Any]:
+    """Registros compactos con atributos por columna (orjson los serializa sin dicts)"""
+    record = record_type(tuple(columns))
+    return [record(*row) for row in rows]
+
+
+RowFactory = Callable[[Sequence[str], List[Any]], List[Any]]
+
 
 class Database:
     """Clase para manejar la conexión a SQL Server"""
-    
+
     def __init__(self):
         self.connection_string = settings.connection_string
-    
+        self.pool = ConnectionPool(
+            self.connection_string,
+            min_size=settings.DB_POOL_MIN_SIZE,
+            max_size=settings.DB_POOL_MAX_SIZE,
+            timeout=settings.DB_POOL_TIMEOUT,
+            recycle=settings.DB_POOL_RECYCLE,
+            idle_timeout=settings.DB_POOL_IDLE_TIMEOUT,
+            pre_ping=settings.DB_POOL_PRE_PING,
+            on_checkout=metrics.observe_pool_wait,
+        )
+        self.slow_query_log = SlowQueryLog(
+            threshold_ms=settings.SLOW_QUERY_MS,
+            path=settings.SLOW_QUERY_LOG_FILE,
+            max_bytes=settings.SLOW_QUERY_LOG_MAX_BYTES,
+            backups=settings.SLOW_QUERY_LOG_BACKUPS,
+            plan_mode=settings.SLOW_QUERY_PLAN,
+            plan_sample_rate=settings.SLOW_QUERY_PLAN_SAMPLE,
+        )
+
     def get_connection(self):
         """Crear y retornar una conexión a SQL Server"""
         try:
@@ -17,53 +324,138 @@ class Database:
         except pyodbc.Error as e:
             print(f"❌ Error de conexión a la base de datos: {e}")
             raise
-    
+
     @contextmanager
-    def get_cursor(self):
-        """Context manager para manejar conexiones y cursores"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+    def connection(self):
+        """Context manager que toma prestada una conexión del pool"""
+        pooled = self.pool.acquire()
+        broken = False
         try:
-            yield cursor
-            conn.commit()
-        except Exception as e:
-            conn.rollback()
-            print(f"❌ Error en transacción: {e}")
+            yield pooled.conn
+        except (pyodbc.OperationalError, pyodbc.InterfaceError):
+            broken = True
             raise
         finally:
-            cursor.close()
-            conn.close()
-    
-    def execute_query(self, query: str, params: Optional[tuple] = None, fetch: bool = True) -> Any:
-        """Ejecutar una query de manera segura"""
+            self.pool.release(pooled, discard=broken)
+
+    @contextmanager
+    def get_cursor(self):
+        """Context manager para manejar conexiones y cursores"""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                yield cursor
+                conn.commit()
+            except Exception as e:
+                try:
+                    conn.rollback()
+                except pyodbc.Error:
+                    # La conexión quedó inutilizable: se descarta del pool
+                    raise pyodbc.OperationalError(str(e)) from e
+                print(f"❌ Error en transacción: {e}")
+                raise
+            finally:
+                try:
+                    cursor.close()
+                except pyodbc.Error:
+                    pass
+
+    def execute_query(
+        self,
+        query: str,
+        params: Optional[tuple] = None,
+        fetch: bool = True,
+        row_factory: RowFactory = dict_rows,
+    ) -> Any:
+        """Ejecutar una query de manera segura
+
+        `row_factory` decide cómo se materializan las filas: dicts (por
+        defecto), `tuple_rows` o `record_rows` para los caminos calientes.
+        """
         try:
             with self.get_cursor() as cursor:
+                start = time.perf_counter()
                 if params:
                     cursor.execute(query, params)
                 else:
                     cursor.execute(query)
-                
+
                 if fetch:
                     columns = [column[0] for column in cursor.description] if cursor.description else []
-                    results = []
-                    for row in cursor.fetchall():
-                        results.append(dict(zip(columns, row)))
-                    return results
+                    results = row_factory(columns, cursor.fetchall())
+                    rowcount = len(results)
                 else:
-                    return cursor.rowcount
+                    results = rowcount = cursor.rowcount
+
+                duration = time.perf_counter() - start
+                metrics.observe_query(query, duration, rowcount)
+                if self.slow_query_log.is_slow(duration):
+                    plan = None
+                    if self.slow_query_log.wants_plan(query):
+                        plan = self._capture_plan(cursor, query, params)
+                    self.slow_query_log.record(query, params, duration, rowcount, plan)
+                return results
         except Exception as e:
+            metrics.observe_query_error(query)
             print(f"❌ Error ejecutando query: {e}")
             raise
-    
+
+    def transaction(self, func, *args, **kwargs) -> Any:
+        """Ejecutar `func(cursor, ...)` en una sola transacción (commit o rollback)"""
+        with self.get_cursor() as cursor:
+            return func(cursor, *args, **kwargs)
+
+    def _capture_plan(self, cursor, query: str, params: Optional[tuple]) -> Optional[Dict[str, Any]]:
+        """Plan estimado (SHOWPLAN_XML) o salida de STATISTICS IO/TIME de una query"""
+        mode = self.slow_query_log.plan_mode
+        args = (query, params) if params else (query,)
+        try:
+            if mode == "showplan":
+                # Con SHOWPLAN_XML la sentencia se compila pero no se ejecuta
+                cursor.execute("SET SHOWPLAN_XML ON")
+                try:
+                    cursor.execute(*args)
+                    row = cursor.fetchone()
+                    return {"showplan_xml": row[0] if row else None}
+                finally:
+                    cursor.execute("SET SHOWPLAN_XML OFF")
+
+            if not is_read_only(query):
+                # STATISTICS vuelve a ejecutar la sentencia: nunca una escritura
+                return None
+            cursor.execute("SET STATISTICS IO, TIME ON")
+            try:
+                cursor.execute(*args)
+                messages = []
+                while True:
+                    messages.extend(message for _, message in cursor.messages or [])
+                    if cursor.description:
+                        cursor.fetchall()
+                    if not cursor.nextset():
+                        break
+                return {"statistics": messages}
+            finally:
+                cursor.execute("SET STATISTICS IO, TIME OFF")
+        except pyodbc.Error as e:
+            self.slow_query_log.plan_failed()
+            print(f"⚠️ No se pudo capturar el plan de la query lenta: {e}")
+            return None
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Estadísticas del pool de conexiones"""
+        return self.pool.stats()
+
+    def close(self):
+        """Cerrar el pool de conexiones"""
+        self.pool.close()
+
     def test_connection(self) -> bool:
         """Probar la conexión a la base de datos"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT @@VERSION")
-            version = cursor.fetchone()[0]
-            cursor.close()
-            conn.close()
+            self.pool.fill()
+            with self.get_cursor() as cursor:
+                cursor.execute("SELECT @@VERSION")
+                version = cursor.fetchone()[0]
             print(f"✅ Conexión exitosa a SQL Server")
             print(f"Version: {version[:80]}...")
             return True
@@ -71,5 +463,65 @@ class Database:
             print(f"❌ Error al conectar: {e}")
             return False
 
-# Instancia global
-db = Database()
\ No newline at end of file
+class AsyncDatabase:
+    """Capa de acceso a datos awaitable sobre un pool de hilos dedicado
+
+    El pool de hilos tiene el mismo tamaño que el pool de conexiones, de modo
+    que las llamadas bloqueantes de pyodbc nunca se ejecutan en el event loop
+    y la concurrencia escala con las conexiones disponibles.
+    """
+
+    def __init__(self, database: Database, max_workers: Optional[int] = None):
+        self.db = database
+        self.max_workers = max_workers or database.pool.max_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix="db",
+                    )
+        return self._executor
+
+    async def run(self, func, *args, **kwargs) -> Any:
+        """Ejecutar una función bloqueante de base de datos en el pool de hilos"""
+        loop = asyncio.get_running_loop()
+        # Propagar el contexto (endpoint en curso) al hilo que ejecuta la query
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(context.run, func, *args, **kwargs)
+        )
+
+    async def fetch_all(
+        self, query: str, params: Optional[tuple] = None, row_factory: RowFactory = dict_rows
+    ) -> List[Any]:
+        """Ejecutar una query y retornar todas las filas"""
+        return await self.run(self.db.execute_query, query, params, True, row_factory)
+
+    async def fetch_one(self, query: str, params: Optional[tuple] = None) -> Optional[Dict[str, Any]]:
+        """Ejecutar una query y retornar la primera fila (o None)"""
+        rows = await self.fetch_all(query, params)
+        return rows[0] if rows else None
+
+    async def transaction(self, func, *args, **kwargs) -> Any:
+        """Versión async de `Database.transaction`"""
+        return await self.run(self.db.transaction, func, *args, **kwargs)
+
+    async def execute(self, query: str, params: Optional[tuple] = None) -> int:
+        """Ejecutar una sentencia sin resultados y retornar las filas afectadas"""
+        return await self.run(self.db.execute_query, query, params, False)
+
+    def close(self):
+        """Detener el pool de hilos"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+# Instancias globales
+db = Database()
+adb = AsyncDatabase(db)
@@ -0,0 +1,145 @@
+import asyncio
+import json
+import time
+from collections import deque
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+TICKET_CREATED = "ticket.created"
+TICKET_UPDATED = "ticket.updated"
+TICKET_DELETED = "ticket.deleted"
+# El cliente debe recargar: se perdieron eventos (historial agotado o reinicio)
+RESET = "reset"
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return str(value)
+
+
+class Event:
+    """Evento ya codificado como frame SSE (se codifica una sola vez)"""
+
+    __slots__ = ("seq", "id", "type", "user_id", "frame")
+
+    def __init__(self, seq: int, event_id: str, event_type: str, user_id: Optional[int], data: Dict[str, Any]):
+        self.seq = seq
+        self.id = event_id
+        self.type = event_type
+        self.user_id = user_id
+        payload = json.dumps(data, ensure_ascii=False, default=_json_default)
+        self.frame = f"id: {event_id}\nevent: {event_type}\ndata: {payload}\n\n".encode("utf-8")
+
+
+class Subscription:
+    """Conexión suscrita: cola acotada y filtro por rol"""
+
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user: dict, queue_size: int):
+        # Los clientes solo reciben eventos de sus tickets
+        self.user_id = user['id'] if user['role'] == 'cliente' else None
+        self.queue: "asyncio.Queue[Optional[Event]]" = asyncio.Queue(maxsize=queue_size)
+
+    def accepts(self, event: Event) -> bool:
+        return self.user_id is None or event.user_id == self.user_id
+
+
+class TicketEventBus:
+    """Fan-out en proceso de los cambios de tickets hacia las conexiones SSE
+
+    Los eventos recientes se guardan en un historial acotado para reanudar
+    con Last-Event-ID. Una conexión cuya cola se llena se corta (tras vaciarla)
+    y el cliente, al reconectar, recupera lo perdido desde el historial.
+    Los ids llevan la época del proceso: un id de otra época produce `reset`.
+    """
+
+    def __init__(self, history_size: int = 1000, queue_size: int = 100, heartbeat: float = 15.0):
+        self.queue_size = queue_size
+        self.heartbeat = heartbeat
+        self.epoch = format(int(time.time()), "x")
+        self._seq = 0
+        self._history: Deque[Event] = deque(maxlen=history_size)
+        self._subscribers: Set[Subscription] = set()
+        self._stats = {"published": 0, "dropped_subscribers": 0}
+
+    def publish(self, event_type: str, ticket: Dict[str, Any]):
+        """Publicar un cambio de ticket (llamar desde el event loop)"""
+        self._seq += 1
+        event = Event(
+            self._seq, f"{self.epoch}-{self._seq}", event_type,
+            ticket.get('user_id'), {"type": event_type, "ticket": ticket},
+        )
+        self._history.append(event)
+        self._stats["published"] += 1
+        for subscription in list(self._subscribers):
+            if not subscription.accepts(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+        self._stats["dropped_subscribers"] += 1
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def _parse_id(self, event_id: str) -> Optional[int]:
+        epoch, _, seq = event_id.partition("-")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def subscribe(self, user: dict, last_event_id: Optional[str] = None) -> Tuple[Subscription, List[Event], bool]:
+        """Registrar una conexión; retorna (suscripción, eventos a reenviar, requiere reset)"""
+        subscription = Subscription(user, self.queue_size)
+        replay: List[Event] = []
+        reset = False
+        if last_event_id:
+            seq = self._parse_id(last_event_id)
+            oldest = self._history[0].seq if self._history else self._seq + 1
+            if seq is None or seq > self._seq or seq + 1 < oldest:
+                reset = True
+            else:
+                replay = [event for event in self._history if event.seq > seq and subscription.accepts(event)]
+        # Registro y replay en el mismo paso síncrono: no hay huecos ni duplicados
+        self._subscribers.add(subscription)
+        return subscription, replay, reset
+
+    def unsubscribe(self, subscription: Subscription):
+        self._subscribers.discard(subscription)
+
+    async def stream(self, user: dict, last_event_id: Optional[str] = None) -> AsyncIterator[bytes]:
+        """Frames SSE para una conexión, con heartbeat mientras no hay eventos"""
+        subscription, replay, reset = self.subscribe(user, last_event_id)
+        try:
+            yield b"retry: 3000\n\n"
+            if reset:
+                yield f"event: {RESET}\ndata: {{}}\n\n".encode()
+            for event in replay:
+                yield event.frame
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+                if event is None:
+                    # Cola desbordada: cortar para que el cliente reanude con Last-Event-ID
+                    return
+                yield event.frame
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores del canal de eventos"""
+        return {
+            **self._stats,
+            "subscribers": len(self._subscribers),
+            "history": len(self._history),
+            "last_event_id": f"{self.epoch}-{self._seq}",
+        }
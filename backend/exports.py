@@ -0,0 +1,65 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import AsyncIterator, List, Sequence
+
+# Columnas exportadas, en el orden del SELECT y del encabezado CSV
+EXPORT_FIELDS = (
+    "id", "user_id", "title", "description", "status", "priority",
+    "assigned_to", "created_at", "updated_at", "created_by", "assigned_to_name",
+)
+EXPORT_COLUMNS = (
+    "t.id, t.user_id, t.title, t.description, t.status, t.priority, "
+    "t.assigned_to, t.created_at, t.updated_at, "
+    "u.username as created_by, a.username as assigned_to_name"
+)
+# Posición de created_at en cada fila (keyset de los lotes junto con id)
+EXPORT_CREATED_AT = EXPORT_FIELDS.index("created_at")
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (bytes, bytearray)):
+        return value.hex()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def encode_ndjson(rows: Sequence[tuple], fields: Sequence[str] = EXPORT_FIELDS) -> bytes:
+    """Un objeto JSON por línea"""
+    encode = json.JSONEncoder(ensure_ascii=False, default=_json_default).encode
+    return "".join(encode(dict(zip(fields, row))) + "\n" for row in rows).encode("utf-8")
+
+
+def encode_csv(rows: Sequence[tuple], header: Sequence[str] = ()) -> bytes:
+    """Filas CSV (con encabezado opcional)"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows(
+        [value.isoformat() if isinstance(value, datetime) else value for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode("utf-8")
+
+
+async def stream_export(batches: AsyncIterator[List[tuple]], fmt: str) -> AsyncIterator[bytes]:
+    """Codificar cada lote de filas apenas llega de la base de datos"""
+    if fmt == "csv":
+        # BOM para que Excel detecte UTF-8
+        yield b"\xef\xbb\xbf" + encode_csv((), EXPORT_FIELDS)
+        async for rows in batches:
+            yield encode_csv(rows)
+    else:
+        async for rows in batches:
+            yield encode_ndjson(rows)
@@ -0,0 +1,44 @@
+import dataclasses
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from fastapi.responses import Response
+
+try:
+    import orjson
+except ImportError:  # sin orjson se usa la stdlib (mismo JSON, más lento)
+    orjson = None
+
+
+def _default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if dataclasses.is_dataclass(value):
+        return {field.name: getattr(value, field.name) for field in dataclasses.fields(value)}
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(value: Any) -> bytes:
+    """JSON compacto en bytes; dataclasses (record_rows) y datetime nativos con orjson"""
+    if orjson is not None:
+        return orjson.dumps(value, default=_default)
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+
+class FastJSONResponse(Response):
+    """Respuesta JSON codificada directamente, sin pasar por el response_model
+
+    Solo para datos confiables de la base cuyas columnas ya coinciden con
+    el modelo de respuesta (mismos nombres y orden).
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
@@ -1,26 +1,124 @@
 """
 Google OAuth 2.0 Integration - Native Implementation
 No external services required, direct Google API integration
+
+Las llamadas a Google comparten un cliente HTTP asíncrono con keep-alive y
+timeouts. Los certificados de firma (JWKS) se cachean en memoria según su
+Cache-Control, así la verificación del ID token es trabajo local de CPU.
+Los endpoints son configurables para poder apuntar a un servidor de prueba.
 """
 
 import os
-import json
-from typing import Optional
-from google.oauth2 import id_token
-from google.auth.transport import requests as google_requests
-from fastapi import HTTPException
-from datetime import datetime, timezone, timedelta
+import re
+import time
+import asyncio
 import secrets
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+
+import httpx
+import jwt
+from fastapi import HTTPException
 
 # Google OAuth Configuration
 GOOGLE_CLIENT_ID = os.getenv('GOOGLE_CLIENT_ID', '')
 GOOGLE_CLIENT_SECRET = os.getenv('GOOGLE_CLIENT_SECRET', '')
 GOOGLE_REDIRECT_URI = os.getenv('GOOGLE_REDIRECT_URI', 'http://localhost:3000/auth/callback')
 
-# OAuth URLs
-GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/v2/auth"
-GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
-GOOGLE_USERINFO_URL = "https://www.googleapis.com/oauth2/v2/userinfo"
+# OAuth URLs (configurables para pruebas contra un stub local)
+GOOGLE_AUTH_URL = os.getenv('GOOGLE_AUTH_URL', "https://accounts.google.com/o/oauth2/v2/auth")
+GOOGLE_TOKEN_URL = os.getenv('GOOGLE_TOKEN_URL', "https://oauth2.googleapis.com/token")
+GOOGLE_USERINFO_URL = os.getenv('GOOGLE_USERINFO_URL', "https://www.googleapis.com/oauth2/v2/userinfo")
+GOOGLE_CERTS_URL = os.getenv('GOOGLE_CERTS_URL', "https://www.googleapis.com/oauth2/v3/certs")
+GOOGLE_ISSUERS = os.getenv('GOOGLE_ISSUERS', 'accounts.google.com,https://accounts.google.com').split(',')
+
+# Cliente HTTP
+GOOGLE_HTTP_TIMEOUT = float(os.getenv('GOOGLE_HTTP_TIMEOUT', '10'))
+GOOGLE_HTTP_MAX_CONNECTIONS = int(os.getenv('GOOGLE_HTTP_MAX_CONNECTIONS', '20'))
+# Tolerancia de reloj al validar exp/iat del ID token (segundos)
+GOOGLE_CLOCK_SKEW = int(os.getenv('GOOGLE_CLOCK_SKEW', '10'))
+
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP compartido (pool de conexiones con keep-alive)"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(GOOGLE_HTTP_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=GOOGLE_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=GOOGLE_HTTP_MAX_CONNECTIONS
+            )
+        )
+    return _http_client
+
+
+async def close_http_client():
+    """Cerrar el cliente HTTP (llamar al detener la aplicación)"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
+
+class GoogleCertsCache:
+    """Claves públicas de Google (JWKS) cacheadas según Cache-Control max-age
+
+    Un `kid` desconocido fuerza una recarga (rotación de claves), limitada a
+    una cada `min_refresh_interval` segundos para no amplificar tokens falsos.
+    """
+
+    def __init__(self, url: str, default_ttl: float = 3600, min_refresh_interval: float = 60):
+        self.url = url
+        self.default_ttl = default_ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: Dict[str, Any] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._lock = asyncio.Lock()
+        self.refreshes = 0
+
+    def _ttl(self, response: httpx.Response) -> float:
+        match = _MAX_AGE.search(response.headers.get("Cache-Control", ""))
+        if not match:
+            return self.default_ttl
+        age = response.headers.get("Age", "0")
+        return max(0, int(match.group(1)) - (int(age) if age.isdigit() else 0))
+
+    async def _refresh(self):
+        try:
+            response = await get_http_client().get(self.url)
+            response.raise_for_status()
+            jwks = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            raise HTTPException(status_code=502, detail=f"No se pudieron obtener los certificados de Google: {e}")
+        self._keys = {key["kid"]: jwt.PyJWK(key).key for key in jwks.get("keys", []) if "kid" in key}
+        now = time.monotonic()
+        self._fetched_at = now
+        self._expires_at = now + self._ttl(response)
+        self.refreshes += 1
+
+    async def get_key(self, kid: str) -> Any:
+        """Clave pública para `kid` (recarga el JWKS si expiró o no la conoce)"""
+        now = time.monotonic()
+        key = self._keys.get(kid)
+        if key is not None and now < self._expires_at:
+            return key
+        async with self._lock:
+            now = time.monotonic()
+            expired = now >= self._expires_at
+            unknown = kid not in self._keys and now - self._fetched_at >= self.min_refresh_interval
+            if expired or unknown:
+                await self._refresh()
+        return self._keys.get(kid)
+
+
+google_certs = GoogleCertsCache(GOOGLE_CERTS_URL)
+
 
 def get_google_auth_url(state: str) -> str:
     """
@@ -42,8 +140,7 @@ def get_google_auth_url(state: str) -> str:
         "prompt": "consent"
     }
     
-    query_string = "&".join([f"{k}={v}" for k, v in params.items()])
-    return f"{GOOGLE_AUTH_URL}?{query_string}"
+    return f"{GOOGLE_AUTH_URL}?{urlencode(params)}"
 
 def generate_state_token() -> str:
     """Genera un token de estado seguro para prevenir CSRF"""
@@ -59,8 +156,6 @@ async def exchange_code_for_token(code: str) -> dict:
     Returns:
         Dict con access_token, id_token y refresh_token
     """
-    import requests
-    
     data = {
         "client_id": GOOGLE_CLIENT_ID,
         "client_secret": GOOGLE_CLIENT_SECRET,
@@ -69,7 +164,10 @@ async def exchange_code_for_token(code: str) -> dict:
         "redirect_uri": GOOGLE_REDIRECT_URI
     }
     
-    response = requests.post(GOOGLE_TOKEN_URL, data=data)
+    try:
+        response = await get_http_client().post(GOOGLE_TOKEN_URL, data=data)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"No se pudo contactar a Google: {e}")
     
     if response.status_code != 200:
         raise HTTPException(
@@ -83,6 +181,8 @@ async def verify_google_token(id_token_str: str) -> dict:
     """
     Verifica el ID token de Google y extrae la información del usuario
     
+    La firma se valida localmente contra los certificados cacheados.
+    
     Args:
         id_token_str: Token JWT de Google
         
@@ -90,15 +190,21 @@ async def verify_google_token(id_token_str: str) -> dict:
         Dict con información del usuario (email, name, picture)
     """
     try:
-        # Verificar el token con Google
-        idinfo = id_token.verify_oauth2_token(
+        header = jwt.get_unverified_header(id_token_str)
+        key = await google_certs.get_key(header.get("kid", ""))
+        if key is None:
+            raise ValueError('Clave de firma desconocida')
+        
+        idinfo = jwt.decode(
             id_token_str,
-            google_requests.Request(),
-            GOOGLE_CLIENT_ID
+            key,
+            algorithms=["RS256"],
+            audience=GOOGLE_CLIENT_ID,
+            leeway=GOOGLE_CLOCK_SKEW
         )
         
         # Verificar el issuer
-        if idinfo['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
+        if idinfo.get('iss') not in GOOGLE_ISSUERS:
             raise ValueError('Token inválido')
         
         return {
@@ -108,6 +214,8 @@ async def verify_google_token(id_token_str: str) -> dict:
             "email_verified": idinfo.get("email_verified", False),
             "google_id": idinfo.get("sub")
         }
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=401,
@@ -124,10 +232,11 @@ async def get_user_info_from_access_token(access_token: str) -> dict:
     Returns:
         Dict con información del usuario
     """
-    import requests
-    
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(GOOGLE_USERINFO_URL, headers=headers)
+    try:
+        response = await get_http_client().get(GOOGLE_USERINFO_URL, headers=headers)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=502, detail=f"No se pudo contactar a Google: {e}")
     
     if response.status_code != 200:
         raise HTTPException(
@@ -0,0 +1,72 @@
+import argparse
+import os
+import sys
+
+from config import settings
+from database import db
+from importer import IMPORT_FORMATS, READ_BUFFER, ImportInProgress, TicketImporter
+
+
+def print_progress(progress):
+    """Mostrar avance y throughput después de cada lote"""
+    print(
+        f"  → registro {progress.position}: {progress.imported} importados, "
+        f"{progress.rejected} rechazados ({progress.rate():.0f} registros/s)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importar tickets históricos desde CSV o NDJSON")
+    parser.add_argument("path", help="Archivo de entrada")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="Formato (por defecto, según la extensión)")
+    parser.add_argument("--job", help="Nombre del job para el checkpoint (por defecto, el nombre del archivo)")
+    parser.add_argument("--batch-size", type=int, default=settings.IMPORT_BATCH_SIZE)
+    args = parser.parse_args()
+
+    fmt = args.format or os.path.splitext(args.path)[1].lstrip(".").lower()
+    if fmt == "jsonl":
+        fmt = "ndjson"
+    if fmt not in IMPORT_FORMATS:
+        print(f"✗ Formato no reconocido: {fmt} (use --format)")
+        return 1
+    job = args.job or os.path.basename(args.path)
+
+    importer = TicketImporter(
+        db,
+        batch_size=args.batch_size,
+        max_errors=settings.IMPORT_MAX_ERRORS,
+        on_progress=print_progress,
+        lease_seconds=settings.IMPORT_LEASE_SECONDS,
+    )
+    checkpoint = importer.load_checkpoint(job)
+    if checkpoint:
+        print(f"Reanudando '{job}' desde el registro {checkpoint['position']}...")
+    else:
+        print(f"Importando '{job}'...")
+
+    try:
+        with open(args.path, "rb", buffering=READ_BUFFER) as stream:
+            progress = importer.run(stream, fmt, job)
+    except ImportInProgress as e:
+        print(f"✗ {e} (en la API u otro proceso)")
+        return 1
+    except KeyboardInterrupt:
+        print("\n✗ Importación interrumpida; se reanudará desde el último lote confirmado")
+        return 130
+    except Exception as e:
+        print(f"✗ Error en la importación: {e}")
+        return 1
+    finally:
+        db.close()
+
+    for error in progress.errors:
+        print(f"  registro {error['record']}: {error['error']}")
+    print(
+        f"✓ Importación completa: {progress.imported} tickets, {progress.comments} comentarios, "
+        f"{progress.rejected} rechazados en {progress.elapsed():.1f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,405 @@
+import csv
+import io
+import json
+import os
+import socket
+import time
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import pyodbc
+from pydantic import BaseModel, Field, ValidationError, field_validator, model_validator
+
+from bulk import TICKET_PRIORITIES, TICKET_STATUSES, drop_tables, stage_rows
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+TICKETS_TABLE = "#import_tickets"
+IDS_TABLE = "#import_ids"
+COMMENTS_TABLE = "#import_comments"
+
+# Bloques de lectura del archivo de entrada
+READ_BUFFER = 1024 * 1024
+
+
+class ImportedComment(BaseModel):
+    author: str
+    comment: str = Field(..., min_length=1)
+    created_at: Optional[datetime] = None
+
+
+class ImportedTicket(BaseModel):
+    """Fila de importación: reglas de TicketCreate más los datos históricos"""
+    title: str = Field(..., min_length=1, max_length=255)
+    description: Optional[str] = None
+    priority: str = "media"
+    status: str = "abierto"
+    created_by: str
+    assigned_to: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    comments: List[ImportedComment] = []
+
+    @model_validator(mode="before")
+    @classmethod
+    def _normalize(cls, data: Any) -> Any:
+        if not isinstance(data, dict):
+            return data
+        # En CSV las celdas vacías son nulos y los comentarios vienen como JSON
+        data = {key: value for key, value in data.items() if key and value != ""}
+        if isinstance(data.get("comments"), str):
+            data["comments"] = json.loads(data["comments"])
+        return data
+
+    @field_validator("priority")
+    @classmethod
+    def _check_priority(cls, value: str) -> str:
+        if value not in TICKET_PRIORITIES:
+            raise ValueError(f"Prioridad inválida: {value}")
+        return value
+
+    @field_validator("status")
+    @classmethod
+    def _check_status(cls, value: str) -> str:
+        if value not in TICKET_STATUSES:
+            raise ValueError(f"Estado inválido: {value}")
+        return value
+
+
+def _naive(value: Optional[datetime]) -> Optional[datetime]:
+    """DATETIME2 no guarda zona horaria: se pasa a la hora local"""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def read_records(stream: io.BufferedIOBase, fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Iterar (número de registro, dict | excepción) leyendo el archivo por bloques"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+        return
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            yield number, json.loads(line)
+        except ValueError as e:
+            yield number, e
+
+
+class ImportInProgress(Exception):
+    """Otra ejecución (de este u otro proceso) tiene el lease del job"""
+
+    def __init__(self, job: str):
+        super().__init__(f"La importación '{job}' ya está en curso")
+        self.job = job
+
+
+class ImportLeaseLost(Exception):
+    """El lease del job expiró y lo tomó otra ejecución: el lote no se confirma"""
+
+
+def import_owner() -> str:
+    """Identificador de una ejecución para el lease (host, proceso y sufijo único)"""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+@dataclass
+class ImportProgress:
+    """Avance de una importación (acumulado entre reanudaciones)"""
+    job: str
+    status: str = "running"
+    position: int = 0
+    resumed_from: int = 0
+    imported: int = 0
+    comments: int = 0
+    rejected: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    detail: Optional[str] = None
+    started_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+    def elapsed(self) -> float:
+        return (self.finished_at or time.monotonic()) - self.started_at
+
+    def rate(self) -> float:
+        """Registros procesados por segundo en esta ejecución"""
+        elapsed = self.elapsed()
+        return (self.position - self.resumed_from) / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "job": self.job,
+            "status": self.status,
+            "position": self.position,
+            "resumed_from": self.resumed_from,
+            "imported": self.imported,
+            "comments": self.comments,
+            "rejected": self.rejected,
+            "elapsed_seconds": round(self.elapsed(), 2),
+            "rows_per_second": round(self.rate(), 1),
+            "errors": self.errors,
+            "detail": self.detail,
+        }
+
+
+class TicketImporter:
+    """Importador de tickets (y sus comentarios) desde CSV o NDJSON
+
+    Cada lote se inserta en una transacción junto con el checkpoint del job
+    (tabla ImportCheckpoints), así una importación interrumpida se reanuda
+    exactamente después del último lote confirmado.
+
+    La fila del checkpoint también es el lease del job: solo la ejecución que
+    lo tiene confirma lotes, y cada lote lo renueva por `lease_seconds`. Si un
+    proceso muere, el job queda libre cuando el lease expira.
+    """
+
+    def __init__(
+        self,
+        database,
+        batch_size: int = 5000,
+        max_errors: int = 100,
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+        lease_seconds: float = 300,
+    ):
+        self.db = database
+        self.batch_size = batch_size
+        self.max_errors = max_errors
+        self.on_progress = on_progress
+        self.lease_seconds = lease_seconds
+
+    def load_users(self) -> Dict[str, int]:
+        """Mapa username -> id en memoria"""
+        rows = self.db.execute_query("SELECT id, username FROM Users")
+        return {row['username']: row['id'] for row in rows}
+
+    def load_checkpoint(self, job: str) -> Optional[Dict[str, Any]]:
+        """Avance confirmado de `job` y su estado según el lease"""
+        rows = self.db.execute_query("""
+            SELECT position, imported, rejected,
+                   CASE WHEN owner IS NOT NULL AND lease_expires_at > GETDATE() THEN 'running'
+                        WHEN completed_at IS NOT NULL THEN 'done'
+                        ELSE 'interrupted' END as status
+            FROM ImportCheckpoints WHERE job = ?
+        """, (job,))
+        return rows[0] if rows else None
+
+    def acquire(self, job: str, owner: str) -> bool:
+        """Tomar (o renovar) el lease de `job`; False si lo tiene otra ejecución"""
+        return self.db.transaction(self._acquire, job, owner, int(self.lease_seconds))
+
+    @staticmethod
+    def _acquire(cursor, job, owner, lease_seconds) -> bool:
+        cursor.execute("""
+            UPDATE ImportCheckpoints
+            SET owner = ?, lease_expires_at = DATEADD(SECOND, ?, GETDATE())
+            WHERE job = ? AND (owner IS NULL OR owner = ? OR lease_expires_at <= GETDATE())
+        """, (owner, lease_seconds, job, owner))
+        if cursor.rowcount:
+            return True
+        try:
+            cursor.execute("""
+                INSERT INTO ImportCheckpoints (job, owner, lease_expires_at)
+                SELECT ?, ?, DATEADD(SECOND, ?, GETDATE())
+                WHERE NOT EXISTS (SELECT 1 FROM ImportCheckpoints WHERE job = ?)
+            """, (job, owner, lease_seconds, job))
+        except pyodbc.IntegrityError:
+            # Otra ejecución insertó la fila al mismo tiempo
+            return False
+        return cursor.rowcount == 1
+
+    def release(self, job: str, owner: str, completed: bool = False):
+        """Liberar el lease de `job` (si sigue siendo de `owner`)"""
+        completed_at = "GETDATE()" if completed else "completed_at"
+        self.db.execute_query(f"""
+            UPDATE ImportCheckpoints SET owner = NULL, lease_expires_at = NULL, completed_at = {completed_at}
+            WHERE job = ? AND owner = ?
+        """, (job, owner), fetch=False)
+
+    def run(
+        self,
+        stream: io.BufferedIOBase,
+        fmt: str,
+        job: str,
+        progress: Optional[ImportProgress] = None,
+        owner: Optional[str] = None,
+    ) -> ImportProgress:
+        """Importar `stream` reanudando desde el checkpoint de `job`
+
+        Toma el lease del job como `owner` (o con un identificador nuevo) y lo
+        libera al terminar; si otra ejecución lo tiene lanza ImportInProgress.
+        """
+        if fmt not in IMPORT_FORMATS:
+            raise ValueError(f"Formato de importación inválido: {fmt}")
+        progress = progress or ImportProgress(job=job)
+        owner = owner or import_owner()
+        if not self.acquire(job, owner):
+            progress.status = "failed"
+            progress.detail = f"La importación '{job}' ya está en curso"
+            progress.finished_at = time.monotonic()
+            raise ImportInProgress(job)
+        try:
+            users = self.load_users()
+            checkpoint = self.load_checkpoint(job)
+            if checkpoint:
+                progress.resumed_from = progress.position = checkpoint['position']
+                progress.imported = checkpoint['imported']
+                progress.rejected = checkpoint['rejected']
+
+            tickets: List[tuple] = []
+            comments: List[tuple] = []
+            flushed_at = progress.position
+            for number, record in read_records(stream, fmt):
+                if number <= progress.resumed_from:
+                    continue
+                row = self._convert(number, record, users, progress)
+                if row is not None:
+                    ticket, ticket_comments = row
+                    tickets.append(ticket)
+                    comments.extend(ticket_comments)
+                progress.position = number
+                if number - flushed_at >= self.batch_size:
+                    self._flush(tickets, comments, progress, owner)
+                    tickets, comments = [], []
+                    flushed_at = number
+            self._flush(tickets, comments, progress, owner)
+            progress.status = "done"
+        except Exception as e:
+            progress.status = "failed"
+            progress.detail = str(e)
+            raise
+        finally:
+            progress.finished_at = time.monotonic()
+            try:
+                self.release(job, owner, completed=progress.status == "done")
+            except Exception as e:
+                # El lease expira solo; no ocultar el error original
+                print(f"⚠️  No se pudo liberar el lease de '{job}': {e}")
+        return progress
+
+    def _reject(self, progress: ImportProgress, number: int, error: str):
+        progress.rejected += 1
+        if len(progress.errors) < self.max_errors:
+            progress.errors.append({"record": number, "error": error})
+
+    def _convert(self, number: int, record: Any, users: Dict[str, int], progress: ImportProgress):
+        """Validar un registro y resolver usuarios; None si se rechaza"""
+        if isinstance(record, Exception):
+            self._reject(progress, number, f"JSON inválido: {record}")
+            return None
+        try:
+            ticket = ImportedTicket.model_validate(record)
+        except ValidationError as e:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'registro'}: {error['msg']}"
+                for error in e.errors()
+            )
+            self._reject(progress, number, message)
+            return None
+
+        user_id = users.get(ticket.created_by)
+        if user_id is None:
+            self._reject(progress, number, f"Usuario inexistente: {ticket.created_by}")
+            return None
+        assigned_to = None
+        if ticket.assigned_to is not None:
+            assigned_to = users.get(ticket.assigned_to)
+            if assigned_to is None:
+                self._reject(progress, number, f"Usuario asignado inexistente: {ticket.assigned_to}")
+                return None
+        ticket_comments = []
+        for comment in ticket.comments:
+            author_id = users.get(comment.author)
+            if author_id is None:
+                self._reject(progress, number, f"Autor de comentario inexistente: {comment.author}")
+                return None
+            ticket_comments.append((number, author_id, comment.comment, _naive(comment.created_at)))
+
+        created_at = _naive(ticket.created_at)
+        return (
+            number, user_id, ticket.title, ticket.description, ticket.status, ticket.priority,
+            assigned_to, created_at, _naive(ticket.updated_at) or created_at,
+        ), ticket_comments
+
+    def _flush(self, tickets: List[tuple], comments: List[tuple], progress: ImportProgress, owner: str):
+        imported = len(tickets)
+        self.db.transaction(
+            self._write_batch, tickets, comments,
+            progress.job, owner, int(self.lease_seconds),
+            progress.position, progress.imported + imported, progress.rejected,
+        )
+        progress.imported += imported
+        progress.comments += len(comments)
+        if self.on_progress is not None:
+            self.on_progress(progress)
+
+    @staticmethod
+    def _write_batch(cursor, tickets, comments, job, owner, lease_seconds, position, imported, rejected):
+        """Insertar un lote y mover el checkpoint (renovando el lease) en la misma transacción"""
+        try:
+            if tickets:
+                drop_tables(cursor, TICKETS_TABLE, IDS_TABLE, COMMENTS_TABLE)
+                stage_rows(
+                    cursor, TICKETS_TABLE,
+                    "item_index INT NOT NULL PRIMARY KEY, user_id INT NOT NULL, title NVARCHAR(255) NOT NULL, "
+                    "description NVARCHAR(MAX) NULL, status NVARCHAR(50) NOT NULL, priority NVARCHAR(50) NOT NULL, "
+                    "assigned_to INT NULL, created_at DATETIME2 NULL, updated_at DATETIME2 NULL",
+                    tickets,
+                    [(pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_WVARCHAR, 255, 0),
+                     (pyodbc.SQL_WLONGVARCHAR, 0, 0), (pyodbc.SQL_WVARCHAR, 50, 0), (pyodbc.SQL_WVARCHAR, 50, 0),
+                     (pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7),
+                     (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7)],
+                )
+                cursor.execute(f"CREATE TABLE {IDS_TABLE} (item_index INT NOT NULL PRIMARY KEY, id INT NOT NULL)")
+                cursor.execute(f"""
+                    MERGE Tickets AS t
+                    USING {TICKETS_TABLE} AS s ON 1 = 0
+                    WHEN NOT MATCHED THEN
+                        INSERT (user_id, title, description, status, priority, assigned_to, created_at, updated_at)
+                        VALUES (s.user_id, s.title, s.description, s.status, s.priority, s.assigned_to,
+                                COALESCE(s.created_at, GETDATE()), COALESCE(s.updated_at, GETDATE()))
+                    OUTPUT s.item_index, INSERTED.id INTO {IDS_TABLE} (item_index, id);
+                """)
+                if comments:
+                    stage_rows(
+                        cursor, COMMENTS_TABLE,
+                        "item_index INT NOT NULL, user_id INT NOT NULL, comment NVARCHAR(MAX) NOT NULL, "
+                        "created_at DATETIME2 NULL",
+                        comments,
+                        [(pyodbc.SQL_INTEGER, 0, 0), (pyodbc.SQL_INTEGER, 0, 0),
+                         (pyodbc.SQL_WLONGVARCHAR, 0, 0), (pyodbc.SQL_TYPE_TIMESTAMP, 27, 7)],
+                    )
+                    cursor.execute(f"""
+                        INSERT INTO Comments (ticket_id, user_id, comment, created_at)
+                        SELECT i.id, c.user_id, c.comment, COALESCE(c.created_at, GETDATE())
+                        FROM {COMMENTS_TABLE} c
+                        JOIN {IDS_TABLE} i ON i.item_index = c.item_index
+                    """)
+                    # Los tickets importados nacen con comments_count = 0
+                    cursor.execute(f"""
+                        UPDATE t SET comments_count = n.total
+                        FROM Tickets t
+                        JOIN (
+                            SELECT i.id, COUNT(*) as total
+                            FROM {COMMENTS_TABLE} c
+                            JOIN {IDS_TABLE} i ON i.item_index = c.item_index
+                            GROUP BY i.id
+                        ) n ON n.id = t.id
+                    """)
+            cursor.execute("""
+                UPDATE ImportCheckpoints
+                SET position = ?, imported = ?, rejected = ?, updated_at = GETDATE(),
+                    lease_expires_at = DATEADD(SECOND, ?, GETDATE())
+                WHERE job = ? AND owner = ?
+            """, (position, imported, rejected, lease_seconds, job, owner))
+            if cursor.rowcount != 1:
+                raise ImportLeaseLost(f"El lease de la importación '{job}' expiró")
+        finally:
+            drop_tables(cursor, TICKETS_TABLE, IDS_TABLE, COMMENTS_TABLE)
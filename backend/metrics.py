@@ -0,0 +1,164 @@
+import re
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Optional
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, REGISTRY
+from starlette.routing import Match
+
+# ==================== HTTP ====================
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Latencia de las peticiones HTTP por ruta",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Peticiones HTTP en curso",
+)
+
+# ==================== BASE DE DATOS ====================
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Duración de las queries por sentencia normalizada",
+    ["statement"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+DB_QUERY_ROWS = Histogram(
+    "db_query_rows",
+    "Filas retornadas o afectadas por sentencia normalizada",
+    ["statement"],
+    buckets=(0, 1, 10, 100, 1000, 10000, 100000),
+)
+DB_QUERY_ERRORS = Counter(
+    "db_query_errors_total",
+    "Queries que terminaron con error",
+    ["statement"],
+)
+DB_POOL_WAIT = Histogram(
+    "db_pool_wait_seconds",
+    "Tiempo de espera para obtener una conexión del pool",
+    buckets=(0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+
+_WHITESPACE = re.compile(r"\s+")
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+\b")
+_PLACEHOLDER_LIST = re.compile(r"\?(?:\s*,\s*\?)+")
+MAX_STATEMENT_LENGTH = 160
+
+
+@lru_cache(maxsize=2048)
+def normalize_statement(query: str, max_length: Optional[int] = MAX_STATEMENT_LENGTH) -> str:
+    """SQL sin literales ni espacios redundantes, apto como label de métrica"""
+    statement = _WHITESPACE.sub(" ", query).strip()
+    statement = _STRING_LITERAL.sub("?", statement)
+    statement = _NUMBER_LITERAL.sub("?", statement)
+    statement = _PLACEHOLDER_LIST.sub("?, ...", statement)
+    if max_length and len(statement) > max_length:
+        statement = statement[:max_length - 3] + "..."
+    return statement
+
+
+def observe_query(query: str, duration: float, rows: Optional[int]):
+    """Registrar la duración y filas de una query"""
+    statement = normalize_statement(query)
+    DB_QUERY_DURATION.labels(statement).observe(duration)
+    if rows is not None and rows >= 0:
+        DB_QUERY_ROWS.labels(statement).observe(rows)
+
+
+def observe_query_error(query: str):
+    """Registrar una query fallida"""
+    DB_QUERY_ERRORS.labels(normalize_statement(query)).inc()
+
+
+def observe_pool_wait(seconds: float):
+    """Registrar la espera de checkout del pool de conexiones"""
+    DB_POOL_WAIT.observe(seconds)
+
+
+class StatsCollector:
+    """Expone como métricas los contadores de un objeto con `stats()`"""
+
+    def __init__(self, prefix: str, stats: Callable[[], Dict], counters=(), gauges=()):
+        self.prefix = prefix
+        self._stats = stats
+        self.counters = counters
+        self.gauges = gauges
+
+    def collect(self):
+        data = self._stats()
+        for name in self.gauges:
+            yield GaugeMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", value=data.get(name, 0))
+        for name in self.counters:
+            yield CounterMetricFamily(f"{self.prefix}_{name}", f"{self.prefix} {name}", value=data.get(name, 0))
+
+
+def register_stats(prefix: str, stats: Callable[[], Dict], counters=(), gauges=()):
+    """Registrar un colector que lee `stats()` en cada scrape"""
+    REGISTRY.register(StatsCollector(prefix, stats, counters, gauges))
+
+
+# ==================== MIDDLEWARE ====================
+
+
+class PrometheusMiddleware:
+    """Middleware ASGI: latencia por plantilla de ruta y peticiones en curso"""
+
+    def __init__(self, app):
+        self.app = app
+        self._route_paths: Optional[Dict] = None
+
+    def _route_template(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if self._route_paths is None:
+            router = scope["app"].router
+            self._route_paths = {
+                getattr(route, "endpoint", None): route.path
+                for route in router.routes if hasattr(route, "path")
+            }
+        path = self._route_paths.get(endpoint)
+        if path is None:
+            # Endpoints montados o agregados después del primer request
+            path = "unmatched"
+            for route in scope["app"].router.routes:
+                if route.matches(scope)[0] == Match.FULL:
+                    path = getattr(route, "path", "unmatched")
+                    break
+            self._route_paths[endpoint] = path
+        return path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_FLIGHT.dec()
+            REQUEST_LATENCY.labels(
+                scope["method"], self._route_template(scope), str(status_code)
+            ).observe(time.perf_counter() - start)
+
+
+def render_latest():
+    """Cuerpo y content-type de la exposición de Prometheus"""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,124 @@
+import asyncio
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from config import settings
+
+# Los hashes con menos rondas que BCRYPT_ROUNDS se marcan como obsoletos
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+)
+
+
+class PasswordHasherBusy(Exception):
+    """La cola de trabajos de contraseñas está llena"""
+
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+class PasswordHasher:
+    """Ejecuta bcrypt fuera del event loop con límites de admisión
+
+    Como máximo `max_concurrency` trabajos corren a la vez en el executor y
+    hasta `max_queue` esperan turno; por encima de eso se rechaza la petición
+    para que una avalancha de logins no acapare el worker.
+    """
+
+    def __init__(
+        self,
+        mode: str = "process",
+        workers: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        max_queue: int = 100,
+        queue_timeout: float = 10.0,
+    ):
+        if mode not in ("process", "thread", "inline"):
+            raise ValueError(f"Modo de executor inválido: {mode}")
+        self.mode = mode
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrency = max_concurrency or self.workers
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._pending = 0
+
+    def _get_executor(self) -> Optional[Executor]:
+        if self.mode == "inline":
+            return None
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _submit(self, func, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._pending >= self.max_concurrency + self.max_queue:
+            raise PasswordHasherBusy("Demasiadas solicitudes de autenticación")
+
+        self._pending += 1
+        try:
+            try:
+                await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise PasswordHasherBusy("Tiempo de espera agotado en la cola de autenticación")
+            try:
+                executor = self._get_executor()
+                if executor is None:
+                    return func(*args)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(executor, func, *args)
+            finally:
+                self._semaphore.release()
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        """Hashear una contraseña"""
+        return await self._submit(_hash_password, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verificar una contraseña; retorna un nuevo hash si el actual está obsoleto"""
+        return await self._submit(_verify_and_update, plain_password, hashed_password)
+
+    def stats(self) -> dict:
+        """Estado de la cola de contraseñas"""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+        }
+
+    def close(self):
+        """Detener el executor de contraseñas"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    mode=settings.PASSWORD_EXECUTOR,
+    workers=settings.PASSWORD_WORKERS or None,
+    max_concurrency=settings.PASSWORD_MAX_CONCURRENCY or None,
+    max_queue=settings.PASSWORD_MAX_QUEUE,
+    queue_timeout=settings.PASSWORD_QUEUE_TIMEOUT,
+)
@@ -0,0 +1,164 @@
+import contextvars
+import json
+import logging
+import os
+import random
+import re
+import threading
+from datetime import datetime, timezone
+from logging.handlers import RotatingFileHandler
+from typing import Any, Dict, Optional, Sequence
+
+from metrics import normalize_statement
+
+PLAN_MODES = ("", "statistics", "showplan")
+
+# Scope ASGI de la petición en curso; el router completa "endpoint" al resolver la ruta
+request_scope: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_scope", default=None)
+
+
+def param_shape(value: Any) -> str:
+    """Tipo (y largo en textos/binarios) de un parámetro, nunca su valor"""
+    if value is None:
+        return "null"
+    name = type(value).__name__
+    if isinstance(value, (str, bytes, bytearray)):
+        return f"{name}[{len(value)}]"
+    return name
+
+
+def current_endpoint() -> Optional[str]:
+    """Método y endpoint que originó la query, si corre dentro de una petición"""
+    scope = request_scope.get()
+    if scope is None:
+        return None
+    endpoint = scope.get("endpoint")
+    name = getattr(endpoint, "__name__", None) or scope.get("path")
+    return f"{scope.get('method')} {name}"
+
+
+# Literales y comentarios se quitan antes de buscar verbos que escriben
+_LITERALS_AND_COMMENTS = re.compile(r"'(?:[^']|'')*'|--[^\n]*|/\*.*?\*/", re.S)
+_WRITE_VERBS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE|INTO|EXEC|EXECUTE|TRUNCATE|DROP|ALTER|CREATE)\b", re.I)
+
+
+def is_read_only(query: str) -> bool:
+    """SELECT (o WITH ... SELECT) sin DML: se puede volver a ejecutar
+
+    Un WITH puede terminar en UPDATE/DELETE/INSERT/MERGE y SELECT ... INTO
+    crea una tabla, así que se rechaza cualquier verbo de escritura.
+    """
+    text = _LITERALS_AND_COMMENTS.sub(" ", query).strip()
+    head = text.split(None, 1)[0].upper() if text else ""
+    return head in ("SELECT", "WITH") and not _WRITE_VERBS.search(text)
+
+
+class SlowQueryLog:
+    """Log JSON rotativo de las queries que superan `threshold_ms`
+
+    Con `plan_mode` se adjunta, para una muestra de las queries lentas, la
+    salida de SET STATISTICS IO/TIME o el plan estimado (SHOWPLAN_XML).
+    """
+
+    def __init__(
+        self,
+        threshold_ms: float = 500,
+        path: str = "./logs/slow_queries.log",
+        max_bytes: int = 10485760,
+        backups: int = 5,
+        plan_mode: str = "",
+        plan_sample_rate: float = 0.1,
+    ):
+        if plan_mode not in PLAN_MODES:
+            raise ValueError(f"Modo de captura de plan inválido: {plan_mode}")
+        self.threshold = threshold_ms / 1000
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.plan_mode = plan_mode
+        self.plan_sample_rate = plan_sample_rate
+        self._logger: Optional[logging.Logger] = None
+        self._lock = threading.Lock()
+        self._stats = {"logged": 0, "plans_captured": 0, "plan_failures": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold > 0
+
+    def is_slow(self, duration: float) -> bool:
+        return self.enabled and duration >= self.threshold
+
+    def wants_plan(self, query: str) -> bool:
+        """Decidir si capturar el plan de una query lenta (según muestreo)"""
+        if not self.plan_mode or random.random() >= self.plan_sample_rate:
+            return False
+        # STATISTICS vuelve a ejecutar la sentencia: solo lecturas
+        return self.plan_mode == "showplan" or is_read_only(query)
+
+    def _get_logger(self) -> logging.Logger:
+        if self._logger is None:
+            with self._lock:
+                if self._logger is None:
+                    directory = os.path.dirname(self.path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    handler = RotatingFileHandler(
+                        self.path, maxBytes=self.max_bytes, backupCount=self.backups, encoding="utf-8"
+                    )
+                    handler.setFormatter(logging.Formatter("%(message)s"))
+                    logger = logging.getLogger("proyev.slow_queries")
+                    logger.setLevel(logging.INFO)
+                    logger.propagate = False
+                    logger.addHandler(handler)
+                    self._logger = logger
+        return self._logger
+
+    def record(
+        self,
+        query: str,
+        params: Optional[Sequence],
+        duration: float,
+        rowcount: Optional[int],
+        plan: Optional[Dict[str, Any]] = None,
+    ):
+        """Escribir una línea JSON con la query lenta"""
+        entry = {
+            "ts": datetime.now(timezone.utc).isoformat(),
+            "duration_ms": round(duration * 1000, 2),
+            "statement": normalize_statement(query, None),
+            "params": [param_shape(value) for value in params or ()],
+            "rowcount": rowcount,
+            "endpoint": current_endpoint(),
+        }
+        if plan is not None:
+            entry["plan"] = plan
+            self._stats["plans_captured"] += 1
+        try:
+            self._get_logger().info(json.dumps(entry, ensure_ascii=False, default=str))
+            self._stats["logged"] += 1
+        except Exception as e:
+            print(f"❌ Error escribiendo slow query log: {e}")
+
+    def plan_failed(self):
+        self._stats["plan_failures"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Contadores del log de queries lentas"""
+        return {**self._stats, "threshold_ms": self.threshold * 1000, "plan_mode": self.plan_mode}
+
+
+class QueryContextMiddleware:
+    """Middleware ASGI que deja disponible el scope para el log de queries lentas"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        token = request_scope.set(scope)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_scope.reset(token)
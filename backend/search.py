@@ -0,0 +1,142 @@
+import base64
+import json
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from database import record_type
+
+# Términos de la consulta del usuario que se envían a CONTAINSTABLE
+MAX_TERMS = 8
+MIN_TERM_LENGTH = 2
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# Índices de texto completo (schema.sql / migración 006). Cada fuente aporta
+# su RANK; el título pesa el doble y los comentarios suman al ticket.
+# `{top}` limita cada CONTAINSTABLE a los N mejores (top_n_by_rank) y
+# `{scope}` restringe las coincidencias a los tickets de un cliente antes de
+# rankear; `source_hits` (documentos de la fuente más grande, ya acotada)
+# dice si el tope recortó. El cursor va en el JOIN y no en el WHERE: las
+# filas que quedan atrás llegan como relleno (t.id NULL) al final, para que
+# source_hits llegue aunque la página quede vacía.
+SEARCH_QUERY = """
+    WITH hits AS (
+        SELECT ft.[KEY] as ticket_id, ft.RANK * 2 as score, 1 as source
+        FROM CONTAINSTABLE(Tickets, title, ?{top}) ft{scope}
+        UNION ALL
+        SELECT ft.[KEY], ft.RANK, 2
+        FROM CONTAINSTABLE(Tickets, description, ?{top}) ft{scope}
+        UNION ALL
+        SELECT c.ticket_id, ft.RANK, 3
+        FROM CONTAINSTABLE(Comments, comment, ?{top}) ft
+        JOIN Comments c ON c.id = ft.[KEY]{comment_scope}
+    ),
+    counted AS (
+        SELECT ticket_id, score, COUNT(*) OVER (PARTITION BY source) as source_hits
+        FROM hits
+    ),
+    ranked AS (
+        SELECT ticket_id, SUM(score) as score,
+               MAX(MAX(source_hits)) OVER () as source_hits
+        FROM counted GROUP BY ticket_id
+    )
+    SELECT TOP (?) {columns}, r.source_hits
+    FROM ranked r
+    LEFT JOIN Tickets t ON t.id = r.ticket_id{filters}
+    LEFT JOIN Users u ON t.user_id = u.id
+    LEFT JOIN Users a ON t.assigned_to = a.id
+    ORDER BY CASE WHEN t.id IS NULL THEN 1 ELSE 0 END, r.score DESC, t.id DESC
+"""
+
+# Filtro por cliente dentro de cada fuente (índice por Tickets.user_id)
+TICKET_SCOPE = "\n        JOIN Tickets s ON s.id = ft.[KEY] AND s.user_id = ?"
+COMMENT_SCOPE = "\n        JOIN Tickets s ON s.id = c.ticket_id AND s.user_id = ?"
+
+SEARCH_COLUMNS = (
+    "t.id, t.title, SUBSTRING(t.description, 1, 200) as description, t.status, t.priority, "
+    "t.created_at, u.username as created_by, a.username as assigned_to_name, r.score"
+)
+
+
+def search_condition(text: str) -> Optional[str]:
+    """Texto libre -> condición de CONTAINS: todos los términos, como prefijo
+
+    'Impresora red' -> '"impresora*" AND "red*"'. Solo se conservan
+    caracteres de palabra, así que la entrada no puede alterar la sintaxis.
+    """
+    terms = []
+    for term in _WORD.findall(text.lower()):
+        if len(term) >= MIN_TERM_LENGTH and term not in terms:
+            terms.append(term)
+    if not terms:
+        return None
+    return " AND ".join(f'"{term}*"' for term in terms[:MAX_TERMS])
+
+
+def encode_search_cursor(score: int, ticket_id: int) -> str:
+    """Cursor opaco de paginación keyset sobre (score, id)"""
+    raw = json.dumps([score, ticket_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_search_cursor(cursor: str) -> Tuple[int, int]:
+    """Decodificar un cursor de encode_search_cursor; ValueError si es inválido"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return int(score), int(ticket_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError("Cursor inválido") from e
+
+
+class SearchPage(list):
+    """Resultados de una página; `source_hits` viene de la última columna"""
+
+    __slots__ = ("source_hits",)
+
+    def truncated(self, max_candidates: Optional[int]) -> bool:
+        """Si algún índice llegó al tope y pudo dejar fuera resultados"""
+        return bool(max_candidates) and self.source_hits >= max_candidates
+
+
+def search_rows(columns: Sequence[str], rows: List[Any]) -> SearchPage:
+    """Row factory de SEARCH_QUERY: registros sin source_hits ni filas de relleno"""
+    record = record_type(tuple(columns[:-1]))
+    page = SearchPage(record(*row[:-1]) for row in rows if row[0] is not None)
+    page.source_hits = rows[0][-1] if rows else 0
+    return page
+
+
+def build_search_query(
+    condition: str,
+    limit: int,
+    user_id: Optional[int] = None,
+    max_candidates: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[str, List]:
+    """Query y parámetros de una página de resultados
+
+    `user_id` restringe cada fuente a los tickets de un cliente antes de
+    rankear. `max_candidates` acota cuántos documentos devuelve cada índice
+    y solo aplica sin `user_id`: el tope global dejaría fuera tickets del
+    cliente que rankean por debajo de los de otros usuarios.
+    """
+    top = scope = comment_scope = ""
+    source_params = [condition]
+    if user_id is not None:
+        scope, comment_scope = TICKET_SCOPE, COMMENT_SCOPE
+        source_params.append(user_id)
+    elif max_candidates:
+        top = ", ?"
+        source_params.append(max_candidates)
+
+    filters = ""
+    params = []
+    if cursor:
+        score, ticket_id = decode_search_cursor(cursor)
+        filters += " AND (r.score < ? OR (r.score = ? AND t.id < ?))"
+        params.extend([score, score, ticket_id])
+
+    query = SEARCH_QUERY.format(
+        top=top, scope=scope, comment_scope=comment_scope, columns=SEARCH_COLUMNS, filters=filters
+    )
+    return query, [*source_params * 3, limit + 1, *params]
@@ -1,17 +1,38 @@
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile
+from fastapi import FastAPI, HTTPException, Depends, status, Query, Request, Response, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
-from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, EmailStr
-from typing import Optional, List
+from typing import Optional, List, Tuple, Dict, Callable
 from datetime import datetime, timedelta
 import jwt
-from passlib.context import CryptContext
+import json
+import base64
+import hashlib
+import asyncio
 import os
+import time
 from pathlib import Path
 
 from config import settings
-from database import db
+from database import db, adb, record_rows, tuple_rows
+from fastjson import FastJSONResponse
+from passwords import password_hasher, PasswordHasherBusy
+from cache import TTLCache, ReadThroughCache, create_backend
+from stats import StatsService
+from assignment import AssignmentEngine, drain_backlog
+from search import build_search_query, encode_search_cursor, search_condition, search_rows
+import activity
+from uploads import ContentStore, StreamingUploadParser, serve_upload, etag_matches
+from thumbnails import ThumbnailPipeline, preview_paths
+import metrics
+from querylog import QueryContextMiddleware
+from exports import EXPORT_COLUMNS, EXPORT_CREATED_AT, EXPORT_FORMATS, stream_export
+import bulk
+from events import TicketEventBus, TICKET_CREATED, TICKET_UPDATED, TICKET_DELETED
+from importer import READ_BUFFER, ImportProgress, TicketImporter, import_owner
+from google_oauth import close_http_client
 
 # Crear app FastAPI
 app = FastAPI(
@@ -29,15 +50,93 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Search-Truncated", "ETag", "Content-Range", "Accept-Ranges"],
 )
 
+# Métricas de Prometheus (latencia por ruta y peticiones en curso)
+app.add_middleware(metrics.PrometheusMiddleware)
+
+# Endpoint en curso para el log de queries lentas
+app.add_middleware(QueryContextMiddleware)
+
 # Crear carpeta de uploads
 settings.create_upload_folder()
-app.mount("/uploads", StaticFiles(directory=settings.UPLOAD_FOLDER), name="uploads")
+content_store = ContentStore(settings.UPLOAD_FOLDER)
+thumbnail_pipeline = ThumbnailPipeline(
+    sizes=settings.THUMBNAIL_SIZES,
+    preview_size=settings.THUMBNAIL_PREVIEW_SIZE,
+    workers=settings.THUMBNAIL_WORKERS,
+    queue_size=settings.THUMBNAIL_QUEUE_SIZE,
+    enabled=settings.THUMBNAILS_ENABLED
+)
 
 # Configuración de seguridad
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="auth/login")
+# Canal de eventos: EventSource no envía headers, el token también se acepta por query
+oauth2_optional = OAuth2PasswordBearer(tokenUrl="auth/login", auto_error=False)
+
+# Cache del usuario autenticado (id -> fila de Users)
+# La API no modifica ni elimina usuarios: los cambios hechos en la base
+# (rol, email, bajas) se ven al expirar PRINCIPAL_CACHE_TTL, o al expirar
+# el token si AUTH_TRUST_TOKEN_CLAIMS está activo.
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL
+)
+PRINCIPAL_CLAIMS = ("username", "email", "role", "created_at")
+
+# Cache read-through de lecturas por id (tickets y usuarios)
+response_cache = ReadThroughCache(
+    create_backend(
+        settings.RESPONSE_CACHE_BACKEND,
+        url=settings.RESPONSE_CACHE_URL,
+        maxsize=settings.RESPONSE_CACHE_SIZE,
+        ttl=settings.RESPONSE_CACHE_TTL
+    ),
+    ttl=settings.RESPONSE_CACHE_TTL
+)
+
+# Estadísticas del dashboard (cache corto + single-flight)
+stats_service = StatsService(adb, ttl=settings.STATS_CACHE_TTL, source=settings.STATS_SOURCE)
+
+# Asignación automática: técnicos ordenados por carga pendiente
+assignment_engine = AssignmentEngine(resync_interval=settings.ASSIGNMENT_RESYNC_INTERVAL)
+
+# Cambios de tickets en vivo (SSE)
+ticket_events = TicketEventBus(
+    history_size=settings.EVENTS_HISTORY_SIZE,
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    heartbeat=settings.EVENTS_HEARTBEAT
+)
+
+# Importaciones masivas: el lease en ImportCheckpoints evita dos ejecuciones
+# del mismo job; import_jobs guarda el avance de las de este proceso (las
+# terminadas se descartan pasado IMPORT_JOB_RETENTION)
+ticket_importer = TicketImporter(
+    db,
+    batch_size=settings.IMPORT_BATCH_SIZE,
+    max_errors=settings.IMPORT_MAX_ERRORS,
+    lease_seconds=settings.IMPORT_LEASE_SECONDS
+)
+import_jobs: Dict[str, ImportProgress] = {}
+import_tasks = set()
+
+# Contadores internos expuestos en /metrics
+metrics.register_stats(
+    "db_pool", db.pool_stats,
+    counters=("connections_created", "connections_discarded", "checkouts", "waits", "timeouts", "ping_failures"),
+    gauges=("size", "idle", "in_use", "max_size")
+)
+metrics.register_stats("principal_cache", principal_cache.stats, counters=("hits", "misses", "evictions"), gauges=("size",))
+metrics.register_stats("response_cache", response_cache.stats, counters=("hits", "misses", "loads", "errors"), gauges=("size",))
+metrics.register_stats("password_hasher", password_hasher.stats, gauges=("pending",))
+metrics.register_stats("slow_query_log", db.slow_query_log.stats, counters=("logged", "plans_captured", "plan_failures"))
+metrics.register_stats("events", ticket_events.stats, counters=("published", "dropped_subscribers"), gauges=("subscribers",))
+metrics.register_stats(
+    "thumbnails", thumbnail_pipeline.stats,
+    counters=("queued", "generated", "skipped", "dropped", "failed"),
+    gauges=("pending",)
+)
 
 # ==================== MODELOS PYDANTIC ====================
 
@@ -76,6 +175,21 @@ class TicketUpdate(BaseModel):
     priority: Optional[str] = None
     assigned_to: Optional[int] = None
 
+class TicketBulkUpdateItem(BaseModel):
+    id: int
+    status: Optional[str] = None
+    priority: Optional[str] = None
+    assigned_to: Optional[int] = None
+
+class BulkTicketCreate(BaseModel):
+    items: List[TicketCreate]
+
+class BulkTicketUpdate(BaseModel):
+    items: List[TicketBulkUpdateItem]
+
+class BulkTicketDelete(BaseModel):
+    ids: List[int]
+
 class TicketResponse(TicketBase):
     id: int
     user_id: int
@@ -85,19 +199,177 @@ class TicketResponse(TicketBase):
     updated_at: datetime
     created_by: Optional[str]
     assigned_to_name: Optional[str]
+    version: Optional[str] = None
+    comments_count: int = 0
+    attachments_count: int = 0
     
     class Config:
         from_attributes = True
 
+class CommentCreate(BaseModel):
+    comment: str
+
+class CommentResponse(BaseModel):
+    id: int
+    ticket_id: int
+    user_id: int
+    user_name: Optional[str]
+    comment: str
+    created_at: datetime
+
+class AttachmentResponse(BaseModel):
+    id: int
+    ticket_id: int
+    filename: str
+    file_url: str
+    thumbnail_url: Optional[str]
+    preview_url: Optional[str]
+    file_size: int
+    content_type: Optional[str]
+    uploaded_by: int
+    uploaded_by_name: Optional[str]
+    uploaded_at: datetime
+
 # ==================== UTILIDADES ====================
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verificar contraseña"""
-    return pwd_context.verify(plain_password, hashed_password)
+# Versión de fila (rowversion) como texto '0x...' para ETag / If-Match
+VERSION_COLUMN = "CONVERT(VARCHAR(18), {alias}.row_version, 1) as version"
+# Listado y detalle: exactamente los campos de TicketResponse, en su orden,
+# para serializar las filas sin validarlas una por una (y sin el rowversion
+# binario, que no pasa por el cache JSON)
+TICKET_LIST_COLUMNS = (
+    "t.title, t.description, t.priority, t.id, t.user_id, t.status, t.assigned_to, "
+    "t.created_at, t.updated_at, u.username as created_by, a.username as assigned_to_name, "
+    + VERSION_COLUMN.format(alias="t")
+    + ", t.comments_count, t.attachments_count"
+)
+# Lo que puede cambiar en una fila del listado: id, rowversion y los nombres del join
+TICKET_VALIDATOR_COLUMNS = (
+    "t.id, " + VERSION_COLUMN.format(alias="t") + ", u.username as created_by, a.username as assigned_to_name"
+)
+USER_LIST_COLUMNS = "username, email, role, id, created_at"
+# Colas del técnico: solo lo que muestra la tarjeta del dashboard. El filtro
+# y el orden salen del índice idx_tickets_queue (assigned_to, status, created_at, id)
+QUEUE_COLUMNS = (
+    "t.id, t.title, SUBSTRING(t.description, 1, 200) as description, t.status, t.priority, "
+    "t.created_at, u.username as created_by"
+)
+OPEN_STATUSES = ("abierto", "en_proceso")
+DONE_STATUSES = ("resuelto", "cerrado")
+TICKET_FROM = """
+    FROM Tickets t
+    LEFT JOIN Users u ON t.user_id = u.id
+    LEFT JOIN Users a ON t.assigned_to = a.id
+"""
+
+def ticket_etag(version: Optional[str]) -> str:
+    """ETag fuerte a partir del rowversion del ticket"""
+    return f'"{version}"'
+
+# Las lecturas se revalidan siempre (If-None-Match) y no se comparten entre usuarios
+REVALIDATE_CACHE_CONTROL = "private, no-cache"
+
+def collection_etag(*parts) -> str:
+    """ETag débil de un listado a partir de sus validadores (conteo, versión máxima, filtros)"""
+    digest = hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+def not_modified(etag: str) -> Response:
+    """304 sin cuerpo: no se consulta ni serializa el listado"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    )
+
+def parse_if_match(value: Optional[str]) -> Optional[bytes]:
+    """Convertir un header If-Match en el rowversion esperado"""
+    if not value or value.strip() == "*":
+        return None
+    tag = value.strip()
+    if tag.startswith("W/"):
+        tag = tag[2:]
+    tag = tag.strip('"')
+    try:
+        return bytes.fromhex(tag[2:] if tag.lower().startswith("0x") else tag)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="If-Match inválido")
+
+def encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    """Cursor opaco de paginación keyset sobre (created_at, id)"""
+    raw = json.dumps([created_at.isoformat(), ticket_id]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
 
-def get_password_hash(password: str) -> str:
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """Decodificar un cursor generado por encode_cursor"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+class TicketFilters:
+    """Filtros de listado de tickets (query params)"""
+    
+    def __init__(
+        self,
+        status_filter: Optional[str] = Query(None, alias="status"),
+        priority: Optional[str] = None,
+        assigned_to: Optional[int] = None,
+        user_id: Optional[int] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ):
+        self.status = status_filter
+        self.priority = priority
+        self.assigned_to = assigned_to
+        self.user_id = user_id
+        self.created_from = created_from
+        self.created_to = created_to
+    
+    def where(self, current_user: dict) -> Tuple[List[str], List]:
+        """Condiciones WHERE y parámetros, aplicando la visibilidad por rol"""
+        clauses = []
+        params = []
+        if current_user['role'] == 'cliente':
+            # Clientes solo ven sus tickets
+            clauses.append("t.user_id = ?")
+            params.append(current_user['id'])
+        elif self.user_id is not None:
+            clauses.append("t.user_id = ?")
+            params.append(self.user_id)
+        if self.status is not None:
+            clauses.append("t.status = ?")
+            params.append(self.status)
+        if self.priority is not None:
+            clauses.append("t.priority = ?")
+            params.append(self.priority)
+        if self.assigned_to is not None:
+            clauses.append("t.assigned_to = ?")
+            params.append(self.assigned_to)
+        if self.created_from is not None:
+            clauses.append("t.created_at >= ?")
+            params.append(self.created_from)
+        if self.created_to is not None:
+            clauses.append("t.created_at < ?")
+            params.append(self.created_to)
+        return clauses, params
+
+async def verify_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verificar contraseña; retorna también un nuevo hash si el actual está obsoleto"""
+    return await password_hasher.verify_and_update(plain_password, hashed_password)
+
+async def get_password_hash(password: str) -> str:
     """Hashear contraseña"""
-    return pwd_context.hash(password)
+    return await password_hasher.hash(password)
+
+def password_busy_exception() -> HTTPException:
+    """Respuesta cuando la cola de autenticación está saturada"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de autenticación saturado, intente nuevamente",
+        headers={"Retry-After": "1"},
+    )
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Crear token JWT"""
@@ -110,6 +382,42 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def principal_claims(user: dict) -> dict:
+    """Claims del usuario que se firman dentro del token"""
+    return {
+        "sub": str(user['id']),
+        "username": user['username'],
+        "email": user['email'],
+        "role": user['role'],
+        "created_at": user['created_at'].isoformat() if user['created_at'] else None
+    }
+
+def visibility_scope(current_user: dict) -> str:
+    """Alcance de lo que ve el usuario: sus tickets (cliente) o todos (staff)"""
+    return f"user:{current_user['id']}" if current_user['role'] == 'cliente' else "staff"
+
+async def invalidate_ticket(ticket_id: int, owner_id: Optional[int]):
+    """Invalidar un ticket cacheado en todos los alcances que pueden verlo"""
+    keys = [f"ticket:{ticket_id}:staff"]
+    if owner_id is not None:
+        keys.append(f"ticket:{ticket_id}:user:{owner_id}")
+    await response_cache.invalidate(*keys)
+
+# Los eventos llevan solo campos de TicketResponse (nunca row_version ni
+# otras columnas internas de OUTPUT INSERTED.*)
+TICKET_EVENT_FIELDS = tuple(TicketResponse.model_fields)
+
+def publish_ticket_event(event_type: str, ticket: dict):
+    """Publicar un cambio de ticket con los campos de TicketResponse que trae `ticket`"""
+    ticket_events.publish(event_type, {key: ticket[key] for key in TICKET_EVENT_FIELDS if key in ticket})
+
+async def refresh_assignments():
+    """Reconstruir las cargas de técnicos desde la base (tras escrituras masivas)"""
+    try:
+        await assignment_engine.load(adb)
+    except Exception as e:
+        print(f"⚠️  No se pudo cargar la asignación automática: {e}")
+
 async def get_current_user(token: str = Depends(oauth2_scheme)):
     """Obtener usuario actual desde el token"""
     credentials_exception = HTTPException(
@@ -122,15 +430,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
         user_id: int = payload.get("sub")
         if user_id is None:
             raise credentials_exception
-    except jwt.PyJWTError:
+        user_id = int(user_id)
+    except (jwt.PyJWTError, ValueError):
         raise credentials_exception
     
+    # Modo sin consultas: el token firmado ya trae username, email y rol
+    if settings.AUTH_TRUST_TOKEN_CLAIMS and all(claim in payload for claim in PRINCIPAL_CLAIMS):
+        user = {claim: payload[claim] for claim in PRINCIPAL_CLAIMS}
+        user['id'] = user_id
+        return user
+    
+    user = principal_cache.get(user_id)
+    if user is not None:
+        return user
+    
     # Obtener usuario de la base de datos
     query = "SELECT id, username, email, role, created_at FROM Users WHERE id = ?"
-    users = db.execute_query(query, (user_id,))
-    if not users:
+    user = await adb.fetch_one(query, (user_id,))
+    if not user:
         raise credentials_exception
-    return users[0]
+    principal_cache.set(user_id, user)
+    return user
 
 # ==================== ENDPOINTS ====================
 
@@ -140,7 +460,21 @@ async def startup_event():
     print("🚀 Iniciando TechAssist API...")
     print(f"📊 Base de datos: {settings.DB_NAME}")
     print(f"🖥️  Servidor: {settings.DB_SERVER}")
-    db.test_connection()
+    await adb.run(db.test_connection)
+    thumbnail_pipeline.start()
+    await refresh_assignments()
+    assignment_engine.start(adb)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Evento al detener la aplicación"""
+    await thumbnail_pipeline.stop()
+    await assignment_engine.stop()
+    await response_cache.close()
+    await close_http_client()
+    password_hasher.close()
+    adb.close()
+    db.close()
 
 @app.get("/")
 async def root():
@@ -152,21 +486,57 @@ async def root():
         "health": "/api/health"
     }
 
+@app.get("/api/events")
+async def stream_ticket_events(
+    token: Optional[str] = Depends(oauth2_optional),
+    access_token: Optional[str] = Query(None),
+    last_event_id: Optional[str] = Query(None),
+    last_event_id_header: Optional[str] = Header(None, alias="Last-Event-ID")
+):
+    """Cambios de tickets en vivo (Server-Sent Events)
+    
+    Los clientes solo reciben eventos de sus propios tickets. Al reconectar,
+    EventSource envía Last-Event-ID y se reenvían los eventos perdidos; si ya
+    no están en el historial se emite `reset` para recargar el listado.
+    """
+    token = token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="No autenticado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    current_user = await get_current_user(token)
+    return StreamingResponse(
+        ticket_events.stream(current_user, last_event_id_header or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Métricas en formato de exposición de Prometheus"""
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
 @app.get("/api/health")
 async def health_check():
     """Verificar el estado de la aplicación"""
+    def ping():
+        with db.get_cursor() as cursor:
+            cursor.execute("SELECT 1")
+    
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT 1")
-        cursor.close()
-        conn.close()
+        await adb.run(ping)
         
         return {
             "status": "healthy",
             "database": "connected",
             "server": settings.DB_SERVER,
-            "database_name": settings.DB_NAME
+            "database_name": settings.DB_NAME,
+            "pool": db.pool_stats(),
+            "principal_cache": principal_cache.stats(),
+            "response_cache": response_cache.stats()
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -174,25 +544,24 @@ async def health_check():
 @app.get("/api/test-db")
 async def test_database():
     """Probar conexión a la base de datos"""
+    def inspect():
+        with db.get_cursor() as cursor:
+            cursor.execute("SELECT @@VERSION")
+            version = cursor.fetchone()[0]
+            
+            cursor.execute("SELECT DB_NAME()")
+            db_name = cursor.fetchone()[0]
+            
+            cursor.execute("""
+                SELECT TABLE_NAME 
+                FROM INFORMATION_SCHEMA.TABLES 
+                WHERE TABLE_TYPE = 'BASE TABLE'
+            """)
+            tables = [row[0] for row in cursor.fetchall()]
+        return version, db_name, tables
+    
     try:
-        conn = db.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT @@VERSION")
-        version = cursor.fetchone()[0]
-        
-        cursor.execute("SELECT DB_NAME()")
-        db_name = cursor.fetchone()[0]
-        
-        cursor.execute("""
-            SELECT TABLE_NAME 
-            FROM INFORMATION_SCHEMA.TABLES 
-            WHERE TABLE_TYPE = 'BASE TABLE'
-        """)
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        cursor.close()
-        conn.close()
+        version, db_name, tables = await adb.run(inspect)
         
         return {
             "success": True,
@@ -211,21 +580,25 @@ async def register(user: UserCreate):
     try:
         # Verificar si el usuario ya existe
         check_query = "SELECT id FROM Users WHERE username = ? OR email = ?"
-        existing = db.execute_query(check_query, (user.username, user.email))
+        existing = await adb.fetch_one(check_query, (user.username, user.email))
         if existing:
             raise HTTPException(status_code=400, detail="Usuario o email ya existe")
         
         # Crear usuario
-        hashed_password = get_password_hash(user.password)
+        hashed_password = await get_password_hash(user.password)
         insert_query = """
             INSERT INTO Users (username, email, password_hash, role)
             OUTPUT INSERTED.id, INSERTED.username, INSERTED.email, INSERTED.role, INSERTED.created_at
             VALUES (?, ?, ?, ?)
         """
-        result = db.execute_query(insert_query, (user.username, user.email, hashed_password, user.role))
-        return result[0]
+        created = await adb.fetch_one(insert_query, (user.username, user.email, hashed_password, user.role))
+        if created['role'] == 'tecnico':
+            assignment_engine.add_technician(created['id'], created['username'])
+        return created
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise password_busy_exception()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -234,17 +607,26 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     """Login y obtener token"""
     try:
         query = "SELECT id, username, email, password_hash, role, created_at FROM Users WHERE email = ?"
-        users = db.execute_query(query, (form_data.username,))
+        user = await adb.fetch_one(query, (form_data.username,))
         
-        if not users or not verify_password(form_data.password, users[0]['password_hash']):
+        valid, new_hash = (False, None)
+        if user:
+            valid, new_hash = await verify_password(form_data.password, user['password_hash'])
+        if not valid:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Credenciales incorrectas",
                 headers={"WWW-Authenticate": "Bearer"},
             )
         
-        user = users[0]
-        access_token = create_access_token(data={"sub": user['id']})
+        # Rehash transparente si el hash usa parámetros obsoletos
+        if new_hash:
+            await adb.execute(
+                "UPDATE Users SET password_hash = ? WHERE id = ?",
+                (new_hash, user['id'])
+            )
+        
+        access_token = create_access_token(data=principal_claims(user))
         
         return {
             "access_token": access_token,
@@ -259,6 +641,8 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
         }
     except HTTPException:
         raise
+    except PasswordHasherBusy:
+        raise password_busy_exception()
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -270,74 +654,328 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 # ==================== USUARIOS ====================
 
 @app.get("/api/users", response_model=List[UserResponse])
-async def get_users(current_user: dict = Depends(get_current_user)):
-    """Obtener todos los usuarios"""
+async def get_users(
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Obtener todos los usuarios
+    
+    El ETag sale del conteo y del MAX(updated_at) (mantenido por trigger):
+    si coincide con If-None-Match se responde 304 sin leer el listado.
+    Las columnas siguen el orden de UserResponse y se codifican directo a JSON.
+    """
     if current_user['role'] not in ['admin', 'tecnico']:
         raise HTTPException(status_code=403, detail="No autorizado")
     
-    query = "SELECT id, username, email, role, created_at FROM Users ORDER BY created_at DESC"
-    return db.execute_query(query)
+    validator = await adb.fetch_one(
+        "SELECT COUNT_BIG(*) as total, MAX(updated_at) as last_updated FROM Users"
+    )
+    etag = collection_etag("users", validator['total'], validator['last_updated'])
+    if if_none_match and etag_matches(if_none_match, etag):
+        return not_modified(etag)
+    
+    query = f"SELECT {USER_LIST_COLUMNS} FROM Users ORDER BY created_at DESC"
+    users = await adb.fetch_all(query, row_factory=record_rows)
+    return FastJSONResponse(users, headers={"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL})
 
 @app.get("/api/users/{user_id}", response_model=UserResponse)
 async def get_user(user_id: int, current_user: dict = Depends(get_current_user)):
-    """Obtener un usuario por ID"""
+    """Obtener un usuario por ID (cacheado)"""
     query = "SELECT id, username, email, role, created_at FROM Users WHERE id = ?"
-    users = db.execute_query(query, (user_id,))
-    if not users:
+    user = await response_cache.get_or_load(
+        f"user:{user_id}", lambda: adb.fetch_one(query, (user_id,))
+    )
+    if not user:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return users[0]
+    return user
 
 # ==================== TICKETS ====================
 
 @app.get("/api/tickets", response_model=List[TicketResponse])
-async def get_tickets(current_user: dict = Depends(get_current_user)):
-    """Obtener tickets según el rol del usuario"""
+async def get_tickets(
+    filters: TicketFilters = Depends(),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    limit: int = Query(50, ge=1, le=settings.TICKETS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Obtener tickets según el rol del usuario
+    
+    La respuesta siempre se pagina por keyset sobre (created_at, id), 50
+    tickets por defecto, y el cursor de la página siguiente se devuelve en
+    el header X-Next-Cursor. El listado completo es /api/tickets/export.
+    
+    El ETag sale de las filas de la página (más la fila extra que decide si
+    hay siguiente): id, rowversion y nombres del join. Solo con If-None-Match
+    se leen antes esas columnas por el mismo índice que la página; si el ETag
+    coincide se responde 304 sin leer ni serializar los tickets.
+    
+    Las filas se materializan como registros compactos y se codifican directo
+    a JSON (orjson), sin validar cada una contra TicketResponse.
+    """
+    clauses, params = filters.where(current_user)
+    
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        op = "<" if order == "desc" else ">"
+        clauses.append(f"(t.created_at {op} ? OR (t.created_at = ? AND t.id {op} ?))")
+        params.extend([created_at, created_at, ticket_id])
+    
+    where = " WHERE " + " AND ".join(clauses) if clauses else ""
+    direction = "DESC" if order == "desc" else "ASC"
+    order_by = f" ORDER BY t.created_at {direction}, t.id {direction}"
+    top = "TOP (?) "
+    page_params = [limit + 1, *params]
+    
+    def page_etag(rows) -> str:
+        return collection_etag("tickets", rows, clauses, params, order, limit)
+    
     try:
-        if current_user['role'] == 'cliente':
-            # Clientes solo ven sus tickets
-            query = """
-                SELECT t.*, u.username as created_by, a.username as assigned_to_name
-                FROM Tickets t
-                LEFT JOIN Users u ON t.user_id = u.id
-                LEFT JOIN Users a ON t.assigned_to = a.id
-                WHERE t.user_id = ?
-                ORDER BY t.created_at DESC
-            """
-            return db.execute_query(query, (current_user['id'],))
-        else:
-            # Admin y técnicos ven todos los tickets
-            query = """
-                SELECT t.*, u.username as created_by, a.username as assigned_to_name
-                FROM Tickets t
-                LEFT JOIN Users u ON t.user_id = u.id
-                LEFT JOIN Users a ON t.assigned_to = a.id
-                ORDER BY t.created_at DESC
-            """
-            return db.execute_query(query)
+        if if_none_match:
+            validator = await adb.fetch_all(
+                f"SELECT {top}{TICKET_VALIDATOR_COLUMNS} {TICKET_FROM}{where}{order_by}",
+                tuple(page_params), row_factory=tuple_rows
+            )
+            etag = page_etag([tuple(row) for row in validator])
+            if etag_matches(if_none_match, etag):
+                return not_modified(etag)
+        
+        query = f"SELECT {top}{TICKET_LIST_COLUMNS} {TICKET_FROM}{where}{order_by}"
+        tickets = await adb.fetch_all(query, tuple(page_params), row_factory=record_rows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    etag = page_etag([(t.id, t.version, t.created_by, t.assigned_to_name) for t in tickets])
+    headers = {"ETag": etag, "Cache-Control": REVALIDATE_CACHE_CONTROL}
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return FastJSONResponse(tickets, headers=headers)
+
+@app.get("/api/tickets/export")
+async def export_tickets(
+    filters: TicketFilters = Depends(),
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    current_user: dict = Depends(get_current_user)
+):
+    """Exportar tickets en streaming (NDJSON o CSV) con la misma visibilidad que el listado
+    
+    Las filas se leen en lotes por keyset sobre (created_at, id) y se
+    codifican a medida que llegan: la memoria no crece con el número de
+    tickets y cada lote toma una conexión del pool solo mientras dura su
+    consulta, así un cliente que descarga lento no retiene conexiones.
+    """
+    clauses, params = filters.where(current_user)
+    batches = export_batches(clauses, params, order, settings.EXPORT_BATCH_SIZE)
+    filename = f"tickets-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        stream_export(batches, export_format),
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+async def export_batches(clauses: List[str], params: List, order: str, batch_size: int):
+    """Lotes de EXPORT_COLUMNS, una consulta TOP (?) por lote continuando desde el último"""
+    direction = "DESC" if order == "desc" else "ASC"
+    op = "<" if order == "desc" else ">"
+    order_by = f" ORDER BY t.created_at {direction}, t.id {direction}"
+    last = None
+    while True:
+        page_clauses, page_params = list(clauses), [batch_size, *params]
+        if last is not None:
+            page_clauses.append(f"(t.created_at {op} ? OR (t.created_at = ? AND t.id {op} ?))")
+            page_params.extend([last[1], last[1], last[0]])
+        where = " WHERE " + " AND ".join(page_clauses) if page_clauses else ""
+        rows = await adb.fetch_all(
+            f"SELECT TOP (?) {EXPORT_COLUMNS} {TICKET_FROM}{where}{order_by}",
+            tuple(page_params), row_factory=tuple_rows
+        )
+        if rows:
+            yield rows
+        if len(rows) < batch_size:
+            return
+        last = (rows[-1][0], rows[-1][EXPORT_CREATED_AT])
+
+async def ticket_queue(
+    assigned_to: Optional[int],
+    statuses: Tuple[str, ...],
+    limit: int,
+    cursor: Optional[str],
+    priority: Optional[str] = None
+) -> Response:
+    """Página de una cola (asignados a un técnico o sin asignar), keyset sobre (created_at, id)
+    
+    assigned_to y status son el prefijo de idx_tickets_queue, así que la
+    lectura recorre solo la cola pedida, no toda la tabla de tickets.
+    """
+    if assigned_to is None:
+        clauses = ["t.assigned_to IS NULL"]
+        params = []
+    else:
+        clauses = ["t.assigned_to = ?"]
+        params = [assigned_to]
+    clauses.append(f"t.status IN ({', '.join('?' for _ in statuses)})")
+    params.extend(statuses)
+    if priority is not None:
+        clauses.append("t.priority = ?")
+        params.append(priority)
+    if cursor:
+        created_at, ticket_id = decode_cursor(cursor)
+        clauses.append("(t.created_at < ? OR (t.created_at = ? AND t.id < ?))")
+        params.extend([created_at, created_at, ticket_id])
+    
+    query = f"""
+        SELECT TOP (?) {QUEUE_COLUMNS}
+        FROM Tickets t
+        LEFT JOIN Users u ON t.user_id = u.id
+        WHERE {' AND '.join(clauses)}
+        ORDER BY t.created_at DESC, t.id DESC
+    """
+    try:
+        tickets = await adb.fetch_all(query, (limit + 1, *params), row_factory=record_rows)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    headers = {}
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        headers["X-Next-Cursor"] = encode_cursor(last.created_at, last.id)
+    return FastJSONResponse(tickets, headers=headers)
+
+@app.get("/api/tickets/my-assigned")
+async def get_my_assigned_tickets(
+    status_filter: Optional[str] = Query(None, alias="status", pattern="^(abierto|en_proceso)$"),
+    limit: int = Query(50, ge=1, le=settings.TICKETS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Tickets pendientes (abiertos o en proceso) asignados al técnico actual"""
+    if current_user['role'] not in ['admin', 'tecnico']:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    
+    statuses = (status_filter,) if status_filter else OPEN_STATUSES
+    return await ticket_queue(current_user['id'], statuses, limit, cursor)
+
+@app.get("/api/tickets/my-resolved")
+async def get_my_resolved_tickets(
+    limit: int = Query(50, ge=1, le=settings.TICKETS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Tickets resueltos o cerrados asignados al técnico actual"""
+    if current_user['role'] not in ['admin', 'tecnico']:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    
+    return await ticket_queue(current_user['id'], DONE_STATUSES, limit, cursor)
+
+@app.get("/api/tickets/backlog")
+async def get_ticket_backlog(
+    priority: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=settings.TICKETS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Tickets pendientes sin técnico asignado"""
+    if current_user['role'] not in ['admin', 'tecnico']:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    
+    return await ticket_queue(None, OPEN_STATUSES, limit, cursor, priority)
+
+@app.get("/api/tickets/search")
+async def search_tickets(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Buscar tickets por título, descripción y comentarios
+    
+    Usa los índices de texto completo (CONTAINSTABLE), nunca LIKE '%...%'.
+    Cada término se busca como prefijo y deben aparecer todos; los
+    resultados se ordenan por relevancia y se paginan por keyset sobre
+    (score, id) con el header X-Next-Cursor. Los clientes solo encuentran
+    sus propios tickets, filtrados antes de rankear. Para admin y técnicos
+    cada índice aporta como máximo SEARCH_MAX_CANDIDATES documentos; si
+    alguno llegó al tope se responde X-Search-Truncated: true.
+    """
+    condition = search_condition(q)
+    if condition is None:
+        raise HTTPException(status_code=400, detail="La búsqueda no tiene términos válidos")
+    
+    # Los clientes buscan solo entre sus tickets; el tope global es para staff
+    if current_user['role'] == 'cliente':
+        user_id, max_candidates = current_user['id'], None
+    else:
+        user_id, max_candidates = None, settings.SEARCH_MAX_CANDIDATES
+    
+    try:
+        query, params = build_search_query(
+            condition,
+            limit,
+            user_id=user_id,
+            max_candidates=max_candidates,
+            cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    
+    try:
+        tickets = await adb.fetch_all(query, tuple(params), row_factory=search_rows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    headers = {}
+    if tickets.truncated(max_candidates):
+        headers["X-Search-Truncated"] = "true"
+    if len(tickets) > limit:
+        tickets = tickets[:limit]
+        last = tickets[-1]
+        headers["X-Next-Cursor"] = encode_search_cursor(last.score, last.id)
+    return FastJSONResponse(tickets, headers=headers)
 
 @app.get("/api/tickets/{ticket_id}", response_model=TicketResponse)
-async def get_ticket(ticket_id: int, current_user: dict = Depends(get_current_user)):
-    """Obtener un ticket por ID"""
+async def get_ticket(
+    ticket_id: int,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Obtener un ticket por ID
+    
+    La fila se cachea por alcance de visibilidad (staff o el cliente dueño) y
+    se invalida en cada escritura del ticket. Si If-None-Match coincide con
+    su rowversion se responde 304 sin serializar el ticket.
+    """
     try:
-        query = """
-            SELECT t.*, u.username as created_by, a.username as assigned_to_name
-            FROM Tickets t
-            LEFT JOIN Users u ON t.user_id = u.id
-            LEFT JOIN Users a ON t.assigned_to = a.id
-            WHERE t.id = ?
-        """
-        tickets = db.execute_query(query, (ticket_id,))
+        conditions = ["t.id = ?"]
+        params = [ticket_id]
+        if current_user['role'] == 'cliente':
+            # Clientes solo ven sus tickets
+            conditions.append("t.user_id = ?")
+            params.append(current_user['id'])
+        query = f"SELECT {TICKET_LIST_COLUMNS} {TICKET_FROM} WHERE {' AND '.join(conditions)}"
+        ticket = await response_cache.get_or_load(
+            f"ticket:{ticket_id}:{visibility_scope(current_user)}",
+            lambda: adb.fetch_one(query, tuple(params))
+        )
         
-        if not tickets:
+        if not ticket:
+            # Solo en el camino de error se distingue 404 de 403
+            if current_user['role'] == 'cliente' and await adb.fetch_one(
+                "SELECT id FROM Tickets WHERE id = ?", (ticket_id,)
+            ):
+                raise HTTPException(status_code=403, detail="No autorizado")
             raise HTTPException(status_code=404, detail="Ticket no encontrado")
         
-        # Verificar permisos
-        ticket = tickets[0]
-        if current_user['role'] == 'cliente' and ticket['user_id'] != current_user['id']:
-            raise HTTPException(status_code=403, detail="No autorizado")
+        if if_none_match and etag_matches(if_none_match, ticket_etag(ticket['version'])):
+            return not_modified(ticket_etag(ticket['version']))
         
+        response.headers["ETag"] = ticket_etag(ticket['version'])
+        response.headers["Cache-Control"] = REVALIDATE_CACHE_CONTROL
         return ticket
     except HTTPException:
         raise
@@ -345,51 +983,60 @@ async def get_ticket(ticket_id: int, current_user: dict = Depends(get_current_us
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.post("/api/tickets", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
-async def create_ticket(ticket: TicketCreate, current_user: dict = Depends(get_current_user)):
-    """Crear un nuevo ticket"""
+async def create_ticket(ticket: TicketCreate, response: Response, current_user: dict = Depends(get_current_user)):
+    """Crear un nuevo ticket
+    
+    Si su prioridad está en AUTO_ASSIGN_PRIORITIES se asigna en el mismo
+    INSERT al técnico con menos carga pendiente.
+    """
+    technician_id = None
+    if ticket.priority in settings.AUTO_ASSIGN_PRIORITIES:
+        technician_id = assignment_engine.reserve(ticket.priority)
     try:
-        query = """
-            INSERT INTO Tickets (user_id, title, description, priority)
-            OUTPUT INSERTED.*
-            VALUES (?, ?, ?, ?)
+        # Un solo round-trip: el creador es el usuario actual
+        query = f"""
+            INSERT INTO Tickets (user_id, title, description, priority, assigned_to)
+            OUTPUT INSERTED.*, {VERSION_COLUMN.format(alias='INSERTED')}
+            VALUES (?, ?, ?, ?, ?)
         """
-        result = db.execute_query(query, (
+        result = await adb.fetch_one(query, (
             current_user['id'],
             ticket.title,
             ticket.description,
-            ticket.priority
+            ticket.priority,
+            technician_id
         ))
+        if technician_id is not None:
+            # La carga reservada pasa a contarse por el ticket creado
+            assignment_engine.release(technician_id, ticket.priority)
+            assignment_engine.track(result)
+            technician_id = None
+        result['created_by'] = current_user['username']
+        result['assigned_to_name'] = assignment_engine.name(result['assigned_to']) if result['assigned_to'] else None
+        stats_service.invalidate_tickets(current_user['id'])
+        publish_ticket_event(TICKET_CREATED, result)
         
-        # Obtener el ticket completo con joins
-        get_query = """
-            SELECT t.*, u.username as created_by, a.username as assigned_to_name
-            FROM Tickets t
-            LEFT JOIN Users u ON t.user_id = u.id
-            LEFT JOIN Users a ON t.assigned_to = a.id
-            WHERE t.id = ?
-        """
-        return db.execute_query(get_query, (result[0]['id'],))[0]
+        response.headers["ETag"] = ticket_etag(result['version'])
+        return result
     except Exception as e:
+        if technician_id is not None:
+            assignment_engine.release(technician_id, ticket.priority)
         raise HTTPException(status_code=500, detail=str(e))
 
 @app.put("/api/tickets/{ticket_id}", response_model=TicketResponse)
 async def update_ticket(
     ticket_id: int,
     ticket_update: TicketUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
     current_user: dict = Depends(get_current_user)
 ):
-    """Actualizar un ticket"""
+    """Actualizar un ticket
+    
+    El permiso y la versión (If-Match) se verifican en el WHERE del UPDATE y
+    el OUTPUT devuelve la fila con sus joins, todo en un solo round-trip.
+    """
     try:
-        # Verificar que el ticket existe
-        check_query = "SELECT user_id FROM Tickets WHERE id = ?"
-        tickets = db.execute_query(check_query, (ticket_id,))
-        if not tickets:
-            raise HTTPException(status_code=404, detail="Ticket no encontrado")
-        
-        # Verificar permisos
-        if current_user['role'] == 'cliente' and tickets[0]['user_id'] != current_user['id']:
-            raise HTTPException(status_code=403, detail="No autorizado")
-        
         # Construir query de actualización dinámicamente
         update_fields = []
         params = []
@@ -414,20 +1061,56 @@ async def update_ticket(
             raise HTTPException(status_code=400, detail="No hay campos para actualizar")
         
         update_fields.append("updated_at = GETDATE()")
-        params.append(ticket_id)
         
-        query = f"UPDATE Tickets SET {', '.join(update_fields)} WHERE id = ?"
-        db.execute_query(query, tuple(params), fetch=False)
+        # El nombre del asignado se resuelve contra el valor nuevo
+        assignee_join = "a.id = t.assigned_to"
+        if ticket_update.assigned_to is not None:
+            assignee_join = "a.id = ?"
+            params.append(ticket_update.assigned_to)
+        
+        conditions = ["t.id = ?"]
+        params.append(ticket_id)
+        if current_user['role'] == 'cliente':
+            conditions.append("t.user_id = ?")
+            params.append(current_user['id'])
+        expected_version = parse_if_match(if_match)
+        if expected_version is not None:
+            conditions.append("t.row_version = ?")
+            params.append(expected_version)
         
-        # Obtener el ticket actualizado
-        get_query = """
-            SELECT t.*, u.username as created_by, a.username as assigned_to_name
+        query = f"""
+            UPDATE t SET {', '.join(update_fields)}
+            OUTPUT INSERTED.*, {VERSION_COLUMN.format(alias='INSERTED')},
+                   u.username as created_by, a.username as assigned_to_name
             FROM Tickets t
             LEFT JOIN Users u ON t.user_id = u.id
-            LEFT JOIN Users a ON t.assigned_to = a.id
-            WHERE t.id = ?
+            LEFT JOIN Users a ON {assignee_join}
+            WHERE {' AND '.join(conditions)}
         """
-        return db.execute_query(get_query, (ticket_id,))[0]
+        ticket = await adb.fetch_one(query, tuple(params))
+        
+        if not ticket:
+            # Solo en el camino de error se consulta el motivo
+            existing = await adb.fetch_one(
+                f"SELECT user_id, {VERSION_COLUMN.format(alias='Tickets')} FROM Tickets WHERE id = ?",
+                (ticket_id,)
+            )
+            if not existing:
+                raise HTTPException(status_code=404, detail="Ticket no encontrado")
+            if current_user['role'] == 'cliente' and existing['user_id'] != current_user['id']:
+                raise HTTPException(status_code=403, detail="No autorizado")
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="El ticket fue modificado por otro usuario",
+                headers={"ETag": ticket_etag(existing['version'])}
+            )
+        
+        await invalidate_ticket(ticket_id, ticket['user_id'])
+        assignment_engine.track(ticket)
+        stats_service.invalidate_tickets(ticket['user_id'])
+        publish_ticket_event(TICKET_UPDATED, ticket)
+        response.headers["ETag"] = ticket_etag(ticket['version'])
+        return ticket
     except HTTPException:
         raise
     except Exception as e:
@@ -440,49 +1123,578 @@ async def delete_ticket(ticket_id: int, current_user: dict = Depends(get_current
         raise HTTPException(status_code=403, detail="No autorizado")
     
     try:
-        query = "DELETE FROM Tickets WHERE id = ?"
-        rows = db.execute_query(query, (ticket_id,), fetch=False)
-        if rows == 0:
+        query = "DELETE FROM Tickets OUTPUT DELETED.id, DELETED.user_id WHERE id = ?"
+        deleted = await adb.fetch_one(query, (ticket_id,))
+        if not deleted:
             raise HTTPException(status_code=404, detail="Ticket no encontrado")
+        await invalidate_ticket(ticket_id, deleted['user_id'])
+        assignment_engine.forget(ticket_id)
+        stats_service.invalidate_tickets(deleted['user_id'])
+        publish_ticket_event(TICKET_DELETED, deleted)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# ==================== COMENTARIOS Y ADJUNTOS ====================
+
+# Mismo orden de campos que CommentResponse / AttachmentResponse
+COMMENT_SELECT = """
+    x.id, x.ticket_id, x.user_id, u.username as user_name, x.comment, x.created_at
+    FROM Comments x
+    LEFT JOIN Users u ON u.id = x.user_id
+"""
+ATTACHMENT_SELECT = """
+    x.id, x.ticket_id, x.filename, x.file_url, NULL as thumbnail_url, NULL as preview_url,
+    x.file_size, x.content_type,
+    x.uploaded_by, u.username as uploaded_by_name, x.uploaded_at
+    FROM Attachments x
+    LEFT JOIN Users u ON u.id = x.uploaded_by
+"""
+
+async def ticket_access_error(ticket_id: int, current_user: dict) -> Optional[HTTPException]:
+    """404 si el ticket no existe, 403 si existe pero el cliente no es su dueño"""
+    ticket = await adb.fetch_one("SELECT user_id FROM Tickets WHERE id = ?", (ticket_id,))
+    if not ticket:
+        return HTTPException(status_code=404, detail="Ticket no encontrado")
+    if current_user['role'] == 'cliente' and ticket['user_id'] != current_user['id']:
+        return HTTPException(status_code=403, detail="No autorizado")
+    return None
+
+UPLOADS_URL_PREFIX = "/uploads/"
+
+def add_preview_urls(attachments: list):
+    """Completar thumbnail_url / preview_url según los derivados que ya existen en disco"""
+    for attachment in attachments:
+        source = ""
+        if attachment.file_url.startswith(UPLOADS_URL_PREFIX):
+            source = content_store.absolute_path(attachment.file_url[len(UPLOADS_URL_PREFIX):])
+        attachment.thumbnail_url, attachment.preview_url = thumbnail_pipeline.derived_urls(
+            attachment.file_url, source
+        )
+
+async def ticket_item_page(
+    ticket_id: int,
+    select: str,
+    time_column: str,
+    limit: int,
+    cursor: Optional[str],
+    current_user: dict,
+    complete: Optional[Callable[[list], None]] = None
+) -> Response:
+    """Página de comentarios o adjuntos, keyset sobre (ticket_id, fecha, id) en orden cronológico
+    
+    `complete` recibe los registros de la página para completar campos que no
+    salen de la base (se ejecuta en el threadpool).
+    """
+    clauses = ["x.ticket_id = ?"]
+    params = [ticket_id]
+    if current_user['role'] == 'cliente':
+        clauses.append("EXISTS (SELECT 1 FROM Tickets t WHERE t.id = x.ticket_id AND t.user_id = ?)")
+        params.append(current_user['id'])
+    if cursor:
+        created_at, item_id = decode_cursor(cursor)
+        clauses.append(f"(x.{time_column} > ? OR (x.{time_column} = ? AND x.id > ?))")
+        params.extend([created_at, created_at, item_id])
+    
+    query = f"SELECT TOP (?) {select} WHERE {' AND '.join(clauses)} ORDER BY x.{time_column}, x.id"
+    try:
+        items = await adb.fetch_all(query, (limit + 1, *params), row_factory=record_rows)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if not items and not cursor:
+        # Solo una página vacía distingue "sin ítems" de 404 / 403
+        error = await ticket_access_error(ticket_id, current_user)
+        if error:
+            raise error
+    
+    headers = {}
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        headers["X-Next-Cursor"] = encode_cursor(getattr(last, time_column), last.id)
+    if complete is not None:
+        await run_in_threadpool(complete, items)
+    return FastJSONResponse(items, headers=headers)
+
+async def publish_counter_change(ticket: dict, response: Response):
+    """El contador cambió la fila del ticket (y su rowversion): invalidar y notificar
+    
+    La respuesta lleva el ETag nuevo del ticket para que el cliente actualice
+    su If-Match sin volver a leerlo (el anterior daría 412 en el próximo PUT).
+    """
+    await invalidate_ticket(ticket['id'], ticket['user_id'])
+    publish_ticket_event(TICKET_UPDATED, ticket)
+    response.headers["ETag"] = ticket_etag(ticket['version'])
+
+@app.get("/api/tickets/{ticket_id}/comments", response_model=List[CommentResponse])
+async def get_comments(
+    ticket_id: int,
+    limit: int = Query(50, ge=1, le=settings.TICKETS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Comentarios de un ticket, del más antiguo al más reciente (X-Next-Cursor)"""
+    return await ticket_item_page(ticket_id, COMMENT_SELECT, "created_at", limit, cursor, current_user)
+
+@app.post("/api/tickets/{ticket_id}/comments", response_model=CommentResponse, status_code=status.HTTP_201_CREATED)
+async def create_comment(
+    ticket_id: int,
+    payload: CommentCreate,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Comentar un ticket (el cliente solo en los suyos); suma comments_count en la misma transacción"""
+    text = payload.comment.strip()
+    if not text:
+        raise HTTPException(status_code=400, detail="El comentario está vacío")
+    
+    owner_id = current_user['id'] if current_user['role'] == 'cliente' else None
+    try:
+        result = await adb.transaction(activity.add_comment, ticket_id, current_user['id'], text, owner_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if result is None:
+        raise await ticket_access_error(ticket_id, current_user)
+    
+    ticket, comment = result
+    await publish_counter_change(ticket, response)
+    return {**comment, "user_name": current_user['username']}
+
+@app.delete("/api/tickets/{ticket_id}/comments/{comment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_comment(
+    ticket_id: int,
+    comment_id: int,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Eliminar un comentario (su autor o staff); resta comments_count en la misma transacción"""
+    author_id = None if current_user['role'] in ['admin', 'tecnico'] else current_user['id']
+    try:
+        ticket = await adb.transaction(activity.delete_comment, ticket_id, comment_id, author_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Comentario no encontrado")
+    await publish_counter_change(ticket, response)
+
+@app.get("/api/tickets/{ticket_id}/attachments", response_model=List[AttachmentResponse])
+async def get_attachments(
+    ticket_id: int,
+    limit: int = Query(50, ge=1, le=settings.TICKETS_PAGE_MAX),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Adjuntos de un ticket, del más antiguo al más reciente (X-Next-Cursor)
+    
+    Se suben con POST /api/upload indicando `ticket_id`. `thumbnail_url` y
+    `preview_url` apuntan a los WebP generados; mientras no existen, las
+    imágenes usan el original y los PDF vienen en null.
+    """
+    return await ticket_item_page(
+        ticket_id, ATTACHMENT_SELECT, "uploaded_at", limit, cursor, current_user, complete=add_preview_urls
+    )
+
+@app.delete("/api/tickets/{ticket_id}/attachments/{attachment_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_attachment(
+    ticket_id: int,
+    attachment_id: int,
+    response: Response,
+    current_user: dict = Depends(get_current_user)
+):
+    """Quitar un adjunto del ticket (quien lo subió o staff); resta attachments_count"""
+    uploader_id = None if current_user['role'] in ['admin', 'tecnico'] else current_user['id']
+    try:
+        ticket = await adb.transaction(activity.delete_attachment, ticket_id, attachment_id, uploader_id)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Adjunto no encontrado")
+    await publish_counter_change(ticket, response)
+
+# ==================== OPERACIONES MASIVAS ====================
+
+def check_bulk_size(count: int):
+    """Rechazar lotes vacíos o más grandes que BULK_MAX_ITEMS"""
+    if count == 0:
+        raise HTTPException(status_code=400, detail="El lote está vacío")
+    if count > settings.BULK_MAX_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Máximo {settings.BULK_MAX_ITEMS} ítems por lote"
+        )
+
+async def publish_bulk_events(event_type: str, results: dict):
+    """Invalidar el cache y publicar un evento por ítem aplicado del lote"""
+    for item in results.values():
+        if item['status'] < 400:
+            if event_type != TICKET_CREATED:
+                await invalidate_ticket(item['id'], item.get('user_id'))
+            publish_ticket_event(event_type, {
+                key: item[key] for key in ("id", "user_id", "version") if key in item
+            })
+
+def bulk_response(results: dict, count: int) -> dict:
+    """Resultados por ítem en el orden del pedido"""
+    items = [results[index] for index in range(count)]
+    succeeded = sum(1 for item in items if item['status'] < 400)
+    return {"results": items, "succeeded": succeeded, "failed": count - succeeded}
+
+@app.post("/api/tickets/bulk")
+async def bulk_create_tickets(payload: BulkTicketCreate, current_user: dict = Depends(get_current_user)):
+    """Crear tickets en lote (una transacción, fast_executemany)
+    
+    Igual que en la creación individual, los tickets con prioridad en
+    AUTO_ASSIGN_PRIORITIES se asignan en el mismo INSERT; las reservas del
+    lote se toman de una vez para repartirlo entre los técnicos.
+    """
+    check_bulk_size(len(payload.items))
+    
+    results = {}
+    valid = []
+    for index, item in enumerate(payload.items):
+        error = bulk.validate_values(priority=item.priority)
+        if error:
+            results[index] = bulk.item_error(index, 422, error)
+        else:
+            valid.append((index, item))
+    
+    technicians = iter(assignment_engine.reserve_many([
+        item.priority for _, item in valid if item.priority in settings.AUTO_ASSIGN_PRIORITIES
+    ]))
+    rows = []
+    reserved = []
+    for index, item in valid:
+        technician_id = next(technicians) if item.priority in settings.AUTO_ASSIGN_PRIORITIES else None
+        if technician_id is not None:
+            reserved.append((technician_id, item.priority))
+        rows.append((index, item.title, item.description, item.priority, technician_id))
+    
+    try:
+        results.update(await adb.transaction(bulk.bulk_create, current_user['id'], rows))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        # La carga reservada pasa a contarse por los tickets creados (o se devuelve si falló)
+        for technician_id, priority in reserved:
+            assignment_engine.release(technician_id, priority)
+    for result in results.values():
+        if result['status'] == 201 and result['assigned_to'] is not None:
+            assignment_engine.track({
+                "id": result['id'], "assigned_to": result['assigned_to'],
+                "status": "abierto", "priority": payload.items[result['index']].priority
+            })
+    await publish_bulk_events(TICKET_CREATED, results)
+    if rows:
+        stats_service.invalidate_tickets(current_user['id'])
+    return bulk_response(results, len(payload.items))
+
+@app.patch("/api/tickets/bulk")
+async def bulk_update_tickets(payload: BulkTicketUpdate, current_user: dict = Depends(get_current_user)):
+    """Cambiar estado, prioridad o asignado de varios tickets (una transacción)"""
+    if current_user['role'] not in ['admin', 'tecnico']:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    check_bulk_size(len(payload.items))
+    
+    results = {}
+    rows = []
+    seen = set()
+    for index, item in enumerate(payload.items):
+        error = bulk.validate_values(status=item.status, priority=item.priority)
+        if item.status is None and item.priority is None and item.assigned_to is None:
+            error = "No hay campos para actualizar"
+        elif item.id in seen:
+            error = "Ticket repetido en el lote"
+        if error:
+            results[index] = bulk.item_error(index, 422, error, item.id)
+        else:
+            seen.add(item.id)
+            rows.append((index, item.id, item.status, item.priority, item.assigned_to))
+    
+    try:
+        results.update(await adb.transaction(bulk.bulk_update, rows))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    await publish_bulk_events(TICKET_UPDATED, results)
+    if rows:
+        stats_service.invalidate()
+        # El resultado del lote no trae estado/prioridad/asignado: recargar las cargas
+        await refresh_assignments()
+    return bulk_response(results, len(payload.items))
+
+@app.post("/api/tickets/bulk/delete")
+async def bulk_delete_tickets(payload: BulkTicketDelete, current_user: dict = Depends(get_current_user)):
+    """Eliminar varios tickets (una transacción)"""
+    if current_user['role'] not in ['admin', 'tecnico']:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    check_bulk_size(len(payload.ids))
+    
+    results = {}
+    rows = []
+    seen = set()
+    for index, ticket_id in enumerate(payload.ids):
+        if ticket_id in seen:
+            results[index] = bulk.item_error(index, 422, "Ticket repetido en el lote", ticket_id)
+        else:
+            seen.add(ticket_id)
+            rows.append((index, ticket_id))
+    
+    try:
+        results.update(await adb.transaction(bulk.bulk_delete, rows))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    await publish_bulk_events(TICKET_DELETED, results)
+    for item in results.values():
+        if item['status'] < 400:
+            assignment_engine.forget(item['id'])
+    if rows:
+        stats_service.invalidate()
+    return bulk_response(results, len(payload.ids))
+
+# ==================== ASIGNACIÓN AUTOMÁTICA ====================
+
+@app.post("/api/admin/assignments/drain")
+async def drain_assignments(
+    limit: int = Query(500, ge=1, le=settings.BULK_MAX_ITEMS),
+    current_user: dict = Depends(get_current_user)
+):
+    """Asignar el backlog sin técnico (urgentes primero) en una sola transacción
+    
+    Cada ticket va al técnico con menos carga pendiente en ese momento,
+    contando también los tickets ya repartidos en este mismo lote.
+    """
+    if current_user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="No autorizado")
+    
+    try:
+        assigned = await adb.transaction(drain_backlog, assignment_engine.plan, limit)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    results = {}
+    for index, ticket in enumerate(assigned):
+        assignment_engine.track(ticket)
+        results[index] = {"status": 200, **ticket}
+    await publish_bulk_events(TICKET_UPDATED, results)
+    if assigned:
+        stats_service.invalidate()
+    return {
+        "assigned": len(assigned),
+        "tickets": [
+            {
+                "id": ticket['id'],
+                "priority": ticket['priority'],
+                "assigned_to": ticket['assigned_to'],
+                "assigned_to_name": assignment_engine.name(ticket['assigned_to'])
+            }
+            for ticket in assigned
+        ]
+    }
+
+# ==================== IMPORTACIÓN ====================
+
+def _run_import(path: str, import_format: str, progress: ImportProgress, owner: str):
+    try:
+        with open(path, "rb", buffering=READ_BUFFER) as stream:
+            ticket_importer.run(stream, import_format, progress.job, progress, owner=owner)
+    finally:
+        os.unlink(path)
+
+def prune_import_jobs():
+    """Descartar el avance de las importaciones terminadas hace más de IMPORT_JOB_RETENTION"""
+    now = time.monotonic()
+    for job, progress in list(import_jobs.items()):
+        if progress.finished_at is not None and now - progress.finished_at > settings.IMPORT_JOB_RETENTION:
+            del import_jobs[job]
+
+async def release_import(job: str, owner: str):
+    """Liberar el lease de una importación que no llegó a empezar"""
+    try:
+        await adb.run(ticket_importer.release, job, owner)
+    except Exception as e:
+        print(f"⚠️  No se pudo liberar el lease de '{job}': {e}")
+
+async def run_import(path: str, import_format: str, progress: ImportProgress, owner: str):
+    """Ejecutar una importación en un hilo propio (no ocupa el pool de hilos de la BD)"""
+    try:
+        await asyncio.to_thread(_run_import, path, import_format, progress, owner)
+    except Exception as e:
+        print(f"❌ Error en la importación '{progress.job}': {e}")
+    finally:
+        stats_service.invalidate()
+        await refresh_assignments()
+
+@app.post("/api/admin/imports", status_code=status.HTTP_202_ACCEPTED)
+async def start_import(
+    request: Request,
+    import_format: str = Query(..., alias="format", pattern="^(csv|ndjson)$"),
+    job: str = Query(..., min_length=1, max_length=200),
+    current_user: dict = Depends(get_current_user)
+):
+    """Importar tickets históricos (CSV o NDJSON en el cuerpo de la petición)
+    
+    El archivo se guarda en streaming a un temporal y se importa en segundo
+    plano por lotes. Repetir la petición con el mismo `job` reanuda desde el
+    último lote confirmado; el avance se consulta en GET /api/admin/imports/{job}.
+    El lease del job se toma antes de recibir el archivo: si otra ejecución
+    (de cualquier proceso) lo tiene, se responde 409.
+    """
+    if current_user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="No autorizado")
+    prune_import_jobs()
+    owner = import_owner()
+    try:
+        acquired = await adb.run(ticket_importer.acquire, job, owner)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if not acquired:
+        raise HTTPException(status_code=409, detail="La importación ya está en curso")
+    
+    tmp = content_store.open_temp()
+    size = 0
+    try:
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.IMPORT_MAX_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Archivo muy grande (máximo {settings.IMPORT_MAX_SIZE} bytes)"
+                )
+            await run_in_threadpool(tmp.write, chunk)
+        tmp.close()
+    except BaseException:
+        tmp.close()
+        os.unlink(tmp.name)
+        await release_import(job, owner)
+        raise
+    
+    progress = ImportProgress(job=job)
+    import_jobs[job] = progress
+    task = asyncio.create_task(run_import(tmp.name, import_format, progress, owner))
+    import_tasks.add(task)
+    task.add_done_callback(import_tasks.discard)
+    return progress.as_dict()
+
+@app.get("/api/admin/imports/{job}")
+async def get_import(job: str, current_user: dict = Depends(get_current_user)):
+    """Avance de una importación
+    
+    El detalle (errores, velocidad) solo está en el proceso que la ejecutó;
+    en los demás, o pasado IMPORT_JOB_RETENTION, se responde el checkpoint.
+    """
+    if current_user['role'] != 'admin':
+        raise HTTPException(status_code=403, detail="No autorizado")
+    prune_import_jobs()
+    progress = import_jobs.get(job)
+    if progress is not None and progress.status == "running":
+        return progress.as_dict()
+    try:
+        checkpoint = await adb.run(ticket_importer.load_checkpoint, job)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    if progress is not None and (checkpoint is None or checkpoint['status'] != "running"):
+        return progress.as_dict()
+    if checkpoint is None:
+        raise HTTPException(status_code=404, detail="Importación no encontrada")
+    return {"job": job, **checkpoint}
+
 # ==================== UPLOADS ====================
 
-@app.post("/api/upload")
+@app.post(
+    "/api/upload",
+    openapi_extra={
+        "requestBody": {
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {
+                            "file": {"type": "string", "format": "binary"},
+                            "ticket_id": {"type": "integer"}
+                        }
+                    }
+                }
+            }
+        }
+    }
+)
 async def upload_file(
-    file: UploadFile = File(...),
+    request: Request,
+    response: Response,
+    ticket_id: Optional[int] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    """Subir un archivo"""
+    """Subir un archivo
+    
+    El archivo se recibe en streaming a un temporal (abortando en cuanto supera
+    MAX_UPLOAD_SIZE), se hashea al vuelo y se guarda por su SHA-256. Si se indica
+    `ticket_id` (query o campo del formulario) se registra en Attachments.
+    """
+    parser = StreamingUploadParser(
+        request,
+        content_store,
+        max_size=settings.MAX_UPLOAD_SIZE,
+        allowed_extensions=settings.ALLOWED_EXTENSIONS
+    )
     try:
-        # Verificar extensión
-        file_ext = file.filename.split('.')[-1].lower()
-        if file_ext not in settings.ALLOWED_EXTENSIONS:
-            raise HTTPException(status_code=400, detail="Tipo de archivo no permitido")
-        
-        # Generar nombre único
-        filename = f"{datetime.now().timestamp()}_{file.filename}"
-        file_path = os.path.join(settings.UPLOAD_FOLDER, filename)
-        
-        # Guardar archivo
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            if len(content) > settings.MAX_UPLOAD_SIZE:
-                raise HTTPException(status_code=400, detail="Archivo demasiado grande")
-            buffer.write(content)
-        
-        return {
-            "filename": filename,
-            "url": f"/uploads/{filename}",
-            "size": len(content)
-        }
+        stored, fields = await parser.parse()
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if ticket_id is None and fields.get('ticket_id'):
+        try:
+            ticket_id = int(fields['ticket_id'])
+        except ValueError:
+            raise HTTPException(status_code=400, detail="ticket_id inválido")
+    
+    file_url = f"{UPLOADS_URL_PREFIX}{stored.relative_path}"
+    result = {
+        "filename": stored.filename,
+        "url": file_url,
+        "size": stored.size,
+        "sha256": stored.sha256,
+        "deduplicated": stored.deduplicated
+    }
+    
+    # Miniaturas en segundo plano: nunca retrasan la respuesta
+    if thumbnail_pipeline.submit(content_store.absolute_path(stored.relative_path), stored.extension):
+        stem = file_url.rsplit(".", 1)[0]
+        result["previews"] = preview_paths(stem, thumbnail_pipeline.sizes)
+    
+    if ticket_id is not None:
+        # Registrar el adjunto y sumar attachments_count en una transacción
+        # (el UPDATE del contador verifica que el cliente sea dueño del ticket)
+        owner_id = current_user['id'] if current_user['role'] == 'cliente' else None
+        try:
+            registered = await adb.transaction(
+                activity.add_attachment, ticket_id, stored.filename, file_url, stored.size,
+                current_user['id'], stored.sha256, stored.content_type, owner_id
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+        if not registered:
+            raise HTTPException(status_code=404, detail="Ticket no encontrado")
+        ticket, attachment = registered
+        await publish_counter_change(ticket, response)
+        result["attachment_id"] = attachment['id']
+        result["ticket_id"] = ticket_id
+    
+    return result
+
+@app.api_route("/uploads/{file_path:path}", methods=["GET", "HEAD"], include_in_schema=False)
+async def get_upload(file_path: str, request: Request):
+    """Servir archivos subidos (ETag, 304, Range y cache inmutable)"""
+    return await serve_upload(
+        request,
+        content_store,
+        file_path,
+        accel_mode=settings.UPLOADS_ACCEL_MODE,
+        accel_prefix=settings.UPLOADS_ACCEL_PREFIX
+    )
 
 # ==================== ESTADÍSTICAS ====================
 
@@ -490,44 +1702,27 @@ async def upload_file(
 async def get_stats(current_user: dict = Depends(get_current_user)):
     """Obtener estadísticas"""
     try:
-        stats = {}
-        
-        # Total de usuarios
-        result = db.execute_query("SELECT COUNT(*) as count FROM Users")
-        stats['total_users'] = result[0]['count']
-        
-        # Total de tickets
-        result = db.execute_query("SELECT COUNT(*) as count FROM Tickets")
-        stats['total_tickets'] = result[0]['count']
-        
-        # Tickets por estado
-        result = db.execute_query("""
-            SELECT status, COUNT(*) as count
-            FROM Tickets
-            GROUP BY status
-        """)
-        stats['tickets_by_status'] = {row['status']: row['count'] for row in result}
-        
-        # Tickets por prioridad
-        result = db.execute_query("""
-            SELECT priority, COUNT(*) as count
-            FROM Tickets
-            GROUP BY priority
-        """)
-        stats['tickets_by_priority'] = {row['priority']: row['count'] for row in result}
+        stats = await stats_service.general()
         
         # Si es cliente, solo sus tickets
         if current_user['role'] == 'cliente':
-            result = db.execute_query(
-                "SELECT COUNT(*) as count FROM Tickets WHERE user_id = ?",
-                (current_user['id'],)
-            )
-            stats['my_tickets'] = result[0]['count']
+            stats['my_tickets'] = await stats_service.user_tickets(current_user['id'])
         
         return stats
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/api/technicians/workload")
+async def get_technician_workload(current_user: dict = Depends(get_current_user)):
+    """Carga por técnico y backlog sin asignar (contadores, sin leer tickets)"""
+    if current_user['role'] not in ['admin', 'tecnico']:
+        raise HTTPException(status_code=403, detail="No autorizado")
+    
+    try:
+        return await stats_service.workload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
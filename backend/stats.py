@@ -0,0 +1,230 @@
+from typing import Any, Dict, List
+
+from cache import TTLCache, SingleFlight
+from database import AsyncDatabase
+
+# Todos los contadores en un solo round-trip: GROUPING SETS sobre Tickets
+# más el total de usuarios
+GROUPED_STATS_QUERY = """
+    SELECT g.status, g.priority, g.count, g.g_status, g.g_priority, u.total_users
+    FROM (
+        SELECT status, priority, COUNT(*) as count,
+               GROUPING(status) as g_status, GROUPING(priority) as g_priority
+        FROM Tickets
+        GROUP BY GROUPING SETS ((status), (priority), ())
+    ) g
+    CROSS JOIN (SELECT COUNT(*) as total_users FROM Users) u
+"""
+
+# Vistas indexadas: SQL Server las mantiene en cada INSERT/UPDATE/DELETE,
+# así que la lectura es O(1) sin importar el tamaño de las tablas
+COUNTERS_STATS_QUERY = """
+    SELECT 'ticket' as kind, status, priority, total as count
+    FROM dbo.vw_ticket_counters WITH (NOEXPAND)
+    UNION ALL
+    SELECT 'user' as kind, role as status, NULL as priority, total as count
+    FROM dbo.vw_user_counters WITH (NOEXPAND)
+"""
+
+USER_TICKETS_QUERY = "SELECT COUNT(*) as count FROM Tickets WHERE user_id = ?"
+
+# Carga por técnico: (assigned_to, status, priority) sale entero del índice
+# cubriente idx_tickets_queue, o de la vista indexada vw_ticket_workload.
+# La fila con assigned_to NULL es el backlog sin asignar.
+WORKLOAD_QUERY = """
+    SELECT s.id, s.username, s.role, w.status, w.priority, w.total
+    FROM Users s
+    LEFT JOIN (
+        SELECT assigned_to, status, priority, COUNT(*) as total
+        FROM Tickets
+        WHERE assigned_to IS NOT NULL
+        GROUP BY assigned_to, status, priority
+    ) w ON w.assigned_to = s.id
+    WHERE s.role IN ('tecnico', 'admin')
+    UNION ALL
+    SELECT NULL, NULL, NULL, status, priority, COUNT(*)
+    FROM Tickets
+    WHERE assigned_to IS NULL
+    GROUP BY status, priority
+"""
+
+COUNTERS_WORKLOAD_QUERY = """
+    SELECT s.id, s.username, s.role, w.status, w.priority, w.total
+    FROM Users s
+    LEFT JOIN dbo.vw_ticket_workload w WITH (NOEXPAND) ON w.assigned_to = s.id
+    WHERE s.role IN ('tecnico', 'admin')
+    UNION ALL
+    SELECT NULL, NULL, NULL, status, priority, total
+    FROM dbo.vw_ticket_workload WITH (NOEXPAND)
+    WHERE assigned_to IS NULL
+"""
+
+OPEN_STATUSES = ("abierto", "en_proceso")
+HIGH_PRIORITIES = ("alta", "urgente")
+
+
+def _from_grouped(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    stats = {
+        "total_users": 0,
+        "total_tickets": 0,
+        "tickets_by_status": {},
+        "tickets_by_priority": {},
+    }
+    for row in rows:
+        stats["total_users"] = row["total_users"]
+        if row["g_status"] and row["g_priority"]:
+            stats["total_tickets"] = row["count"]
+        elif row["g_priority"]:
+            stats["tickets_by_status"][row["status"]] = row["count"]
+        else:
+            stats["tickets_by_priority"][row["priority"]] = row["count"]
+    return stats
+
+
+def _from_counters(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    stats = {
+        "total_users": 0,
+        "total_tickets": 0,
+        "tickets_by_status": {},
+        "tickets_by_priority": {},
+    }
+    by_status = stats["tickets_by_status"]
+    by_priority = stats["tickets_by_priority"]
+    for row in rows:
+        count = int(row["count"])
+        if row["kind"] == "user":
+            stats["total_users"] += count
+            continue
+        if not count:
+            continue
+        stats["total_tickets"] += count
+        by_status[row["status"]] = by_status.get(row["status"], 0) + count
+        by_priority[row["priority"]] = by_priority.get(row["priority"], 0) + count
+    return stats
+
+
+def _workload_counts() -> Dict[str, Any]:
+    return {"open": 0, "high_priority": 0, "by_status": {}}
+
+
+def _add_workload(counts: Dict[str, Any], status: str, priority: str, total: int):
+    if not total:
+        return
+    counts["by_status"][status] = counts["by_status"].get(status, 0) + total
+    if status in OPEN_STATUSES:
+        counts["open"] += total
+        if priority in HIGH_PRIORITIES:
+            counts["high_priority"] += total
+
+
+def _from_workload(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    technicians = {}
+    unassigned = _workload_counts()
+    for row in rows:
+        if row["id"] is None:
+            counts = unassigned
+        else:
+            if row["id"] not in technicians:
+                technicians[row["id"]] = {
+                    "id": row["id"], "username": row["username"], "role": row["role"],
+                    **_workload_counts(),
+                }
+            counts = technicians[row["id"]]
+        if row["status"] is not None:
+            _add_workload(counts, row["status"], row["priority"], int(row["total"]))
+    ordered = sorted(technicians.values(), key=lambda t: (-t["open"], t["username"]))
+    return {"technicians": ordered, "unassigned": unassigned}
+
+
+class StatsService:
+    """Estadísticas del dashboard con cache TTL y de-duplicación de consultas
+
+    `source` elige de dónde salen los contadores: "query" agrupa Tickets con
+    GROUPING SETS y "counters" lee las vistas indexadas (vw_*_counters y
+    vw_ticket_workload).
+    """
+
+    def __init__(self, database: AsyncDatabase, ttl: float = 5.0, source: str = "query"):
+        if source not in ("query", "counters"):
+            raise ValueError(f"Origen de estadísticas inválido: {source}")
+        self.adb = database
+        self.source = source
+        self.cache = TTLCache(maxsize=4096, ttl=ttl)
+        self._flights = SingleFlight()
+        self._generation = 0
+        self.queries = 0
+
+    async def _cached(self, key, loader):
+        value = self.cache.get(key)
+        if value is not None:
+            return value
+
+        async def load():
+            self.queries += 1
+            generation = self._generation
+            result = await loader()
+            # Una invalidación durante la consulta deja el resultado sin cachear
+            if generation == self._generation:
+                self.cache.set(key, result)
+            return result
+
+        return await self._flights.do(key, load)
+
+    async def _load_general(self) -> Dict[str, Any]:
+        if self.source == "counters":
+            return _from_counters(await self.adb.fetch_all(COUNTERS_STATS_QUERY))
+        return _from_grouped(await self.adb.fetch_all(GROUPED_STATS_QUERY))
+
+    async def _load_workload(self) -> Dict[str, Any]:
+        query = COUNTERS_WORKLOAD_QUERY if self.source == "counters" else WORKLOAD_QUERY
+        return _from_workload(await self.adb.fetch_all(query))
+
+    async def _load_user_tickets(self, user_id: int) -> int:
+        row = await self.adb.fetch_one(USER_TICKETS_QUERY, (user_id,))
+        return row["count"]
+
+    async def general(self) -> Dict[str, Any]:
+        """Totales de usuarios y tickets por estado y prioridad"""
+        stats = await self._cached("general", self._load_general)
+        # Copia superficial: el resultado cacheado se comparte entre peticiones
+        return {
+            **stats,
+            "tickets_by_status": dict(stats["tickets_by_status"]),
+            "tickets_by_priority": dict(stats["tickets_by_priority"]),
+        }
+
+    async def workload(self) -> Dict[str, Any]:
+        """Tickets por técnico (abiertos, alta prioridad, por estado) y backlog sin asignar"""
+        workload = await self._cached("workload", self._load_workload)
+        return {
+            "technicians": [{**t, "by_status": dict(t["by_status"])} for t in workload["technicians"]],
+            "unassigned": {**workload["unassigned"], "by_status": dict(workload["unassigned"]["by_status"])},
+        }
+
+    async def user_tickets(self, user_id: int) -> int:
+        """Cantidad de tickets creados por un usuario"""
+        return await self._cached(("user", user_id), lambda: self._load_user_tickets(user_id))
+
+    def _discard(self, *keys):
+        self._generation += 1
+        for key in keys:
+            self.cache.delete(key)
+            self._flights.forget(key)
+
+    def invalidate_tickets(self, *user_ids: int):
+        """Descartar lo que cambia al crear, editar o eliminar tickets
+
+        Totales y carga por técnico siempre; el contador por creador solo de
+        `user_ids`.
+        """
+        self._discard("general", "workload", *(("user", user_id) for user_id in user_ids if user_id is not None))
+
+    def invalidate(self):
+        """Descartar todas las estadísticas cacheadas"""
+        self._generation += 1
+        self.cache.clear()
+        self._flights.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Estado del cache de estadísticas"""
+        return {"source": self.source, "queries": self.queries, **self.cache.stats()}
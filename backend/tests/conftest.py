@@ -0,0 +1,91 @@
+"""
+Configuración común de los tests del backend
+
+    cd backend && pip install -r requirements-dev.txt && python -m pytest -q
+
+Los módulos del backend se importan como en server.py (directorio backend
+en sys.path). Uploads y log de queries lentas van a un directorio temporal
+antes de que `config` lea el entorno.
+
+El fixture `api` levanta la app en el mismo proceso sobre el stand-in SQLite
+de benchmarks/ (una base sembrada por sesión).
+"""
+
+import asyncio
+import os
+import sqlite3
+import sys
+import tempfile
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(os.path.dirname(BACKEND_DIR), "benchmarks")
+for path in (BACKEND_DIR, BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+WORKDIR = tempfile.mkdtemp(prefix="techassist-tests-")
+os.environ.setdefault("UPLOAD_FOLDER", os.path.join(WORKDIR, "uploads"))
+os.environ.setdefault("SLOW_QUERY_LOG_FILE", os.path.join(WORKDIR, "slow_queries.log"))
+# Sin pool de procesos de miniaturas: la generación se prueba aparte
+os.environ.setdefault("THUMBNAILS_ENABLED", "False")
+
+
+class ApiClient:
+    """La app en proceso (httpx + ASGITransport) con un event loop propio"""
+
+    def __init__(self, loop, client, server, db_path: str):
+        self.loop = loop
+        self.client = client
+        self.server = server
+        self.db_path = db_path
+
+    def run(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    def query(self, sql: str, params=()) -> list:
+        """Leer la base SQLite directamente (filas como dicts)"""
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        try:
+            return [dict(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def user(self, username: str) -> dict:
+        return self.query("SELECT id, username, email, role, created_at FROM Users WHERE username = ?", (username,))[0]
+
+    def token(self, username: str) -> str:
+        user = self.user(username)
+        user["created_at"] = None
+        return self.server.create_access_token(data=self.server.principal_claims(user))
+
+    def request(self, method: str, url: str, user: str = None, headers: dict = None, **kwargs):
+        headers = dict(headers or {})
+        if user:
+            headers["Authorization"] = f"Bearer {self.token(user)}"
+        return self.run(self.client.request(method, url, headers=headers, **kwargs))
+
+
+@pytest.fixture(scope="session")
+def api():
+    import httpx
+    import seed
+    import sqlite_standin
+    from database import db
+
+    db_path = os.path.join(WORKDIR, "api.db")
+    seed.seed(db_path, tickets=300, clients=20, technicians=4, admins=1)
+    sqlite_standin.install(db, db_path)
+    import server
+
+    loop = asyncio.new_event_loop()
+    loop.run_until_complete(server.app.router.startup())
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=server.app), base_url="http://test", timeout=60)
+    try:
+        yield ApiClient(loop, client, server, db_path)
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.run_until_complete(server.app.router.shutdown())
+        loop.close()
@@ -0,0 +1,42 @@
+def ticket_of(api, username: str) -> int:
+    user = api.user(username)
+    return api.query("SELECT id FROM Tickets WHERE user_id = ? ORDER BY id LIMIT 1", (user["id"],))[0]["id"]
+
+
+def test_comment_returns_the_new_ticket_etag(api):
+    ticket_id = ticket_of(api, "cliente3")
+    before = api.request("GET", f"/api/tickets/{ticket_id}", user="admin1").headers["ETag"]
+
+    created = api.request(
+        "POST", f"/api/tickets/{ticket_id}/comments", user="cliente3", json={"comment": "Sigue igual"}
+    )
+    assert created.status_code == 201
+    etag = created.headers["ETag"]
+    assert etag != before
+    assert api.request("GET", f"/api/tickets/{ticket_id}", user="admin1").headers["ETag"] == etag
+
+    # El ETag anterior ya no sirve para If-Match; el de la respuesta sí
+    def update(if_match: str):
+        return api.request(
+            "PUT", f"/api/tickets/{ticket_id}", user="admin1", headers={"If-Match": if_match}, json={"priority": "alta"}
+        )
+
+    assert update(before).status_code == 412
+    assert update(etag).status_code == 200
+
+    comment_id = created.json()["id"]
+    deleted = api.request("DELETE", f"/api/tickets/{ticket_id}/comments/{comment_id}", user="cliente3")
+    assert deleted.status_code == 204
+    assert deleted.headers["ETag"] == api.request("GET", f"/api/tickets/{ticket_id}", user="admin1").headers["ETag"]
+
+
+def test_attachment_upload_returns_the_new_ticket_etag(api):
+    ticket_id = ticket_of(api, "cliente4")
+
+    uploaded = api.request(
+        "POST", f"/api/upload?ticket_id={ticket_id}", user="cliente4",
+        files={"file": ("nota.pdf", b"%PDF-1.4 prueba", "application/pdf")},
+    )
+
+    assert uploaded.status_code == 200
+    assert uploaded.headers["ETag"] == api.request("GET", f"/api/tickets/{ticket_id}", user="admin1").headers["ETag"]
@@ -0,0 +1,103 @@
+from collections import Counter
+
+from assignment import AssignmentEngine, weight
+
+TECHNICIANS = [{"id": 1, "username": "ana"}, {"id": 2, "username": "beto"}, {"id": 3, "username": "carla"}]
+
+
+def engine_with(tickets=()) -> AssignmentEngine:
+    engine = AssignmentEngine(resync_interval=0)
+    engine.rebuild(TECHNICIANS, tickets)
+    return engine
+
+
+def test_reserve_picks_the_least_loaded_technician():
+    engine = engine_with([
+        {"id": 10, "assigned_to": 1, "priority": "urgente"},
+        {"id": 11, "assigned_to": 2, "priority": "baja"},
+    ])
+    assert engine.reserve("media") == 3
+    assert engine.reserve("media") == 2
+    engine.release(2, "media")
+    assert engine._load == {1: 8, 2: 1, 3: 2}
+
+
+def test_reserve_without_technicians_returns_none():
+    engine = AssignmentEngine(resync_interval=0)
+    assert engine.reserve("alta") is None
+    assert engine.reserve_many(["alta", "baja"]) == [None, None]
+
+
+def test_reserve_many_spreads_a_batch():
+    engine = engine_with()
+    technicians = engine.reserve_many(["urgente"] * 6)
+    assert Counter(technicians) == {1: 2, 2: 2, 3: 2}
+    assert set(engine._load.values()) == {2 * weight("urgente")}
+
+
+def test_plan_does_not_touch_the_real_loads():
+    engine = engine_with()
+    plan = engine.plan([(100, "alta"), (101, "alta"), (102, "alta")])
+    assert sorted(technician for _, technician in plan) == [1, 2, 3]
+    assert set(engine._load.values()) == {0}
+
+
+def test_track_moves_load_between_technicians_and_forget_removes_it():
+    engine = engine_with()
+    engine.track({"id": 50, "assigned_to": 1, "status": "abierto", "priority": "alta"})
+    engine.track({"id": 50, "assigned_to": 2, "status": "en_proceso", "priority": "alta"})
+    assert engine._load == {1: 0, 2: 4, 3: 0}
+    engine.track({"id": 50, "assigned_to": 2, "status": "resuelto", "priority": "alta"})
+    assert engine._load[2] == 0
+    engine.track({"id": 51, "assigned_to": 3, "status": "abierto", "priority": "baja"})
+    engine.forget(51)
+    assert engine._load[3] == 0
+    assert engine.stats()["tracked_tickets"] == 0
+
+
+def test_bulk_create_spreads_tickets_across_technicians(api, monkeypatch):
+    server = api.server
+    technicians = api.query("SELECT id, username FROM Users WHERE role = 'tecnico' ORDER BY id")[:3]
+    engine = AssignmentEngine(resync_interval=0)
+    engine.rebuild(technicians, [])
+    monkeypatch.setattr(server, "assignment_engine", engine)
+    monkeypatch.setattr(server.settings, "AUTO_ASSIGN_PRIORITIES", {"urgente"})
+
+    staged = []
+
+    # El stand-in SQLite no ejecuta MERGE: se registra lo que se escribiría
+    def bulk_create(cursor, user_id, items):
+        staged.extend(items)
+        return {
+            index: {"index": index, "status": 201, "id": 90000 + index, "user_id": user_id,
+                    "assigned_to": assigned_to, "version": None}
+            for index, _, _, _, assigned_to in items
+        }
+
+    monkeypatch.setattr(server.bulk, "bulk_create", bulk_create)
+    items = [{"title": f"Urgente {n}", "priority": "urgente"} for n in range(6)]
+    items.append({"title": "Sin asignar", "priority": "baja"})
+    response = api.request("POST", "/api/tickets/bulk", user="cliente1", json={"items": items})
+    assert response.status_code == 200, response.text
+
+    assigned = Counter(row[4] for row in staged if row[3] == "urgente")
+    assert assigned == {technician["id"]: 2 for technician in technicians}
+    assert [row[4] for row in staged if row[3] == "baja"] == [None]
+    # Las reservas se convirtieron en tickets seguidos por el motor
+    assert set(engine._load.values()) == {2 * weight("urgente")}
+    assert engine.stats()["tracked_tickets"] == 6
+
+
+def test_failed_bulk_create_releases_reservations(api, monkeypatch):
+    server = api.server
+    engine = engine_with()
+    monkeypatch.setattr(server, "assignment_engine", engine)
+    monkeypatch.setattr(server.settings, "AUTO_ASSIGN_PRIORITIES", {"alta"})
+
+    def bulk_create(cursor, user_id, items):
+        raise RuntimeError("deadlock")
+
+    monkeypatch.setattr(server.bulk, "bulk_create", bulk_create)
+    response = api.request("POST", "/api/tickets/bulk", user="cliente1", json={"items": [{"title": "x", "priority": "alta"}]})
+    assert response.status_code == 500
+    assert set(engine._load.values()) == {0}
@@ -0,0 +1,143 @@
+import asyncio
+import time
+from datetime import date, datetime
+
+import pytest
+
+from cache import ReadThroughCache, RedisBackend, SingleFlight, TTLCache, decode_value, encode_value
+
+
+def test_ttl_cache_get_set_and_delete():
+    cache = TTLCache(maxsize=10, ttl=60)
+    cache.set(1, {"id": 1})
+    assert cache.get(1) == {"id": 1}
+    assert cache.delete(1) is True
+    assert cache.delete(1) is False
+    assert cache.get(1, "default") == "default"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+def test_ttl_cache_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = TTLCache(maxsize=10, ttl=5)
+    cache.set("a", 1)
+    cache.set("b", 2, ttl=30)
+    now[0] += 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert len(cache) == 1
+
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_single_flight_shares_concurrent_calls():
+    flights = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        return await asyncio.gather(*(flights.do("key", load) for _ in range(5)))
+
+    assert asyncio.run(main()) == ["value"] * 5
+    assert len(calls) == 1
+    assert len(flights) == 0
+
+
+def test_single_flight_cancelled_caller_does_not_cancel_the_load():
+    flights = SingleFlight()
+
+    async def load():
+        await asyncio.sleep(0.01)
+        return "value"
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", load))
+        second = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "value"
+
+
+def test_single_flight_forget_starts_a_new_load():
+    flights = SingleFlight()
+    calls = []
+
+    async def load():
+        calls.append(1)
+        number = len(calls)
+        await asyncio.sleep(0.01)
+        return number
+
+    async def main():
+        first = asyncio.ensure_future(flights.do("key", load))
+        await asyncio.sleep(0)
+        flights.forget("key")
+        second = await flights.do("key", load)
+        return await first, second
+
+    assert asyncio.run(main()) == (1, 2)
+
+
+class FakeRedis:
+    """Lo mínimo de redis.asyncio.Redis que usa RedisBackend"""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def close(self):
+        pass
+
+
+def test_json_encoding_handles_dates_and_binary_values():
+    value = {"at": datetime(2024, 5, 1, 12, 30), "day": date(2024, 5, 1), "row_version": b"\x00\x00\x00\x00\x00\x00\x07\xd1"}
+    assert decode_value(encode_value(value)) == {
+        "at": "2024-05-01T12:30:00", "day": "2024-05-01", "row_version": "0x00000000000007D1"
+    }
+    with pytest.raises(TypeError):
+        encode_value({"value": object()})
+
+
+def test_redis_backend_round_trips_a_ticket_row(api, monkeypatch):
+    server = api.server
+    redis = FakeRedis()
+    cache = ReadThroughCache(RedisBackend("", client=redis), ttl=30)
+    monkeypatch.setattr(server, "response_cache", cache)
+    ticket_id = api.query("SELECT id FROM Tickets LIMIT 1")[0]["id"]
+
+    loaded = api.request("GET", f"/api/tickets/{ticket_id}", user="admin1")
+    cached = api.request("GET", f"/api/tickets/{ticket_id}", user="admin1")
+    assert loaded.status_code == cached.status_code == 200
+    assert cache.stats()["errors"] == 0
+    assert cache.backend.hits == 1
+    assert cached.json() == loaded.json()
+    # Solo campos de TicketResponse: ni rowversion binario ni columnas internas
+    stored = decode_value(redis.data[f"proyev:ticket:{ticket_id}:staff"])
+    assert set(stored) == set(server.TicketResponse.model_fields)
@@ -0,0 +1,56 @@
+import json
+
+from events import TICKET_CREATED, TICKET_UPDATED, TicketEventBus
+
+CLIENT = {"id": 7, "role": "cliente"}
+STAFF = {"id": 1, "role": "admin"}
+
+
+def payload(event) -> dict:
+    data = event.frame.decode().split("data: ", 1)[1]
+    return json.loads(data)
+
+
+def test_clients_only_replay_their_own_tickets():
+    bus = TicketEventBus(history_size=10)
+    bus.publish(TICKET_CREATED, {"id": 1, "user_id": 7})
+    first = f"{bus.epoch}-1"
+    bus.publish(TICKET_CREATED, {"id": 2, "user_id": 8})
+    bus.publish(TICKET_UPDATED, {"id": 1, "user_id": 7})
+
+    _, replay, reset = bus.subscribe(CLIENT, first)
+    assert not reset
+    assert [payload(event)["ticket"]["id"] for event in replay] == [1]
+    _, replay, _ = bus.subscribe(STAFF, first)
+    assert [payload(event)["ticket"]["id"] for event in replay] == [2, 1]
+
+
+def test_unknown_or_expired_ids_require_reset():
+    bus = TicketEventBus(history_size=2)
+    for ticket_id in range(5):
+        bus.publish(TICKET_CREATED, {"id": ticket_id, "user_id": 7})
+    assert bus.subscribe(STAFF, f"{bus.epoch}-1")[2]
+    assert bus.subscribe(STAFF, "otra-epoca-4")[2]
+    assert not bus.subscribe(STAFF, f"{bus.epoch}-4")[2]
+
+
+def test_full_queue_drops_the_subscriber():
+    bus = TicketEventBus(queue_size=1)
+    subscription, _, _ = bus.subscribe(STAFF)
+    bus.publish(TICKET_CREATED, {"id": 1, "user_id": 7})
+    bus.publish(TICKET_CREATED, {"id": 2, "user_id": 7})
+    assert subscription.queue.get_nowait() is None
+    assert bus.stats()["dropped_subscribers"] == 1
+
+
+def test_ticket_events_only_carry_response_fields(api):
+    ticket = api.query("SELECT t.id, u.username FROM Tickets t JOIN Users u ON u.id = t.user_id LIMIT 1")[0]
+    response = api.request("PUT", f"/api/tickets/{ticket['id']}", user="admin1", json={"priority": "baja"})
+    assert response.status_code == 200, response.text
+
+    event = api.server.ticket_events._history[-1]
+    published = payload(event)["ticket"]
+    assert published["id"] == ticket["id"]
+    assert "row_version" not in published
+    assert set(published) <= set(api.server.TicketResponse.model_fields)
+    assert published["version"] == response.json()["version"]
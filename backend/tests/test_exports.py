@@ -0,0 +1,33 @@
+import json
+
+
+def test_export_pages_through_every_visible_ticket(api, monkeypatch):
+    monkeypatch.setattr(api.server.settings, "EXPORT_BATCH_SIZE", 7)
+
+    response = api.request("GET", "/api/tickets/export?order=asc", user="admin1")
+
+    assert response.status_code == 200
+    ids = [json.loads(line)["id"] for line in response.text.splitlines()]
+    expected = [row["id"] for row in api.query("SELECT id FROM Tickets ORDER BY created_at, id")]
+    assert ids == expected
+
+    client = api.user("cliente5")
+    own = api.query("SELECT COUNT(*) as n FROM Tickets WHERE user_id = ?", (client["id"],))[0]["n"]
+    csv_export = api.request("GET", "/api/tickets/export?format=csv", user="cliente5")
+    assert len(csv_export.text.splitlines()) == own + 1
+
+
+def test_export_releases_the_connection_between_batches(api):
+    server = api.server
+
+    async def first_batch():
+        batches = server.export_batches([], [], "desc", 5)
+        rows = await batches.__anext__()
+        in_use = server.db.pool.stats()["in_use"]
+        await batches.aclose()
+        return rows, in_use
+
+    rows, in_use = api.run(first_batch())
+
+    assert len(rows) == 5
+    assert in_use == 0
@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+from importer import ImportLeaseLost, ImportProgress, TicketImporter
+
+
+class FakeCursor:
+    def __init__(self, rowcount: int):
+        self.rowcount = rowcount
+        self.statements = []
+
+    def execute(self, query, *params):
+        self.statements.append(query)
+
+
+def test_write_batch_rejects_a_lost_lease():
+    cursor = FakeCursor(rowcount=0)
+    with pytest.raises(ImportLeaseLost):
+        TicketImporter._write_batch(cursor, [], [], "job", "owner", 300, 10, 5, 1)
+    assert any("owner = ?" in statement for statement in cursor.statements)
+
+
+def test_lease_allows_a_single_owner(api):
+    from database import db
+
+    importer = TicketImporter(db, lease_seconds=300)
+    assert importer.load_checkpoint("lease-job") is None
+    assert importer.acquire("lease-job", "worker-a")
+    assert importer.acquire("lease-job", "worker-a")
+    assert not importer.acquire("lease-job", "worker-b")
+    assert importer.load_checkpoint("lease-job")["status"] == "running"
+
+    importer.release("lease-job", "worker-b")
+    assert importer.load_checkpoint("lease-job")["status"] == "running"
+    importer.release("lease-job", "worker-a", completed=True)
+    assert importer.load_checkpoint("lease-job")["status"] == "done"
+    assert importer.acquire("lease-job", "worker-b")
+    importer.release("lease-job", "worker-b")
+
+
+def test_expired_lease_can_be_taken_over(api):
+    from database import db
+
+    importer = TicketImporter(db, lease_seconds=-1)
+    assert importer.acquire("expired-job", "worker-a")
+    assert importer.load_checkpoint("expired-job")["status"] == "interrupted"
+    assert importer.acquire("expired-job", "worker-b")
+
+
+def test_start_import_conflicts_with_a_lease_held_elsewhere(api):
+    from database import db
+
+    TicketImporter(db, lease_seconds=300).acquire("busy-job", "other-process")
+    response = api.request(
+        "POST", "/api/admin/imports?format=ndjson&job=busy-job", user="admin1", content=b"{}\n"
+    )
+    assert response.status_code == 409
+    status = api.request("GET", "/api/admin/imports/busy-job", user="admin1").json()
+    assert status["status"] == "running"
+
+
+def test_finished_jobs_are_pruned_after_retention(api, monkeypatch):
+    server = api.server
+    monkeypatch.setattr(server.settings, "IMPORT_JOB_RETENTION", 60)
+    finished = ImportProgress(job="old", status="done", finished_at=time.monotonic() - 120)
+    recent = ImportProgress(job="recent", status="done", finished_at=time.monotonic())
+    running = ImportProgress(job="running")
+    monkeypatch.setattr(server, "import_jobs", {"old": finished, "recent": recent, "running": running})
+    server.prune_import_jobs()
+    assert set(server.import_jobs) == {"recent", "running"}
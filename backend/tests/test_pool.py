@@ -0,0 +1,133 @@
+import threading
+
+import pytest
+
+from database import ConnectionPool, PoolTimeoutError
+
+
+class FakeConnection:
+    """Conexión de prueba; `alive` decide si responde al SELECT 1"""
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, query):
+        if not self.conn.alive:
+            raise ConnectionError("conexión perdida")
+
+    def fetchone(self):
+        return (1,)
+
+    def close(self):
+        pass
+
+
+def make_pool(**options):
+    opened = []
+
+    def connect(connection_string):
+        conn = FakeConnection()
+        opened.append(conn)
+        return conn
+
+    return ConnectionPool("DSN=test", connect=connect, **options), opened
+
+
+def test_connections_are_reused_up_to_max_size():
+    pool, opened = make_pool(min_size=1, max_size=2)
+    pool.fill()
+    assert len(opened) == 1
+
+    first = pool.acquire()
+    second = pool.acquire()
+    pool.release(first)
+    again = pool.acquire()
+
+    assert again is first
+    assert len(opened) == 2
+    stats = pool.stats()
+    assert stats["size"] == 2 and stats["in_use"] == 2
+    assert stats["checkouts"] == 3
+    pool.release(second)
+    pool.release(again)
+    assert pool.stats()["idle"] == 2
+
+
+def test_exhausted_pool_times_out():
+    pool, _ = make_pool(min_size=0, max_size=1)
+    held = pool.acquire()
+
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire(timeout=0.05)
+
+    stats = pool.stats()
+    assert stats["timeouts"] == 1 and stats["waits"] == 1
+    pool.release(held)
+
+
+def test_waiter_gets_the_released_connection():
+    pool, opened = make_pool(min_size=0, max_size=1)
+    held = pool.acquire()
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(pool.acquire(timeout=5)))
+    waiter.start()
+
+    pool.release(held)
+    waiter.join(5)
+
+    assert result == [held]
+    assert len(opened) == 1
+
+
+def test_dead_connections_are_replaced_after_ping():
+    pool, opened = make_pool(min_size=1, max_size=1)
+    pool.fill()
+    opened[0].alive = False
+
+    pooled = pool.acquire()
+
+    assert pooled.conn is opened[1]
+    assert opened[0].closed
+    stats = pool.stats()
+    assert stats["ping_failures"] == 1 and stats["connections_discarded"] == 1
+    assert stats["size"] == 1
+
+
+def test_old_connections_are_recycled():
+    pool, opened = make_pool(min_size=0, max_size=1, recycle=60, pre_ping=False)
+    pooled = pool.acquire()
+    pool.release(pooled)
+    pooled.created_at -= 61
+
+    assert pool.acquire().conn is opened[1]
+    assert opened[0].closed
+
+
+def test_discarded_connections_free_their_slot():
+    pool, opened = make_pool(min_size=0, max_size=1)
+    pool.release(pool.acquire(), discard=True)
+
+    assert pool.acquire(timeout=0.05).conn is opened[1]
+    assert pool.stats()["connections_discarded"] == 1
+
+
+def test_closed_pool_rejects_checkouts():
+    pool, opened = make_pool(min_size=1, max_size=1)
+    pool.fill()
+    pool.close()
+
+    assert opened[0].closed
+    with pytest.raises(RuntimeError):
+        pool.acquire()
@@ -0,0 +1,33 @@
+import pytest
+
+from querylog import SlowQueryLog, is_read_only
+
+
+@pytest.mark.parametrize("query", [
+    "SELECT id FROM Tickets WHERE status = 'abierto'",
+    "  with t AS (SELECT id FROM Tickets) SELECT * FROM t",
+    "SELECT id FROM Tickets WITH (UPDLOCK) WHERE updated_at > ?",
+    "SELECT 'UPDATE' as verb -- DELETE en un comentario",
+])
+def test_reads_can_be_rerun(query):
+    assert is_read_only(query)
+
+
+@pytest.mark.parametrize("query", [
+    "WITH t AS (SELECT id FROM Tickets WHERE status = ?) UPDATE Tickets SET status = 'cerrado' WHERE id IN (SELECT id FROM t)",
+    "WITH old AS (SELECT TOP (10) * FROM ImportCheckpoints) DELETE FROM old",
+    "WITH src AS (SELECT 1 as id) MERGE Tickets USING src ON 1 = 0 WHEN NOT MATCHED THEN INSERT (id) VALUES (src.id);",
+    "SELECT * INTO #copia FROM Tickets",
+    "UPDATE Tickets SET status = ? WHERE id = ?",
+    "",
+])
+def test_writes_are_never_rerun(query):
+    assert not is_read_only(query)
+
+
+def test_statistics_plans_skip_cte_updates(monkeypatch):
+    monkeypatch.setattr("querylog.random.random", lambda: 0.0)
+    log = SlowQueryLog(plan_mode="statistics", plan_sample_rate=1.0)
+
+    assert log.wants_plan("WITH t AS (SELECT 1 as id) SELECT id FROM t")
+    assert not log.wants_plan("WITH t AS (SELECT 1 as id) UPDATE Tickets SET priority = 'alta' WHERE id IN (SELECT id FROM t)")
@@ -0,0 +1,93 @@
+import pytest
+
+from search import (
+    build_search_query,
+    decode_search_cursor,
+    encode_search_cursor,
+    search_condition,
+    search_rows,
+)
+
+COLUMNS = ("id", "title", "score", "source_hits")
+
+
+def test_search_condition_keeps_word_prefixes():
+    assert search_condition('Impresora "red" OR x') == '"impresora*" AND "red*" AND "or*"'
+    assert search_condition("* ) a") is None
+
+
+def test_search_cursor_round_trip():
+    assert decode_search_cursor(encode_search_cursor(128, 42)) == (128, 42)
+    with pytest.raises(ValueError):
+        decode_search_cursor("no-es-un-cursor")
+
+
+def test_client_searches_are_scoped_before_ranking():
+    query, params = build_search_query('"red*"', 20, user_id=7, max_candidates=1000)
+
+    assert query.count("CONTAINSTABLE") == 3
+    assert query.count("s.user_id = ?") == 3
+    assert "?, ?)" not in query
+    assert params == ['"red*"', 7] * 3 + [21]
+
+
+def test_staff_searches_keep_the_global_cap():
+    cursor = encode_search_cursor(128, 42)
+    query, params = build_search_query('"red*"', 20, max_candidates=1000, cursor=cursor)
+
+    assert query.count("?, ?)") == 3
+    assert "user_id = ?" not in query
+    assert params == ['"red*"', 1000] * 3 + [21, 128, 128, 42]
+
+
+def test_search_rows_drops_filler_and_reports_truncation():
+    rows = [(3, "Red caída", 96, 1000), (None, None, 40, 1000)]
+
+    page = search_rows(COLUMNS, rows)
+
+    assert [(ticket.id, ticket.title, ticket.score) for ticket in page] == [(3, "Red caída", 96)]
+    assert not hasattr(page[0], "source_hits")
+    assert page.truncated(1000)
+    assert not page.truncated(None)
+
+
+def test_empty_page_still_reports_truncation():
+    page = search_rows(COLUMNS, [(None, None, 40, 1000)])
+
+    assert page == []
+    assert page.truncated(1000)
+    assert not search_rows(COLUMNS, [(3, "Red", 96, 999)]).truncated(1000)
+    assert not search_rows(COLUMNS, []).truncated(1000)
+
+
+def create_ticket(api, user: str, title: str, description: str) -> int:
+    response = api.request(
+        "POST", "/api/tickets", user=user,
+        json={"title": title, "description": description, "priority": "baja"},
+    )
+    assert response.status_code in (200, 201)
+    return response.json()["id"]
+
+
+def search(api, user: str, text: str):
+    return api.request("GET", f"/api/tickets/search?q={text}", user=user)
+
+
+def test_client_matches_below_the_global_cap_are_found(api, monkeypatch):
+    monkeypatch.setattr(api.server.settings, "SEARCH_MAX_CANDIDATES", 3)
+    for _ in range(5):
+        create_ticket(api, "cliente2", "Zorrillo zorrillo zorrillo", "zorrillo zorrillo en la bodega")
+    own = {
+        create_ticket(api, "cliente1", "Olor raro", "Un zorrillo en el estacionamiento"),
+        create_ticket(api, "cliente1", "Ruido", "Posible zorrillo bajo el piso"),
+    }
+
+    staff = search(api, "admin1", "zorrillo")
+    assert staff.status_code == 200
+    assert staff.headers.get("X-Search-Truncated") == "true"
+    assert own.isdisjoint(ticket["id"] for ticket in staff.json())
+
+    client = search(api, "cliente1", "zorrillo")
+    assert client.status_code == 200
+    assert {ticket["id"] for ticket in client.json()} == own
+    assert "X-Search-Truncated" not in client.headers
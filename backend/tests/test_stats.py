@@ -0,0 +1,67 @@
+import asyncio
+
+from stats import USER_TICKETS_QUERY, StatsService
+
+
+class FakeDatabase:
+    """Cuenta consultas; `tickets` es el contador que devuelve por usuario"""
+
+    def __init__(self):
+        self.tickets = {}
+        self.queries = 0
+        self.gate = None
+
+    async def fetch_one(self, query, params=()):
+        assert query == USER_TICKETS_QUERY
+        self.queries += 1
+        count = self.tickets.get(params[0], 0)
+        if self.gate is not None:
+            await self.gate.wait()
+        return {"count": count}
+
+
+def test_user_tickets_are_cached_until_invalidated():
+    database = FakeDatabase()
+    service = StatsService(database, ttl=60)
+
+    async def main():
+        database.tickets[7] = 1
+        assert await service.user_tickets(7) == 1
+        database.tickets[7] = 2
+        assert await service.user_tickets(7) == 1
+        service.invalidate_tickets(7)
+        assert await service.user_tickets(7) == 2
+
+    asyncio.run(main())
+    assert database.queries == 2
+
+
+def test_invalidate_tickets_drops_totals_and_listed_users_only():
+    service = StatsService(FakeDatabase(), ttl=60)
+    for key in ("general", "workload", ("user", 1), ("user", 2)):
+        service.cache.set(key, {"cached": True})
+    service.invalidate_tickets(1, None)
+    assert service.cache.get("general") is None
+    assert service.cache.get("workload") is None
+    assert service.cache.get(("user", 1)) is None
+    assert service.cache.get(("user", 2)) == {"cached": True}
+
+
+def test_invalidation_during_a_load_is_not_overwritten():
+    database = FakeDatabase()
+    service = StatsService(database, ttl=60)
+
+    async def main():
+        database.gate = asyncio.Event()
+        database.tickets[7] = 1
+        stale = asyncio.ensure_future(service.user_tickets(7))
+        while not database.queries:
+            await asyncio.sleep(0)
+        database.tickets[7] = 2
+        service.invalidate_tickets(7)
+        database.gate.set()
+        assert await stale == 1
+        database.gate = None
+        return await service.user_tickets(7)
+
+    assert asyncio.run(main()) == 2
@@ -0,0 +1,62 @@
+import io
+import os
+
+from PIL import Image
+
+from thumbnails import ThumbnailPipeline, preview_paths
+
+
+def touch(path: str):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "wb").close()
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "red").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def test_derived_urls_fall_back_while_pending(tmp_path):
+    pipeline = ThumbnailPipeline(sizes=(512, 128))
+    image = str(tmp_path / "ab" / "cd" / "abcd.png")
+    pdf = str(tmp_path / "ab" / "cd" / "abcd.pdf")
+    assert pipeline.derived_urls("/uploads/ab/cd/abcd.png", image) == (
+        "/uploads/ab/cd/abcd.png", "/uploads/ab/cd/abcd.png"
+    )
+    assert pipeline.derived_urls("/uploads/ab/cd/abcd.pdf", pdf) == (None, None)
+
+
+def test_derived_urls_use_generated_files(tmp_path):
+    pipeline = ThumbnailPipeline(sizes=(128, 512))
+    source = str(tmp_path / "abcd.pdf")
+    paths = preview_paths(str(tmp_path / "abcd"), (512,))
+    touch(paths["512"])
+    assert pipeline.derived_urls("/uploads/abcd.pdf", source) == ("/uploads/abcd.thumb-512.webp", None)
+    touch(paths["preview"])
+    assert pipeline.derived_urls("/uploads/abcd.pdf", source) == (
+        "/uploads/abcd.thumb-512.webp", "/uploads/abcd.preview.webp"
+    )
+
+
+def test_attachments_list_exposes_preview_urls(api):
+    owner = api.query("SELECT u.username, t.id FROM Tickets t JOIN Users u ON u.id = t.user_id LIMIT 1")[0]
+    response = api.request(
+        "POST", f"/api/upload?ticket_id={owner['id']}", user=owner["username"],
+        files={"file": ("pantalla.png", png_bytes(), "image/png")},
+    )
+    assert response.status_code == 200, response.text
+    file_url = response.json()["url"]
+
+    page = api.request("GET", f"/api/tickets/{owner['id']}/attachments", user=owner["username"])
+    attachment = [item for item in page.json() if item["file_url"] == file_url][0]
+    assert attachment["thumbnail_url"] == file_url
+    assert attachment["preview_url"] == file_url
+
+    stem = api.server.content_store.absolute_path(file_url[len("/uploads/"):]).rsplit(".", 1)[0]
+    for path in preview_paths(stem, api.server.thumbnail_pipeline.sizes).values():
+        touch(path)
+    page = api.request("GET", f"/api/tickets/{owner['id']}/attachments", user=owner["username"])
+    attachment = [item for item in page.json() if item["file_url"] == file_url][0]
+    assert attachment["thumbnail_url"].endswith(".thumb-512.webp")
+    assert attachment["preview_url"].endswith(".preview.webp")
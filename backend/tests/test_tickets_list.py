@@ -0,0 +1,73 @@
+from datetime import datetime
+
+import pytest
+from fastapi import HTTPException
+
+from server import decode_cursor, encode_cursor
+
+
+def test_page_etag_revalidates_only_against_the_page(api):
+    first = api.request("GET", "/api/tickets?limit=5", user="admin1")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    page_ids = [ticket["id"] for ticket in first.json()]
+
+    cached = api.request("GET", "/api/tickets?limit=5", user="admin1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+
+    # Un ticket fuera de la página (y de la fila extra) no invalida el ETag
+    outside = api.query("SELECT id FROM Tickets ORDER BY created_at ASC, id ASC LIMIT 1")[0]["id"]
+    assert outside not in page_ids
+    api.request("PUT", f"/api/tickets/{outside}", user="admin1", json={"priority": "baja"})
+    cached = api.request("GET", "/api/tickets?limit=5", user="admin1", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    api.request("PUT", f"/api/tickets/{page_ids[2]}", user="admin1", json={"status": "en_proceso"})
+    changed = api.request("GET", "/api/tickets?limit=5", user="admin1", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+
+
+def test_page_etag_is_the_same_with_and_without_if_none_match(api):
+    plain = api.request("GET", "/api/tickets?limit=3&order=asc", user="admin1")
+    stale = api.request("GET", "/api/tickets?limit=3&order=asc", user="admin1", headers={"If-None-Match": 'W/"x"'})
+    assert stale.status_code == 200
+    assert plain.headers["ETag"] == stale.headers["ETag"]
+    assert plain.json() == stale.json()
+
+
+def test_cursor_round_trip_and_invalid_cursor():
+    created_at = datetime(2025, 1, 20, 10, 30, 15, 250000)
+    assert decode_cursor(encode_cursor(created_at, 42)) == (created_at, 42)
+    for cursor in ("no-es-un-cursor", encode_cursor(created_at, 42)[:-4]):
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(cursor)
+        assert error.value.status_code == 400
+
+
+def test_cursor_pages_cover_every_ticket_once(api):
+    seen = []
+    url = "/api/tickets?limit=40"
+    while True:
+        response = api.request("GET", url, user="admin1")
+        assert response.status_code == 200
+        seen.extend(ticket["id"] for ticket in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        url = f"/api/tickets?limit=40&cursor={cursor}"
+
+    total = api.query("SELECT COUNT(*) as n FROM Tickets")[0]["n"]
+    assert len(seen) == len(set(seen)) == total
+
+    bad = api.request("GET", "/api/tickets?cursor=basura", user="admin1")
+    assert bad.status_code == 400
+
+
+def test_listing_is_paginated_by_default(api):
+    response = api.request("GET", "/api/tickets", user="admin1")
+
+    assert response.status_code == 200
+    assert len(response.json()) == 50
+    assert "X-Next-Cursor" in response.headers
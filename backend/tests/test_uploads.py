@@ -0,0 +1,136 @@
+import asyncio
+import os
+
+import pytest
+from fastapi import HTTPException
+
+from uploads import FileRangeResponse, _parse_range
+
+
+def upload(api, content: bytes, filename: str = "captura.png"):
+    return api.request("POST", "/api/upload", user="cliente1", files={"file": (filename, content, "image/png")})
+
+
+def leftover_temp_files(api) -> list:
+    tmp_dir = api.server.content_store.tmp_dir
+    return os.listdir(tmp_dir) if os.path.isdir(tmp_dir) else []
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("bytes=0-9", (0, 9)),
+    ("bytes=10-", (10, 99)),
+    ("bytes=-20", (80, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=90-1000", (90, 99)),
+    ("items=0-9", None),
+    ("bytes=0-9,20-29", None),
+    # Mal formados: se ignoran y se envía el archivo completo
+    ("bytes=abc", None),
+    ("bytes=5-3", None),
+    ("bytes=-0", None),
+    ("bytes=x-y", None),
+    ("bytes=-", None),
+    ("bytes=+1-5", None),
+])
+def test_parse_range(header, expected):
+    assert _parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=150-200"])
+def test_unsatisfiable_ranges_raise_416(header):
+    with pytest.raises(HTTPException) as error:
+        _parse_range(header, 100)
+    assert error.value.status_code == 416
+    assert error.value.headers["Content-Range"] == "bytes */100"
+
+
+def test_upload_is_stored_by_content_and_deduplicated(api):
+    content = os.urandom(3000)
+
+    first = upload(api, content)
+    second = upload(api, content, "otra.png")
+
+    assert first.status_code == 200
+    assert first.json()["size"] == 3000
+    assert not first.json()["deduplicated"]
+    assert second.json()["deduplicated"]
+    assert second.json()["url"] == first.json()["url"]
+
+
+def test_upload_limits(api, monkeypatch):
+    monkeypatch.setattr(api.server.settings, "MAX_UPLOAD_SIZE", 1000)
+
+    # Por debajo del margen de Content-Length: lo corta el parser bloque a bloque
+    streamed = upload(api, os.urandom(5000))
+    assert streamed.status_code == 413
+    # Content-Length declarado muy por encima del límite: se rechaza sin leer
+    declared = upload(api, os.urandom(200 * 1024))
+    assert declared.status_code == 413
+    assert leftover_temp_files(api) == []
+
+    assert upload(api, os.urandom(1000)).status_code == 200
+    rejected = upload(api, b"MZ", "programa.exe")
+    assert rejected.status_code == 400
+    missing = api.request("POST", "/api/upload", user="cliente1", data={"ticket_id": "1"})
+    assert missing.status_code == 400
+
+
+def test_download_ranges_and_revalidation(api):
+    content = os.urandom(200 * 1024)
+    url = upload(api, content).json()["url"]
+
+    full = api.request("GET", url)
+    assert full.status_code == 200
+    assert full.content == content
+    assert full.headers["accept-ranges"] == "bytes"
+    etag = full.headers["etag"]
+
+    middle = api.request("GET", url, headers={"Range": "bytes=70000-140000"})
+    assert middle.status_code == 206
+    assert middle.headers["content-range"] == f"bytes 70000-140000/{len(content)}"
+    assert middle.content == content[70000:140001]
+
+    tail = api.request("GET", url, headers={"Range": "bytes=-10"})
+    assert tail.content == content[-10:]
+
+    outside = api.request("GET", url, headers={"Range": f"bytes={len(content)}-"})
+    assert outside.status_code == 416
+
+    malformed = api.request("GET", url, headers={"Range": "bytes=abc"})
+    assert malformed.status_code == 200
+    assert malformed.content == content
+
+    stale = api.request("GET", url, headers={"Range": "bytes=0-9", "If-Range": '"otro"'})
+    assert stale.status_code == 200
+    assert len(stale.content) == len(content)
+
+    head = api.request("HEAD", url)
+    assert head.status_code == 200
+    assert head.headers["content-length"] == str(len(content))
+    assert head.content == b""
+
+    cached = api.request("GET", url, headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+
+def test_zero_copy_send_gets_an_open_file_object(tmp_path):
+    path = tmp_path / "datos.bin"
+    path.write_bytes(b"0123456789")
+    response = FileRangeResponse(
+        str(path), start=2, length=5, status_code=206, headers={}, media_type="application/octet-stream"
+    )
+    scope = {"type": "http", "extensions": {"http.response.zerocopysend": {}}}
+    sent = []
+
+    async def send(message):
+        if message["type"] == "http.response.zerocopysend":
+            file = message["file"]
+            assert not file.closed
+            file.seek(message["offset"])
+            message = {**message, "body": file.read(message["count"])}
+        sent.append(message)
+
+    asyncio.run(response(scope, None, send))
+
+    assert sent[-1]["body"] == b"23456"
+    assert sent[-1]["file"].closed
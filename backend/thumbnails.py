@@ -0,0 +1,182 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "gif"}
+PDF_EXTENSIONS = {"pdf"}
+
+
+def preview_paths(stem: str, sizes: Iterable[int]) -> Dict[str, str]:
+    """Rutas de los derivados de `<stem>.<ext>` (miniaturas y vista previa)"""
+    paths = {str(size): f"{stem}.thumb-{size}.webp" for size in sizes}
+    paths["preview"] = f"{stem}.preview.webp"
+    return paths
+
+
+def _save_webp(image, path: str, quality: int):
+    tmp_path = f"{path}.tmp"
+    image.save(tmp_path, "WEBP", quality=quality, method=4)
+    os.replace(tmp_path, path)
+
+
+def render_previews(
+    source: str,
+    extension: str,
+    sizes: Tuple[int, ...],
+    preview_size: int,
+    quality: int = 80,
+) -> List[str]:
+    """Generar miniaturas WebP y la vista previa (se ejecuta en otro proceso)"""
+    from PIL import Image, ImageOps
+
+    stem = source.rsplit(".", 1)[0]
+    targets = preview_paths(stem, sizes)
+
+    if extension in PDF_EXTENSIONS:
+        import pymupdf
+
+        with pymupdf.open(source) as document:
+            page = document.load_page(0)
+            zoom = preview_size / max(page.rect.width, page.rect.height)
+            pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+            image = Image.frombytes("RGB", (pixmap.width, pixmap.height), pixmap.samples)
+    else:
+        image = Image.open(source)
+        image.seek(0)
+        image = ImageOps.exif_transpose(image)
+
+    if image.mode not in ("RGB", "RGBA"):
+        has_alpha = image.mode in ("LA", "PA") or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+
+    written = []
+    preview = image.copy()
+    preview.thumbnail((preview_size, preview_size))
+    _save_webp(preview, targets["preview"], quality)
+    written.append(targets["preview"])
+
+    for size in sizes:
+        thumb = image.copy()
+        thumb.thumbnail((size, size))
+        _save_webp(thumb, targets[str(size)], quality)
+        written.append(targets[str(size)])
+    return written
+
+
+class ThumbnailPipeline:
+    """Cola acotada de generación de miniaturas sobre un pool de procesos
+
+    `submit` nunca espera: si la cola está llena el trabajo se descarta (y se
+    cuenta), así la respuesta de la subida no depende de la generación.
+    """
+
+    def __init__(
+        self,
+        sizes: Iterable[int] = (128, 512),
+        preview_size: int = 1024,
+        workers: int = 2,
+        queue_size: int = 100,
+        enabled: bool = True,
+    ):
+        self.sizes = tuple(sorted(set(sizes)))
+        self.preview_size = preview_size
+        self.workers = workers
+        self.queue_size = queue_size
+        self.enabled = enabled
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending = set()
+        self._stats = {"queued": 0, "generated": 0, "skipped": 0, "dropped": 0, "failed": 0}
+
+    def supports(self, extension: str) -> bool:
+        return extension in IMAGE_EXTENSIONS or extension in PDF_EXTENSIONS
+
+    def start(self):
+        """Lanzar los consumidores de la cola (llamar dentro del event loop)"""
+        if not self.enabled or self._tasks:
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self):
+        """Detener consumidores y el pool de procesos"""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def submit(self, source: str, extension: str) -> bool:
+        """Encolar un archivo; retorna False si no se encoló"""
+        if not self.enabled or self._queue is None or not self.supports(extension):
+            return False
+        if source in self._pending:
+            return True
+        try:
+            self._queue.put_nowait((source, extension))
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            return False
+        self._pending.add(source)
+        self._stats["queued"] += 1
+        return True
+
+    def derived_urls(self, file_url: str, source: str) -> Tuple[Optional[str], Optional[str]]:
+        """(miniatura, vista previa) de un archivo guardado en `source`
+
+        La miniatura es la de mayor tamaño configurado. Mientras la generación
+        está pendiente (o si se descartó) las imágenes usan el original y los
+        PDF no tienen vista.
+        """
+        extension = file_url.rsplit(".", 1)[-1].lower()
+        fallback = file_url if extension in IMAGE_EXTENSIONS else None
+        if not self.supports(extension):
+            return fallback, fallback
+        sizes = self.sizes[-1:]
+        paths = preview_paths(source.rsplit(".", 1)[0], sizes)
+        urls = preview_paths(file_url.rsplit(".", 1)[0], sizes)
+        thumbnail = fallback
+        if sizes and os.path.exists(paths[str(sizes[0])]):
+            thumbnail = urls[str(sizes[0])]
+        preview = urls["preview"] if os.path.exists(paths["preview"]) else fallback
+        return thumbnail, preview
+
+    def _already_rendered(self, source: str) -> bool:
+        stem = source.rsplit(".", 1)[0]
+        return all(os.path.exists(path) for path in preview_paths(stem, self.sizes).values())
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            source, extension = await self._queue.get()
+            try:
+                # Archivos deduplicados ya tienen sus derivados
+                if await loop.run_in_executor(None, self._already_rendered, source):
+                    self._stats["skipped"] += 1
+                    continue
+                await loop.run_in_executor(
+                    self._executor, render_previews,
+                    source, extension, self.sizes, self.preview_size,
+                )
+                self._stats["generated"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                print(f"❌ Error generando miniaturas de {source}: {e}")
+            finally:
+                self._pending.discard(source)
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        """Contadores de la cola de miniaturas"""
+        return {
+            **self._stats,
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "queue_size": self.queue_size,
+        }
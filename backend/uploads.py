@@ -0,0 +1,420 @@
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+# Margen para los bytes de boundary y headers de cada parte del multipart
+MULTIPART_OVERHEAD = 64 * 1024
+
+# <h[0:2]>/<h[2:4]>/<sha256>[.<derivado>].<ext> (p. ej. miniaturas "<sha256>.thumb-128.webp")
+CONTENT_ADDRESSED_PATH = re.compile(
+    r"^[0-9a-f]{2}/[0-9a-f]{2}/([0-9a-f]{64}(?:\.[a-z0-9-]+)?)\.[a-z0-9]+$"
+)
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+LEGACY_CACHE_CONTROL = "public, max-age=3600"
+
+
+@dataclass
+class StoredFile:
+    """Archivo recibido y guardado por contenido (SHA-256)"""
+    filename: str
+    extension: str
+    sha256: str
+    size: int
+    content_type: Optional[str]
+    relative_path: str
+    deduplicated: bool
+
+
+class ContentStore:
+    """Almacén de archivos direccionado por contenido
+
+    Cada archivo vive en `<raíz>/<h[0:2]>/<h[2:4]>/<sha256>.<ext>`, de modo que
+    subir dos veces la misma captura ocupa disco una sola vez.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.tmp_dir = os.path.join(root, ".tmp")
+
+    def relative_path(self, sha256: str, extension: str) -> str:
+        return f"{sha256[:2]}/{sha256[2:4]}/{sha256}.{extension}"
+
+    def absolute_path(self, relative_path: str) -> str:
+        return os.path.join(self.root, *relative_path.split("/"))
+
+    def open_temp(self):
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.tmp_dir, delete=False)
+
+    def commit(self, tmp_path: str, sha256: str, extension: str) -> Tuple[str, bool]:
+        """Mover el temporal a su ruta final; retorna (ruta relativa, deduplicado)"""
+        relative = self.relative_path(sha256, extension)
+        final_path = self.absolute_path(relative)
+        if os.path.exists(final_path):
+            os.unlink(tmp_path)
+            return relative, True
+        os.makedirs(os.path.dirname(final_path), exist_ok=True)
+        os.replace(tmp_path, final_path)
+        return relative, False
+
+
+class _TempWriter:
+    """Escribe y hashea los bloques recibidos (se ejecuta en el threadpool)"""
+
+    def __init__(self, store: ContentStore):
+        self.file = store.open_temp()
+        self.path = self.file.name
+        self.hasher = hashlib.sha256()
+
+    def write(self, data: bytes):
+        self.hasher.update(data)
+        self.file.write(data)
+
+    def close(self):
+        self.file.close()
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class _Part:
+    __slots__ = ("headers", "name", "data", "is_file")
+
+    def __init__(self):
+        self.headers: Dict[bytes, bytes] = {}
+        self.name = ""
+        self.data = b""
+        self.is_file = False
+
+
+class StreamingUploadParser:
+    """Parser multipart que escribe el archivo a disco mientras llega
+
+    El límite de tamaño se aplica bloque a bloque: la subida se aborta en
+    cuanto lo supera, sin haber bufferizado el archivo completo.
+    """
+
+    def __init__(
+        self,
+        request: Request,
+        store: ContentStore,
+        max_size: int,
+        allowed_extensions: Iterable[str],
+        file_field: str = "file",
+    ):
+        self.request = request
+        self.store = store
+        self.max_size = max_size
+        self.allowed_extensions = set(allowed_extensions)
+        self.file_field = file_field
+        self.fields: Dict[str, str] = {}
+        self._part = _Part()
+        self._header_name = b""
+        self._header_value = b""
+        self._writer: Optional[_TempWriter] = None
+        self._pending: List[bytes] = []
+        self._size = 0
+        self._filename: Optional[str] = None
+        self._extension = ""
+        self._content_type: Optional[str] = None
+        self._file_done = False
+
+    # ---------- callbacks del parser ----------
+
+    def on_part_begin(self):
+        self._part = _Part()
+
+    def on_header_field(self, data: bytes, start: int, end: int):
+        self._header_name += data[start:end]
+
+    def on_header_value(self, data: bytes, start: int, end: int):
+        self._header_value += data[start:end]
+
+    def on_header_end(self):
+        self._part.headers[self._header_name.lower()] = self._header_value
+        self._header_name = b""
+        self._header_value = b""
+
+    def on_headers_finished(self):
+        part = self._part
+        _, options = parse_options_header(part.headers.get(b"content-disposition", b""))
+        part.name = options.get(b"name", b"").decode("utf-8", "replace")
+        if b"filename" not in options:
+            return
+        if part.name != self.file_field or self._filename is not None:
+            raise HTTPException(status_code=400, detail="Solo se admite un archivo por subida")
+        filename = os.path.basename(options[b"filename"].decode("utf-8", "replace"))
+        extension = filename.rsplit(".", 1)[-1].lower() if "." in filename else ""
+        if extension not in self.allowed_extensions:
+            raise HTTPException(status_code=400, detail="Tipo de archivo no permitido")
+        content_type = part.headers.get(b"content-type")
+        part.is_file = True
+        self._filename = filename
+        self._extension = extension
+        self._content_type = content_type.decode("latin-1") if content_type else None
+
+    def on_part_data(self, data: bytes, start: int, end: int):
+        if not self._part.is_file:
+            self._part.data += data[start:end]
+            if len(self._part.data) > MULTIPART_OVERHEAD:
+                raise HTTPException(status_code=400, detail="Campo de formulario demasiado grande")
+            return
+        self._size += end - start
+        if self._size > self.max_size:
+            raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+        self._pending.append(data[start:end])
+
+    def on_part_end(self):
+        if self._part.is_file:
+            self._file_done = True
+        else:
+            self.fields[self._part.name] = self._part.data.decode("utf-8", "replace")
+
+    # ---------- recepción ----------
+
+    async def parse(self) -> Tuple[StoredFile, Dict[str, str]]:
+        """Consumir el body, guardar el archivo y retornar (archivo, campos)"""
+        content_length = self.request.headers.get("content-length")
+        if content_length and content_length.isdigit():
+            if int(content_length) > self.max_size + MULTIPART_OVERHEAD:
+                raise HTTPException(status_code=413, detail="Archivo demasiado grande")
+
+        _, params = parse_options_header(self.request.headers.get("content-type", ""))
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise HTTPException(status_code=400, detail="Se esperaba multipart/form-data")
+
+        callbacks = {
+            "on_part_begin": self.on_part_begin,
+            "on_part_data": self.on_part_data,
+            "on_part_end": self.on_part_end,
+            "on_header_field": self.on_header_field,
+            "on_header_value": self.on_header_value,
+            "on_header_end": self.on_header_end,
+            "on_headers_finished": self.on_headers_finished,
+        }
+        parser = MultipartParser(boundary, callbacks)
+
+        try:
+            async for chunk in self.request.stream():
+                parser.write(chunk)
+                if self._pending:
+                    if self._writer is None:
+                        self._writer = await run_in_threadpool(_TempWriter, self.store)
+                    data = b"".join(self._pending)
+                    self._pending.clear()
+                    await run_in_threadpool(self._writer.write, data)
+            parser.finalize()
+
+            if self._filename is None or not self._file_done:
+                raise HTTPException(status_code=400, detail=f"Falta el campo '{self.file_field}'")
+            if self._writer is None:
+                # Archivo vacío
+                self._writer = await run_in_threadpool(_TempWriter, self.store)
+
+            await run_in_threadpool(self._writer.close)
+            sha256 = self._writer.hasher.hexdigest()
+            relative_path, deduplicated = await run_in_threadpool(
+                self.store.commit, self._writer.path, sha256, self._extension
+            )
+        except BaseException:
+            if self._writer is not None:
+                self._writer.discard()
+            raise
+
+        stored = StoredFile(
+            filename=self._filename,
+            extension=self._extension,
+            sha256=sha256,
+            size=self._size,
+            content_type=self._content_type,
+            relative_path=relative_path,
+            deduplicated=deduplicated,
+        )
+        return stored, self.fields
+
+
+# ==================== DESCARGA ====================
+
+
+class FileRangeResponse(Response):
+    """Envía un rango de un archivo: zero-copy si el servidor ASGI lo soporta,
+    o en bloques leídos fuera del event loop"""
+
+    chunk_size = 64 * 1024
+
+    def __init__(self, path: str, start: int, length: int, status_code: int,
+                 headers: Dict[str, str], media_type: str, send_body: bool = True):
+        self.path = path
+        self.start = start
+        self.length = length
+        self.send_body = send_body
+        self.status_code = status_code
+        self.media_type = media_type
+        self.background = None
+        self.init_headers({**headers, "content-length": str(length)})
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({
+            "type": "http.response.start",
+            "status": self.status_code,
+            "headers": self.raw_headers,
+        })
+        if not self.send_body or self.length == 0:
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if "http.response.zerocopysend" in scope.get("extensions", {}):
+            # La extensión espera un objeto archivo; se cierra tras el envío
+            file = await run_in_threadpool(open, self.path, "rb")
+            with file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": self.length,
+                })
+            return
+
+        async with await anyio.open_file(self.path, "rb") as file:
+            await file.seek(self.start)
+            remaining = self.length
+            while remaining > 0:
+                chunk = await file.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                await send({
+                    "type": "http.response.body",
+                    "body": chunk,
+                    "more_body": remaining > 0,
+                })
+            if remaining > 0:
+                await send({"type": "http.response.body", "body": b""})
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """Interpretar un header Range de un solo intervalo
+
+    Retorna (inicio, fin inclusivo) o None si el header no aplica o está mal
+    formado (se envía el archivo completo, RFC 9110). Solo un rango válido
+    que empieza en o después del final del archivo lanza 416.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or "," in spec:
+        return None
+    first, sep, last = (part.strip() for part in spec.strip().partition("-"))
+    if not sep or not (first or last) or not all(part.isdecimal() for part in (first, last) if part):
+        return None
+    if not first:
+        suffix = int(last)
+        if suffix == 0:
+            return None
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise HTTPException(
+            status_code=416,
+            detail="Rango no satisfacible",
+            headers={"Content-Range": f"bytes */{size}"},
+        )
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def etag_matches(header: str, etag: str) -> bool:
+    """Comparación débil de If-None-Match contra un ETag"""
+    candidates = [tag.strip() for tag in header.split(",")]
+    weak = etag[2:] if etag.startswith("W/") else etag
+    return "*" in candidates or any(
+        (tag[2:] if tag.startswith("W/") else tag) == weak for tag in candidates
+    )
+
+
+async def serve_upload(
+    request: Request,
+    store: ContentStore,
+    relative_path: str,
+    accel_mode: str = "",
+    accel_prefix: str = "",
+) -> Response:
+    """Servir un archivo subido con ETag, 304, Range y cache inmutable"""
+    relative_path = relative_path.strip("/")
+    parts = relative_path.split("/")
+    if not relative_path or any(p in ("", ".", "..") or p.startswith(".") for p in parts):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    path = store.absolute_path(relative_path)
+
+    try:
+        stat = await run_in_threadpool(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=404, detail="Archivo no encontrado")
+
+    match = CONTENT_ADDRESSED_PATH.match(relative_path)
+    if match:
+        # El nombre deriva del hash: el contenido nunca cambia bajo esta URL
+        etag = f'"{match.group(1)}"'
+        cache_control = IMMUTABLE_CACHE_CONTROL
+    else:
+        etag = f'W/"{int(stat.st_mtime)}-{stat.st_size}"'
+        cache_control = LEGACY_CACHE_CONTROL
+
+    media_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    headers = {
+        "etag": etag,
+        "cache-control": cache_control,
+        "accept-ranges": "bytes",
+        "x-content-type-options": "nosniff",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    if accel_mode:
+        # El proxy frontal entrega los bytes (y atiende Range por su cuenta)
+        if accel_mode == "nginx":
+            headers["x-accel-redirect"] = accel_prefix.rstrip("/") + "/" + relative_path
+        else:
+            headers["x-sendfile"] = os.path.abspath(path)
+        return Response(status_code=200, headers=headers, media_type=media_type)
+
+    size = stat.st_size
+    start, end, status_code = 0, size - 1, 200
+    range_header = request.headers.get("range")
+    if_range = request.headers.get("if-range")
+    if range_header and size > 0 and (not if_range or if_range.strip() == etag):
+        byte_range = _parse_range(range_header, size)
+        if byte_range is not None:
+            start, end = byte_range
+            status_code = 206
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+
+    return FileRangeResponse(
+        path,
+        start=start,
+        length=max(end - start + 1, 0),
+        status_code=status_code,
+        headers=headers,
+        media_type=media_type,
+        send_body=request.method != "HEAD",
+    )
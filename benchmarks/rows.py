@@ -0,0 +1,90 @@
+"""
+Costo por fila del listado de tickets: materialización + serialización
+
+    python benchmarks/rows.py --rows 20000
+
+Compara el camino anterior (dict por fila, validación con TicketResponse y
+json de la stdlib, como hace FastAPI con response_model) contra el actual
+(record_rows + fastjson). Las filas son tuplas sintéticas con las columnas
+de TICKET_LIST_COLUMNS, así se mide solo el trabajo en Python.
+"""
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from targets import bootstrap
+
+
+def make_rows(count: int) -> List[tuple]:
+    start = datetime(2024, 1, 1, 8, 30, 15, 123000)
+    return [
+        (
+            "Problema con la impresora de red", f"La impresora del piso {n % 9} no imprime",
+            "alta", n, 4, "abierto", 2 if n % 2 else None,
+            start + timedelta(minutes=n), start + timedelta(minutes=n, seconds=30),
+            "cliente1", "tecnico1" if n % 2 else None, f"0x{n:016X}", n % 7, n % 3,
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+def measure(func, repeat: int) -> float:
+    """Mejor tiempo de `repeat` ejecuciones"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Costo por fila del listado de tickets")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bootstrap()
+    import sqlite_standin  # noqa: F401  (agrega backend/ al path)
+    from pydantic import TypeAdapter
+
+    import fastjson
+    from database import dict_rows, record_rows
+    from server import TicketResponse
+
+    columns = [
+        "title", "description", "priority", "id", "user_id", "status", "assigned_to",
+        "created_at", "updated_at", "created_by", "assigned_to_name", "version",
+        "comments_count", "attachments_count",
+    ]
+    rows = make_rows(args.rows)
+    adapter = TypeAdapter(List[TicketResponse])
+
+    def before() -> bytes:
+        # response_model: validar cada dict y volver a volcarlo a tipos JSON
+        content = adapter.dump_python(adapter.validate_python(dict_rows(columns, rows)), mode="json")
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+    def after() -> bytes:
+        return fastjson.dumps(record_rows(columns, rows))
+
+    if before() != after():
+        print("✗ Los dos caminos no producen el mismo JSON")
+        return 1
+
+    encoder = "orjson" if fastjson.orjson is not None else "json (stdlib)"
+    old = measure(before, args.repeat) / args.rows * 1e6
+    new = measure(after, args.repeat) / args.rows * 1e6
+    print(f"{args.rows} filas, mejor de {args.repeat} ejecuciones (encoder: {encoder})")
+    print(f"  dict + TicketResponse + json : {old:8.2f} µs/fila")
+    print(f"  record_rows + fastjson       : {new:8.2f} µs/fila")
+    print(f"✓ {old / new:.1f}x más rápido, mismo JSON")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""
+Benchmark de carga de la API sobre el stand-in SQLite
+
+    python benchmarks/run.py --tickets 100000 --mix default --duration 30 --concurrency 20
+    python benchmarks/run.py --save-baseline benchmarks/baselines/default.json
+    python benchmarks/run.py --baseline benchmarks/baselines/default.json
+
+Reporta p50/p95/p99, throughput y round-trips a la base por petición (global
+y por operación). Con --baseline compara contra un resultado guardado y
+termina con código 1 si hay regresiones.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sqlite3
+import sys
+import time
+from typing import Any, Dict, List
+
+import seed
+from targets import TARGETS, db_round_trips
+from workload import MIXES, OPERATIONS, OperationStats, drive, load_sessions, login_all, summarize
+
+# Diferencias por debajo de este piso (ms) se consideran ruido
+MIN_LATENCY_DELTA_MS = 1.0
+# Round-trips adicionales por petición que ya cuentan como regresión
+ROUND_TRIP_TOLERANCE = 0.05
+# Aumento tolerado en la proporción de errores
+ERROR_RATE_TOLERANCE = 0.01
+
+
+def _ticket_count(path: str) -> int:
+    try:
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM Tickets").fetchone()[0]
+        finally:
+            conn.close()
+    except sqlite3.Error:
+        return -1
+
+
+async def probe_round_trips(client, sessions, mix: Dict[str, int], samples: int) -> Dict[str, float]:
+    """Round-trips por petición de cada operación, ejecutándolas en secuencia"""
+    rng = random.Random(7)
+    result = {}
+    for name in mix:
+        before = await db_round_trips(client)
+        for n in range(samples):
+            await OPERATIONS[name](client, sessions[n % len(sessions)], rng)
+        result[name] = (await db_round_trips(client) - before) / samples
+    return result
+
+
+async def benchmark(args) -> Dict[str, Any]:
+    mix = MIXES[args.mix]
+    sessions = load_sessions(args.db, args.concurrency, random.Random(args.seed))
+    target = TARGETS[args.mode](args.db, args.concurrency)
+    async with target as client:
+        await login_all(client, sessions)
+        if args.warmup > 0:
+            print(f"Calentando {args.warmup:.0f}s...")
+            await drive(client, sessions, mix, args.warmup, rng_seed=args.seed + 1)
+
+        print(f"Midiendo {args.duration:.0f}s con {args.concurrency} usuarios virtuales (mezcla '{args.mix}')...")
+        before = await db_round_trips(client)
+        start = time.perf_counter()
+        results = await drive(client, sessions, mix, args.duration, rng_seed=args.seed)
+        elapsed = time.perf_counter() - start
+        queries = await db_round_trips(client) - before
+
+        round_trips = {}
+        if args.probe > 0:
+            round_trips = await probe_round_trips(client, sessions, mix, args.probe)
+
+    operations = {}
+    all_latencies: List[float] = []
+    total_errors = 0
+    for name, stats in results.items():
+        operations[name] = summarize(stats, elapsed)
+        operations[name]["statuses"] = {str(code): count for code, count in sorted(stats.statuses.items())}
+        if name in round_trips:
+            operations[name]["round_trips"] = round_trips[name]
+        all_latencies.extend(stats.latencies)
+        total_errors += stats.errors
+
+    overall = summarize(OperationStats(latencies=all_latencies, errors=total_errors), elapsed)
+    overall["round_trips"] = queries / overall["requests"] if overall["requests"] else 0.0
+    return {
+        "config": {
+            "mix": args.mix,
+            "mode": args.mode,
+            "tickets": _ticket_count(args.db),
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+        },
+        "overall": overall,
+        "operations": operations,
+    }
+
+
+# ==================== REPORTE ====================
+
+def print_report(result: Dict[str, Any]):
+    header = f"{'operación':<10} {'peticiones':>10} {'errores':>8} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries/req':>12}"
+    print()
+    print(header)
+    print("-" * len(header))
+    rows = list(result["operations"].items()) + [("TOTAL", result["overall"])]
+    for name, data in rows:
+        round_trips = data.get("round_trips")
+        round_trips = f"{round_trips:.2f}" if round_trips is not None else "-"
+        print(
+            f"{name:<10} {data['requests']:>10} {data['errors']:>8} {data['throughput']:>9.1f} "
+            f"{data['p50_ms']:>9.2f} {data['p95_ms']:>9.2f} {data['p99_ms']:>9.2f} {round_trips:>12}"
+        )
+    print()
+
+
+def _error_rate(data: Dict[str, Any]) -> float:
+    return data["errors"] / data["requests"] if data["requests"] else 0.0
+
+
+def compare(result: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Regresiones de `result` respecto de `baseline` (lista vacía si no hay)"""
+    regressions = []
+    pairs = [("TOTAL", result["overall"], baseline.get("overall", {}))]
+    pairs += [
+        (name, data, baseline.get("operations", {}).get(name))
+        for name, data in result["operations"].items()
+    ]
+    for name, current, base in pairs:
+        if not base or not base.get("requests"):
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit and current[metric] - base[metric] > MIN_LATENCY_DELTA_MS:
+                regressions.append(f"{name}: {metric} {base[metric]:.2f} → {current[metric]:.2f}")
+        if current["throughput"] < base["throughput"] * (1 - tolerance):
+            regressions.append(f"{name}: req/s {base['throughput']:.1f} → {current['throughput']:.1f}")
+        if "round_trips" in current and "round_trips" in base:
+            if current["round_trips"] > base["round_trips"] + ROUND_TRIP_TOLERANCE:
+                regressions.append(
+                    f"{name}: queries/req {base['round_trips']:.2f} → {current['round_trips']:.2f}"
+                )
+        if _error_rate(current) > _error_rate(base) + ERROR_RATE_TOLERANCE:
+            regressions.append(f"{name}: errores {_error_rate(base):.1%} → {_error_rate(current):.1%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de carga de la API sobre SQLite")
+    parser.add_argument("--db", default=seed.DEFAULT_DB, help="Archivo SQLite (se siembra si no existe)")
+    parser.add_argument("--tickets", type=int, default=10000, help="Tickets a sembrar (10k a 1M)")
+    parser.add_argument("--reseed", action="store_true", help="Volver a sembrar aunque la base exista")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="default")
+    parser.add_argument("--mode", choices=sorted(TARGETS), default="inprocess")
+    parser.add_argument("--concurrency", type=int, default=20, help="Usuarios virtuales simultáneos")
+    parser.add_argument("--duration", type=float, default=30, help="Segundos de medición")
+    parser.add_argument("--warmup", type=float, default=5, help="Segundos de calentamiento (no se miden)")
+    parser.add_argument("--probe", type=int, default=10, help="Peticiones por operación para contar round-trips")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Guardar el resultado en JSON")
+    parser.add_argument("--baseline", help="Comparar contra un resultado guardado")
+    parser.add_argument("--save-baseline", help="Guardar el resultado como baseline")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="Empeoramiento relativo tolerado")
+    args = parser.parse_args()
+
+    if args.reseed or _ticket_count(args.db) < 0:
+        print(f"Poblando {args.db} con {args.tickets} tickets...")
+        seed.seed(args.db, args.tickets, rng_seed=args.seed)
+    elif _ticket_count(args.db) != args.tickets:
+        print(f"⚠️ La base tiene {_ticket_count(args.db)} tickets (use --reseed para {args.tickets})")
+
+    result = asyncio.run(benchmark(args))
+    print_report(result)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(result, f, indent=2, ensure_ascii=False)
+            print(f"✓ Resultado guardado en {path}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("config") != result["config"]:
+            print(f"⚠️ Configuración distinta a la del baseline: {baseline.get('config')}")
+        regressions = compare(result, baseline, args.tolerance)
+        if regressions:
+            print(f"✗ {len(regressions)} regresiones respecto de {args.baseline}:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print(f"✓ Sin regresiones respecto de {args.baseline} (tolerancia {args.tolerance:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""
+Generar una base SQLite con un volumen configurable de usuarios y tickets
+
+    python benchmarks/seed.py --tickets 100000 --db benchmarks/.data/bench.db
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import sqlite_standin
+
+DEFAULT_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data", "bench.db")
+DEFAULT_PASSWORD = "password123"
+EMAIL_DOMAIN = "bench.techassist.com"
+
+TITLES = (
+    "Problema con la impresora de red", "No funciona el correo", "PC muy lenta",
+    "Solicitud de instalación de software", "Acceso a carpeta compartida",
+    "Cambio de contraseña", "Error en sistema ERP", "Pantalla azul al iniciar",
+    "VPN se desconecta", "Solicitud de nuevo equipo",
+)
+
+
+def user_email(username: str) -> str:
+    return f"{username}@{EMAIL_DOMAIN}"
+
+
+def seed(
+    path: str,
+    tickets: int,
+    clients: int = 1000,
+    technicians: int = 20,
+    admins: int = 2,
+    password: str = DEFAULT_PASSWORD,
+    batch_size: int = 10000,
+    rng_seed: int = 42,
+):
+    """Crear (desde cero) la base `path` con usuarios y `tickets` tickets"""
+    from passwords import pwd_context
+
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    rng = random.Random(rng_seed)
+    # Un solo hash para todos: bcrypt con las rondas de producción es caro
+    password_hash = pwd_context.hash(password)
+    users = (
+        [(f"admin{n}", "admin") for n in range(1, admins + 1)]
+        + [(f"tecnico{n}", "tecnico") for n in range(1, technicians + 1)]
+        + [(f"cliente{n}", "cliente") for n in range(1, clients + 1)]
+    )
+
+    conn = sqlite_standin.open_sqlite(path)
+    try:
+        sqlite_standin.create_schema(conn)
+        conn.executemany(
+            "INSERT INTO Users (username, email, password_hash, role) VALUES (?, ?, ?, ?)",
+            [(username, user_email(username), password_hash, role) for username, role in users],
+        )
+        technician_ids = [row[0] for row in conn.execute("SELECT id FROM Users WHERE role = 'tecnico'")]
+        client_ids = [row[0] for row in conn.execute("SELECT id FROM Users WHERE role = 'cliente'")]
+
+        statuses = ("abierto", "en_proceso", "resuelto", "cerrado")
+        priorities = ("baja", "media", "alta", "urgente")
+        start = datetime.now() - timedelta(days=365)
+        step = timedelta(days=365) / max(tickets, 1)
+        rows = []
+        for n in range(1, tickets + 1):
+            status = rng.choice(statuses)
+            assigned = None if status == "abierto" and rng.random() < 0.5 else rng.choice(technician_ids)
+            created_at = start + step * n
+            rows.append((
+                rng.choice(client_ids), rng.choice(TITLES), f"Descripción del ticket {n}",
+                status, rng.choice(priorities), assigned, created_at, created_at, n,
+            ))
+            if len(rows) >= batch_size:
+                _insert_tickets(conn, rows)
+                rows = []
+        _insert_tickets(conn, rows)
+        conn.commit()
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+
+
+def _insert_tickets(conn, rows):
+    conn.executemany(
+        "INSERT INTO Tickets (user_id, title, description, status, priority, assigned_to, "
+        "created_at, updated_at, row_version) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        rows,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Poblar la base SQLite de benchmarks")
+    parser.add_argument("--db", default=DEFAULT_DB, help="Archivo SQLite (se recrea)")
+    parser.add_argument("--tickets", type=int, default=10000)
+    parser.add_argument("--clients", type=int, default=1000)
+    parser.add_argument("--technicians", type=int, default=20)
+    parser.add_argument("--admins", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=42, help="Semilla del generador aleatorio")
+    args = parser.parse_args()
+
+    print(f"Poblando {args.db} con {args.tickets} tickets...")
+    start = time.perf_counter()
+    seed(args.db, args.tickets, args.clients, args.technicians, args.admins, rng_seed=args.seed)
+    print(f"✓ Base lista en {time.perf_counter() - start:.1f}s (contraseña: {DEFAULT_PASSWORD})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
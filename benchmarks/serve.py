@@ -0,0 +1,34 @@
+"""
+Servir la API con uvicorn sobre la base SQLite de benchmarks
+
+    python benchmarks/serve.py --db benchmarks/.data/bench.db --port 8011
+"""
+
+import argparse
+import sys
+
+import uvicorn
+
+from targets import bootstrap
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API sobre el stand-in SQLite (uvicorn)")
+    parser.add_argument("--db", required=True, help="Archivo SQLite generado con seed.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8011)
+    args = parser.parse_args()
+
+    bootstrap()
+    import sqlite_standin
+    from database import db
+
+    sqlite_standin.install(db, args.db)
+    import server
+
+    uvicorn.run(server.app, host=args.host, port=args.port, log_level="warning", access_log=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,482 @@
+"""
+Base SQLite que reemplaza a SQL Server en los benchmarks
+
+Las conexiones se entregan al mismo ConnectionPool / Database de la API, así
+que el pool, las métricas y el log de queries lentas se miden igual que en
+producción. Cada sentencia T-SQL se traduce una vez (cache por texto) al
+dialecto de SQLite: OUTPUT -> RETURNING, TOP (?) -> LIMIT ?, rowversion como
+contador global, GETDATE(), COUNT_BIG, CONVERT del rowversion, etc.
+CONTAINSTABLE se emula con una subconsulta rankeada por `contains_rank`.
+Lo que no tiene equivalente directo (GROUPING SETS) se reemplaza por una
+sentencia escrita a mano (ver `overrides`).
+"""
+
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence, Tuple
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "backend")
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+# Tablas con columna rowversion: cada INSERT/UPDATE toma el siguiente valor global
+ROWVERSION_TABLES = ("Tickets",)
+
+# Columnas DATETIME2: SQLite las guarda como texto ISO y se devuelven como datetime
+_DATETIME_COLUMNS = re.compile(r"(_at|_updated)$")
+
+NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS Users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL UNIQUE,
+    email TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'cliente' CHECK (role IN ('admin', 'tecnico', 'cliente')),
+    created_at TEXT DEFAULT ({NOW}),
+    updated_at TEXT DEFAULT ({NOW})
+);
+
+CREATE TABLE IF NOT EXISTS Tickets (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES Users(id),
+    title TEXT NOT NULL,
+    description TEXT,
+    status TEXT DEFAULT 'abierto' CHECK (status IN ('abierto', 'en_proceso', 'resuelto', 'cerrado')),
+    priority TEXT DEFAULT 'media' CHECK (priority IN ('baja', 'media', 'alta', 'urgente')),
+    assigned_to INTEGER NULL REFERENCES Users(id),
+    created_at TEXT DEFAULT ({NOW}),
+    updated_at TEXT DEFAULT ({NOW}),
+    comments_count INTEGER NOT NULL DEFAULT 0,
+    attachments_count INTEGER NOT NULL DEFAULT 0,
+    row_version INTEGER NOT NULL DEFAULT (next_rowversion())
+);
+
+CREATE TABLE IF NOT EXISTS Comments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id INTEGER NOT NULL REFERENCES Tickets(id) ON DELETE CASCADE,
+    user_id INTEGER NOT NULL REFERENCES Users(id),
+    comment TEXT NOT NULL,
+    created_at TEXT DEFAULT ({NOW})
+);
+
+CREATE TABLE IF NOT EXISTS Attachments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id INTEGER NOT NULL REFERENCES Tickets(id) ON DELETE CASCADE,
+    filename TEXT NOT NULL,
+    file_url TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    sha256 TEXT NULL,
+    content_type TEXT NULL,
+    uploaded_by INTEGER NOT NULL REFERENCES Users(id),
+    uploaded_at TEXT DEFAULT ({NOW})
+);
+
+CREATE TABLE IF NOT EXISTS ImportCheckpoints (
+    job TEXT PRIMARY KEY,
+    position INTEGER NOT NULL DEFAULT 0,
+    imported INTEGER NOT NULL DEFAULT 0,
+    rejected INTEGER NOT NULL DEFAULT 0,
+    updated_at TEXT DEFAULT ({NOW}),
+    owner TEXT NULL,
+    lease_expires_at TEXT NULL,
+    completed_at TEXT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_tickets_user_id ON Tickets(user_id);
+CREATE INDEX IF NOT EXISTS idx_tickets_assigned_to ON Tickets(assigned_to);
+CREATE INDEX IF NOT EXISTS idx_tickets_status ON Tickets(status);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority ON Tickets(priority);
+CREATE INDEX IF NOT EXISTS idx_tickets_created_id ON Tickets(created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_user_created ON Tickets(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_status_created ON Tickets(status, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority_created ON Tickets(priority, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_assigned_created ON Tickets(assigned_to, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_tickets_queue ON Tickets(assigned_to, status, created_at DESC, id DESC, title, priority, user_id);
+CREATE INDEX IF NOT EXISTS idx_comments_ticket_created ON Comments(ticket_id, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_attachments_ticket_uploaded ON Attachments(ticket_id, uploaded_at, id);
+
+CREATE TRIGGER IF NOT EXISTS trg_users_update AFTER UPDATE ON Users
+BEGIN
+    UPDATE Users SET updated_at = {NOW} WHERE id = NEW.id;
+END;
+
+CREATE VIEW IF NOT EXISTS vw_ticket_counters AS
+SELECT status, priority, COUNT(*) as total FROM Tickets GROUP BY status, priority;
+
+CREATE VIEW IF NOT EXISTS vw_user_counters AS
+SELECT role, COUNT(*) as total FROM Users GROUP BY role;
+
+CREATE VIEW IF NOT EXISTS vw_ticket_workload AS
+SELECT assigned_to, status, priority, COUNT(*) as total FROM Tickets GROUP BY assigned_to, status, priority;
+"""
+
+
+@lru_cache(maxsize=1)
+def overrides():
+    """Sentencias sin traducción mecánica -> equivalente SQLite escrito a mano"""
+    import stats
+
+    return {
+        # GROUPING SETS ((status), (priority), ()) como UNION ALL
+        stats.GROUPED_STATS_QUERY: """
+            SELECT g.status, g.priority, g.count, g.g_status, g.g_priority, u.total_users
+            FROM (
+                SELECT status, NULL as priority, COUNT(*) as count, 0 as g_status, 1 as g_priority
+                FROM Tickets GROUP BY status
+                UNION ALL
+                SELECT NULL, priority, COUNT(*), 1, 0 FROM Tickets GROUP BY priority
+                UNION ALL
+                SELECT NULL, NULL, COUNT(*), 1, 1 FROM Tickets
+            ) g
+            CROSS JOIN (SELECT COUNT(*) as total_users FROM Users) u
+        """,
+    }
+
+
+_REWRITES = [
+    (re.compile(r"CONVERT\(\s*VARCHAR\(18\)\s*,\s*((?:\w+\.)?row_version)\s*,\s*1\s*\)", re.I), r"printf('0x%016X', \1)"),
+    (
+        re.compile(r"\bDATEADD\(\s*SECOND\s*,\s*(\?|-?\d+)\s*,\s*GETDATE\(\)\s*\)", re.I),
+        r"strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime', \1 || ' seconds')",
+    ),
+    (re.compile(r"\bGETDATE\(\)", re.I), NOW),
+    (re.compile(r"\bCOUNT_BIG\(", re.I), "COUNT("),
+    (re.compile(r"\bISNULL\(", re.I), "IFNULL("),
+    (re.compile(r"@@VERSION", re.I), "'SQLite ' || sqlite_version()"),
+    (re.compile(r"\bDB_NAME\(\)", re.I), "'main'"),
+    (re.compile(r"\s+WITH\s*\(\s*NOEXPAND\s*\)", re.I), ""),
+    (re.compile(r"\bdbo\.", re.I), ""),
+    (
+        re.compile(r"\bCONTAINSTABLE\(\s*(\w+)\s*,\s*(\w+)\s*,\s*\?\s*,\s*\?\s*\)", re.I),
+        r"(SELECT id AS [KEY], contains_rank(\2, ?) AS RANK FROM \1 WHERE RANK > 0 ORDER BY RANK DESC, id LIMIT ?)",
+    ),
+    (
+        re.compile(r"\bCONTAINSTABLE\(\s*(\w+)\s*,\s*(\w+)\s*,\s*\?\s*\)", re.I),
+        r"(SELECT id AS [KEY], contains_rank(\2, ?) AS RANK FROM \1 WHERE RANK > 0)",
+    ),
+]
+
+_CONTAINS_TERM = re.compile(r'"(\w+)\*"')
+_TEXT_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+def contains_rank(text: Optional[str], condition: str) -> int:
+    """RANK de CONTAINSTABLE para '"a*" AND "b*"': 0 si falta algún término,
+    si no, cuántas palabras del texto empiezan con alguno"""
+    if not text:
+        return 0
+    prefixes = _CONTAINS_TERM.findall(condition.lower())
+    words = _TEXT_WORD.findall(text.lower())
+    hits = [sum(word.startswith(prefix) for word in words) for prefix in prefixes]
+    return sum(hits) if hits and all(hits) else 0
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+# SELECT TOP al inicio o como SELECT principal tras las CTE de un WITH
+_TOP = re.compile(r"^(\s*SELECT\s+|\s*WITH\b.*\)\s*SELECT\s+)TOP\s*\(\s*(\?|\d+)\s*\)\s*", re.I | re.S)
+_INSERT_OUTPUT = re.compile(
+    r"^\s*(INSERT\s+INTO\s+\w+\s*\([^)]*\))\s+OUTPUT\s+(.*?)\s+((?:VALUES|SELECT)\b.*?)\s*;?\s*$", re.I | re.S
+)
+_DELETE_OUTPUT = re.compile(r"^\s*(DELETE\s+FROM\s+\w+)\s+OUTPUT\s+(.*?)\s+(WHERE\b.*?)\s*;?\s*$", re.I | re.S)
+_UPDATE_OUTPUT = re.compile(
+    r"^\s*UPDATE\s+(\w+)\s+SET\s+(.*?)\s+OUTPUT\s+(.*?)\s+FROM\s+(\w+)\s+(?:AS\s+)?\1\b(.*?)\s+WHERE\s+(.*?)\s*;?\s*$",
+    re.I | re.S,
+)
+_JOIN = re.compile(
+    r"(LEFT\s+|INNER\s+)?JOIN\s+(\w+)\s+(?:AS\s+)?(\w+)\s+ON\s+(.*?)(?=\s+(?:LEFT\s+|INNER\s+)?JOIN\b|\s*$)",
+    re.I | re.S,
+)
+_UPDATE_SET = re.compile(r"^(\s*UPDATE\s+(\w+)\s+SET\s+)", re.I)
+
+
+def _placeholders(fragment: str) -> int:
+    return _STRING_LITERAL.sub("''", fragment).count("?")
+
+
+def _pseudo_table(output: str, prefix: str) -> str:
+    """INSERTED.* / DELETED.col -> columnas de RETURNING"""
+    output = re.sub(rf"\b{prefix}\.\*", "*", output, flags=re.I)
+    return re.sub(rf"\b{prefix}\.", "", output, flags=re.I)
+
+
+def _with_rowversion(set_clause: str, table: str) -> str:
+    if table in ROWVERSION_TABLES:
+        return f"row_version = next_rowversion(), {set_clause}"
+    return set_clause
+
+
+def _translate_update(match: "re.Match") -> Tuple[str, List[int]]:
+    """UPDATE t SET ... OUTPUT ... FROM T t LEFT JOIN ... WHERE ...
+
+    RETURNING solo ve la tabla modificada: cada columna de un join se
+    convierte en una subconsulta correlacionada y sus parámetros pasan al
+    final (RETURNING va después del WHERE).
+    """
+    alias, set_clause, output, table, joins, where = match.groups()
+    set_count = _placeholders(set_clause)
+    position = set_count + _placeholders(output)
+    lookups = {}
+    for join in _JOIN.finditer(joins):
+        kind, join_table, join_alias, condition = join.groups()
+        if kind and kind.strip().upper() == "INNER":
+            raise NotImplementedError("UPDATE ... OUTPUT con INNER JOIN no tiene equivalente en SQLite")
+        count = _placeholders(condition)
+        lookups[join_alias] = (join_table, condition.strip(), list(range(position, position + count)))
+        position += count
+    where_start = position
+
+    join_params: List[int] = []
+    used = set()
+
+    def lookup(column: "re.Match") -> str:
+        join_alias, name = column.group(1), column.group(2)
+        if join_alias not in lookups:
+            return column.group(0)
+        join_table, condition, indexes = lookups[join_alias]
+        if indexes and join_alias in used:
+            raise NotImplementedError(f"El join '{join_alias}' con parámetros se usa más de una vez en OUTPUT")
+        used.add(join_alias)
+        join_params.extend(indexes)
+        return f"(SELECT {join_alias}.{name} FROM {join_table} {join_alias} WHERE {condition})"
+
+    returning = re.sub(r"\b(\w+)\.(\w+)\b", lookup, _pseudo_table(output, "INSERTED"))
+    # Dentro de RETURNING el alias del UPDATE no es visible: se usa el nombre de la tabla
+    returning = re.sub(rf"\b{alias}\.", f"{table}.", returning)
+    order = (
+        list(range(set_count))
+        + list(range(where_start, where_start + _placeholders(where)))
+        + join_params
+    )
+    sql = (
+        f"UPDATE {table} AS {alias} SET {_with_rowversion(set_clause, table)} "
+        f"WHERE {where} RETURNING {returning}"
+    )
+    return sql, order
+
+
+@lru_cache(maxsize=1024)
+def compile_statement(query: str) -> Tuple[str, Optional[Tuple[int, ...]]]:
+    """Sentencia SQLite equivalente y orden de los parámetros (None = sin cambios)"""
+    override = overrides().get(query)
+    if override is not None:
+        return override, None
+    sql = query
+    for pattern, replacement in _REWRITES:
+        sql = pattern.sub(replacement, sql)
+    count = _placeholders(sql)
+    order = list(range(count))
+
+    top = _TOP.match(sql)
+    if top:
+        limit = top.group(2)
+        if limit == "?":
+            index = _placeholders(sql[:top.start(2)])
+            order.append(order.pop(index))
+        sql = top.group(1) + sql[top.end():].rstrip().rstrip(";") + f" LIMIT {limit}"
+
+    match = _UPDATE_OUTPUT.match(sql)
+    if match:
+        sql, update_order = _translate_update(match)
+        order = [order[index] for index in update_order]
+    elif _INSERT_OUTPUT.match(sql):
+        head, output, rest = _INSERT_OUTPUT.match(sql).groups()
+        head_count, output_count = _placeholders(head), _placeholders(output)
+        order = order[:head_count] + order[head_count + output_count:] + order[head_count:head_count + output_count]
+        sql = f"{head} {rest} RETURNING {_pseudo_table(output, 'INSERTED')}"
+    elif _DELETE_OUTPUT.match(sql):
+        head, output, rest = _DELETE_OUTPUT.match(sql).groups()
+        sql = f"{head} {rest} RETURNING {_pseudo_table(output, 'DELETED')}"
+    else:
+        update = _UPDATE_SET.match(sql)
+        if update and update.group(2) in ROWVERSION_TABLES:
+            sql = update.group(1) + "row_version = next_rowversion(), " + sql[update.end():]
+
+    if order == list(range(count)):
+        return sql, None
+    return sql, tuple(order)
+
+
+def _param(value: Any) -> Any:
+    # rowversion (BINARY(8)) -> entero del contador
+    if isinstance(value, (bytes, bytearray)) and len(value) == 8:
+        return int.from_bytes(value, "big")
+    return value
+
+
+def translate(query: str, params: Sequence[Any] = ()) -> Tuple[str, Tuple[Any, ...]]:
+    """Traducir una sentencia de la API y reordenar sus parámetros"""
+    sql, order = compile_statement(query)
+    params = tuple(_param(value) for value in params)
+    if order is not None:
+        params = tuple(params[index] for index in order)
+    return sql, params
+
+
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+
+
+class RowVersionClock:
+    """Contador global de rowversion, compartido por todas las conexiones"""
+
+    def __init__(self, start: int = 0):
+        self.value = start
+        self._lock = threading.Lock()
+
+    def next(self) -> int:
+        with self._lock:
+            self.value += 1
+            return self.value
+
+
+_clocks = {}
+_clocks_lock = threading.Lock()
+
+
+def _clock(path: str, conn: sqlite3.Connection) -> RowVersionClock:
+    with _clocks_lock:
+        clock = _clocks.get(path)
+        if clock is None:
+            try:
+                row = conn.execute("SELECT MAX(row_version) FROM Tickets").fetchone()
+                start = row[0] or 0
+            except sqlite3.OperationalError:
+                start = 0
+            clock = _clocks[path] = RowVersionClock(start)
+        return clock
+
+
+class StandInCursor:
+    """Cursor con la interfaz de pyodbc que usa la API"""
+
+    def __init__(self, cursor: sqlite3.Cursor):
+        self._cursor = cursor
+        self._datetimes: List[int] = []
+        self.messages: List[tuple] = []
+        self.fast_executemany = False
+
+    @property
+    def description(self):
+        return self._cursor.description
+
+    @property
+    def rowcount(self) -> int:
+        return self._cursor.rowcount
+
+    def execute(self, query: str, *params):
+        if len(params) == 1 and isinstance(params[0], (tuple, list)):
+            params = params[0]
+        sql, values = translate(query, params)
+        self._cursor.execute(sql, values)
+        description = self._cursor.description or ()
+        self._datetimes = [
+            index for index, column in enumerate(description) if _DATETIME_COLUMNS.search(column[0])
+        ]
+        return self
+
+    def executemany(self, query: str, rows):
+        sql, order = compile_statement(query)
+        if order is None:
+            rows = [tuple(_param(value) for value in row) for row in rows]
+        else:
+            rows = [tuple(_param(row[index]) for index in order) for row in rows]
+        self._cursor.executemany(sql, rows)
+        self._datetimes = []
+
+    def setinputsizes(self, sizes):
+        pass
+
+    def _convert(self, row):
+        if row is None or not self._datetimes:
+            return row
+        row = list(row)
+        for index in self._datetimes:
+            if isinstance(row[index], str):
+                row[index] = datetime.fromisoformat(row[index])
+        return tuple(row)
+
+    def fetchone(self):
+        return self._convert(self._cursor.fetchone())
+
+    def fetchall(self):
+        return [self._convert(row) for row in self._cursor.fetchall()]
+
+    def fetchmany(self, size: int):
+        return [self._convert(row) for row in self._cursor.fetchmany(size)]
+
+    def nextset(self) -> bool:
+        return False
+
+    def close(self):
+        self._cursor.close()
+
+
+class StandInConnection:
+    """Conexión SQLite con la interfaz mínima de pyodbc.Connection"""
+
+    def __init__(self, conn: sqlite3.Connection):
+        self._conn = conn
+
+    def cursor(self) -> StandInCursor:
+        return StandInCursor(self._conn.cursor())
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        self._conn.close()
+
+
+def open_sqlite(path: str) -> sqlite3.Connection:
+    """Conexión SQLite cruda con las funciones y pragmas del stand-in"""
+    conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA foreign_keys = ON")
+    clock = _clock(path, conn)
+    conn.create_function("next_rowversion", 0, clock.next)
+    conn.create_function("contains_rank", 2, contains_rank, deterministic=True)
+    return conn
+
+
+def connect(path: str) -> StandInConnection:
+    """Reemplazo de pyodbc.connect: la "cadena de conexión" es la ruta del archivo"""
+    return StandInConnection(open_sqlite(path))
+
+
+def create_schema(conn: sqlite3.Connection):
+    """Crear tablas, índices, trigger y vistas equivalentes a sql/schema.sql"""
+    conn.executescript(SCHEMA)
+
+
+def install(database, path: str):
+    """Apuntar `database` (backend.database.Database) a la base SQLite `path`
+
+    Se reemplaza solo el pool, con el mismo tamaño y política de reciclaje,
+    así el resto de la capa de datos (métricas incluidas) no cambia.
+    """
+    import metrics
+    from database import ConnectionPool
+
+    previous = database.pool
+    database.pool = ConnectionPool(
+        path,
+        min_size=previous.min_size,
+        max_size=previous.max_size,
+        timeout=previous.timeout,
+        recycle=previous.recycle,
+        idle_timeout=previous.idle_timeout,
+        pre_ping=previous.pre_ping,
+        connect=connect,
+        on_checkout=metrics.observe_pool_wait,
+    )
+    database.connection_string = path
+    previous.close()
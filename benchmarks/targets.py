@@ -0,0 +1,143 @@
+"""
+Dónde corre la API durante el benchmark
+
+- InProcessTarget: la app FastAPI en este mismo proceso (httpx + ASGITransport)
+- UvicornTarget: un proceso uvicorn aparte (serve.py), por HTTP real
+
+En ambos casos la capa de datos usa el stand-in SQLite y los round-trips a la
+base se leen de /metrics (conteo de db_query_duration_seconds).
+"""
+
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Optional
+
+import httpx
+from prometheus_client.parser import text_string_to_metric_families
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def bootstrap(workdir: Optional[str] = None) -> str:
+    """Variables de entorno de la API para benchmarks (antes de importar `server`)
+
+    Uploads y log de queries lentas van a un directorio temporal; el resto de
+    la configuración es la de backend/.env, salvo lo que ya venga en el entorno.
+    """
+    workdir = workdir or tempfile.mkdtemp(prefix="techassist-bench-")
+    os.environ.setdefault("UPLOAD_FOLDER", os.path.join(workdir, "uploads"))
+    os.environ.setdefault("SLOW_QUERY_LOG_FILE", os.path.join(workdir, "slow_queries.log"))
+    return workdir
+
+
+async def db_round_trips(client: httpx.AsyncClient) -> float:
+    """Queries ejecutadas por la API desde que arrancó (suma de todas las sentencias)"""
+    response = await client.get("/metrics")
+    response.raise_for_status()
+    total = 0.0
+    for family in text_string_to_metric_families(response.text):
+        if family.name != "db_query_duration_seconds":
+            continue
+        for sample in family.samples:
+            if sample.name.endswith("_count"):
+                total += sample.value
+    return total
+
+
+class InProcessTarget:
+    """La app en el mismo proceso: mide la API sin red ni serialización HTTP real"""
+
+    name = "inprocess"
+
+    def __init__(self, db_path: str, concurrency: int):
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self._app = None
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        bootstrap()
+        import sqlite_standin
+        from database import db
+
+        sqlite_standin.install(db, self.db_path)
+        import server
+
+        self._app = server.app
+        await self._app.router.startup()
+        self._client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=self._app),
+            base_url="http://bench",
+            timeout=60,
+        )
+        return self._client
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        await self._app.router.shutdown()
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class UvicornTarget:
+    """La app en un proceso uvicorn: incluye red, parsing HTTP y el event loop real"""
+
+    name = "uvicorn"
+
+    def __init__(self, db_path: str, concurrency: int, port: Optional[int] = None, startup_timeout: float = 60):
+        self.db_path = db_path
+        self.concurrency = concurrency
+        self.port = port or _free_port()
+        self.startup_timeout = startup_timeout
+        self._process: Optional[subprocess.Popen] = None
+
+    async def __aenter__(self) -> httpx.AsyncClient:
+        env = dict(os.environ)
+        bootstrap()
+        env.update({key: os.environ[key] for key in ("UPLOAD_FOLDER", "SLOW_QUERY_LOG_FILE")})
+        self._process = subprocess.Popen(
+            [sys.executable, os.path.join(BENCH_DIR, "serve.py"), "--db", self.db_path, "--port", str(self.port)],
+            env=env,
+        )
+        self._client = httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{self.port}",
+            timeout=60,
+            limits=httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency),
+        )
+        deadline = time.monotonic() + self.startup_timeout
+        while True:
+            if self._process.poll() is not None:
+                raise RuntimeError(f"El servidor terminó al iniciar (código {self._process.returncode})")
+            try:
+                response = await self._client.get("/api/health")
+                if response.status_code == 200:
+                    return self._client
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                await self.__aexit__()
+                raise RuntimeError("El servidor no respondió a /api/health a tiempo")
+            await asyncio.sleep(0.2)
+
+    async def __aexit__(self, *exc):
+        await self._client.aclose()
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+
+
+TARGETS = {
+    InProcessTarget.name: InProcessTarget,
+    UvicornTarget.name: UvicornTarget,
+}
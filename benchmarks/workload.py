@@ -0,0 +1,211 @@
+"""
+Tráfico simulado: usuarios virtuales, operaciones y mezclas
+
+Cada usuario virtual es un cliente o un técnico con su token y los ids de
+tickets que puede ver; en cada iteración elige una operación según los pesos
+de la mezcla y mide la latencia de punta a punta.
+"""
+
+import asyncio
+import io
+import math
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional
+
+import httpx
+
+from seed import DEFAULT_PASSWORD, user_email
+
+STATUSES = ("abierto", "en_proceso", "resuelto", "cerrado")
+PRIORITIES = ("baja", "media", "alta", "urgente")
+
+# Pesos relativos de cada operación
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {"login": 2, "list": 35, "detail": 35, "update": 10, "upload": 3, "stats": 15},
+    "read": {"login": 1, "list": 45, "detail": 45, "stats": 9},
+    "write": {"login": 2, "list": 20, "detail": 20, "update": 45, "upload": 10, "stats": 3},
+}
+
+# Proporción de técnicos entre los usuarios virtuales (el resto son clientes)
+TECHNICIAN_SHARE = 0.3
+PAGE_SIZE = 50
+
+
+@dataclass
+class Session:
+    """Usuario virtual"""
+    email: str
+    role: str
+    ticket_ids: List[int]
+    token: Optional[str] = None
+
+    def headers(self) -> Dict[str, str]:
+        return {"Authorization": f"Bearer {self.token}"}
+
+
+def load_sessions(db_path: str, count: int, rng: random.Random, tickets_per_client: int = 200) -> List[Session]:
+    """Elegir usuarios de la base sembrada (lectura directa, fuera de la medición)"""
+    conn = sqlite3.connect(db_path)
+    try:
+        technicians = [row[0] for row in conn.execute("SELECT username FROM Users WHERE role = 'tecnico'")]
+        clients = conn.execute(
+            "SELECT u.id, u.username FROM Users u WHERE u.role = 'cliente' "
+            "AND EXISTS (SELECT 1 FROM Tickets t WHERE t.user_id = u.id)"
+        ).fetchall()
+        max_id = conn.execute("SELECT MAX(id) FROM Tickets").fetchone()[0] or 0
+        sessions = []
+        for _ in range(count):
+            if technicians and (not clients or rng.random() < TECHNICIAN_SHARE):
+                # Los técnicos ven todos los tickets: ids al azar en todo el rango
+                ids = [rng.randint(1, max_id) for _ in range(tickets_per_client)] if max_id else []
+                sessions.append(Session(user_email(rng.choice(technicians)), "tecnico", ids))
+            else:
+                user_id, username = rng.choice(clients)
+                ids = [row[0] for row in conn.execute(
+                    "SELECT id FROM Tickets WHERE user_id = ? ORDER BY created_at DESC LIMIT ?",
+                    (user_id, tickets_per_client),
+                )]
+                sessions.append(Session(user_email(username), "cliente", ids))
+        return sessions
+    finally:
+        conn.close()
+
+
+def _png(rng: random.Random) -> bytes:
+    """Imagen chica de color aleatorio (contenido distinto: sin deduplicación)"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    color = (rng.randrange(256), rng.randrange(256), rng.randrange(256))
+    Image.new("RGB", (64, 64), color).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+# ==================== OPERACIONES ====================
+
+async def op_login(client: httpx.AsyncClient, session: Session, rng: random.Random) -> httpx.Response:
+    response = await client.post("/auth/login", data={"username": session.email, "password": DEFAULT_PASSWORD})
+    if response.status_code == 200:
+        session.token = response.json()["access_token"]
+    return response
+
+
+async def op_list(client: httpx.AsyncClient, session: Session, rng: random.Random) -> httpx.Response:
+    params = {"limit": PAGE_SIZE}
+    if rng.random() < 0.3:
+        params["status"] = rng.choice(STATUSES)
+    return await client.get("/api/tickets", params=params, headers=session.headers())
+
+
+async def op_detail(client: httpx.AsyncClient, session: Session, rng: random.Random) -> httpx.Response:
+    return await client.get(f"/api/tickets/{rng.choice(session.ticket_ids)}", headers=session.headers())
+
+
+async def op_update(client: httpx.AsyncClient, session: Session, rng: random.Random) -> httpx.Response:
+    body = {"status": rng.choice(STATUSES), "priority": rng.choice(PRIORITIES)}
+    return await client.put(
+        f"/api/tickets/{rng.choice(session.ticket_ids)}", json=body, headers=session.headers()
+    )
+
+
+async def op_upload(client: httpx.AsyncClient, session: Session, rng: random.Random) -> httpx.Response:
+    files = {"file": ("captura.png", _png(rng), "image/png")}
+    return await client.post(
+        "/api/upload", params={"ticket_id": rng.choice(session.ticket_ids)},
+        files=files, headers=session.headers(),
+    )
+
+
+async def op_stats(client: httpx.AsyncClient, session: Session, rng: random.Random) -> httpx.Response:
+    return await client.get("/api/stats", headers=session.headers())
+
+
+Operation = Callable[[httpx.AsyncClient, Session, random.Random], Awaitable[httpx.Response]]
+
+OPERATIONS: Dict[str, Operation] = {
+    "login": op_login,
+    "list": op_list,
+    "detail": op_detail,
+    "update": op_update,
+    "upload": op_upload,
+    "stats": op_stats,
+}
+
+
+# ==================== MEDICIÓN ====================
+
+@dataclass
+class OperationStats:
+    """Latencias (segundos) y errores de una operación"""
+    latencies: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Dict[int, int] = field(default_factory=dict)
+
+    def record(self, seconds: float, status_code: Optional[int]):
+        self.latencies.append(seconds)
+        self.statuses[status_code or 0] = self.statuses.get(status_code or 0, 0) + 1
+        if status_code is None or status_code >= 400:
+            self.errors += 1
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Percentil por rango más cercano sobre valores ya ordenados"""
+    if not values:
+        return 0.0
+    rank = max(1, math.ceil(q / 100 * len(values)))
+    return values[rank - 1]
+
+
+def summarize(stats: OperationStats, elapsed: float) -> Dict[str, float]:
+    values = sorted(stats.latencies)
+    count = len(values)
+    return {
+        "requests": count,
+        "errors": stats.errors,
+        "throughput": count / elapsed if elapsed > 0 else 0.0,
+        "p50_ms": percentile(values, 50) * 1000,
+        "p95_ms": percentile(values, 95) * 1000,
+        "p99_ms": percentile(values, 99) * 1000,
+    }
+
+
+async def login_all(client: httpx.AsyncClient, sessions: List[Session]):
+    """Obtener el token inicial de cada usuario virtual (no se mide)"""
+    rng = random.Random(0)
+    for session in sessions:
+        response = await op_login(client, session, rng)
+        if response.status_code != 200:
+            raise RuntimeError(f"Login de {session.email} falló: {response.status_code} {response.text[:200]}")
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    sessions: List[Session],
+    mix: Dict[str, int],
+    duration: float,
+    rng_seed: int = 1,
+) -> Dict[str, OperationStats]:
+    """Un worker por usuario virtual hasta agotar `duration` segundos"""
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    results = {name: OperationStats() for name in names}
+    deadline = time.perf_counter() + duration
+
+    async def worker(session: Session, rng: random.Random):
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            start = time.perf_counter()
+            try:
+                response = await OPERATIONS[name](client, session, rng)
+                status_code = response.status_code
+            except httpx.HTTPError:
+                status_code = None
+            results[name].record(time.perf_counter() - start, status_code)
+
+    await asyncio.gather(*(
+        worker(session, random.Random(rng_seed * 1000 + index)) for index, session in enumerate(sessions)
+    ))
+    return results
@@ -12,8 +12,14 @@ const config = {
     },
     users: '/api/users',
     tickets: '/api/tickets',
+    myAssigned: '/api/tickets/my-assigned',
+    myResolved: '/api/tickets/my-resolved',
+    backlog: '/api/tickets/backlog',
+    search: '/api/tickets/search',
+    workload: '/api/technicians/workload',
     upload: '/api/upload',
     stats: '/api/stats',
+    events: '/api/events',
     health: '/api/health'
   },
   
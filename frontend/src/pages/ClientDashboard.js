@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { useAuth } from "@/App";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
+import { eventsAPI } from "@/services/api";
 import { Button } from "@/components/ui/button";
 import { Input } from "@/components/ui/input";
 import { Label } from "@/components/ui/label";
@@ -15,11 +16,15 @@ import { Plus, LogOut, Ticket, Upload, X } from "lucide-react";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 50;
 
 export default function ClientDashboard() {
   const { user, token, logout } = useAuth();
   const navigate = useNavigate();
   const [tickets, setTickets] = useState([]);
+  // El listado se pagina en el servidor; el total viene de /api/stats
+  const [nextCursor, setNextCursor] = useState(null);
+  const [totalTickets, setTotalTickets] = useState(0);
   const [categories, setCategories] = useState([]);
   const [equipments, setEquipments] = useState([]);
   const [loading, setLoading] = useState(true);
@@ -36,14 +41,40 @@ export default function ClientDashboard() {
     fetchData();
   }, []);
 
+  // Cambios en vivo de los tickets del cliente (el servidor filtra por dueño)
+  useEffect(() => {
+    const merge = (ticket) => setTickets(prev => prev.map(t => (t.id === ticket.id ? { ...t, ...ticket } : t)));
+    return eventsAPI.subscribeTickets({
+      onCreated: (ticket) => {
+        // Los lotes solo publican id y versión: recargar en ese caso
+        if (ticket.title === undefined) {
+          fetchData();
+          return;
+        }
+        setTickets(prev => (prev.some(t => t.id === ticket.id) ? prev : [ticket, ...prev]));
+      },
+      onUpdated: merge,
+      onDeleted: (ticket) => setTickets(prev => prev.filter(t => t.id !== ticket.id)),
+      onReset: fetchData
+    });
+  }, []);
+
+  const fetchTickets = (cursor) => axios.get(`${API}/tickets`, {
+    headers: { Authorization: `Bearer ${token}` },
+    params: { limit: PAGE_SIZE, cursor }
+  });
+
   const fetchData = async () => {
     try {
-      const [ticketsRes, categoriesRes, equipmentsRes] = await Promise.all([
-        axios.get(`${API}/tickets`, { headers: { Authorization: `Bearer ${token}` } }),
+      const [ticketsRes, statsRes, categoriesRes, equipmentsRes] = await Promise.all([
+        fetchTickets(),
+        axios.get(`${API}/stats`, { headers: { Authorization: `Bearer ${token}` } }),
         axios.get(`${API}/categories`),
         axios.get(`${API}/equipments`, { headers: { Authorization: `Bearer ${token}` } })
       ]);
       setTickets(ticketsRes.data);
+      setNextCursor(ticketsRes.headers["x-next-cursor"] || null);
+      setTotalTickets(statsRes.data.my_tickets ?? ticketsRes.data.length);
       setCategories(categoriesRes.data);
       setEquipments(equipmentsRes.data);
     } catch (error) {
@@ -53,6 +84,16 @@ export default function ClientDashboard() {
     }
   };
 
+  const loadMore = async () => {
+    try {
+      const res = await fetchTickets(nextCursor);
+      setTickets(prev => [...prev, ...res.data]);
+      setNextCursor(res.headers["x-next-cursor"] || null);
+    } catch (error) {
+      toast.error("Error al cargar datos");
+    }
+  };
+
   const handleFileUpload = (e) => {
     const files = Array.from(e.target.files);
     files.forEach(file => {
@@ -150,7 +191,7 @@ export default function ClientDashboard() {
         <div className="grid grid-cols-1 md:grid-cols-4 gap-4 mb-8">
           <Card className="bg-white/70 backdrop-blur border-0 shadow-lg">
             <CardContent className="pt-6">
-              <div className="text-3xl font-bold text-gray-900">{tickets.length}</div>
+              <div className="text-3xl font-bold text-gray-900">{totalTickets}</div>
               <div className="text-sm text-gray-600">Total Tickets</div>
             </CardContent>
           </Card>
@@ -329,6 +370,13 @@ export default function ClientDashboard() {
               </Card>
             ))
           )}
+          {nextCursor && (
+            <div className="text-center">
+              <Button variant="outline" onClick={loadMore} data-testid="tickets-load-more">
+                Ver más
+              </Button>
+            </div>
+          )}
         </div>
       </div>
     </div>
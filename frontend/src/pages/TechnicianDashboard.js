@@ -2,6 +2,7 @@ import { useState, useEffect } from "react";
 import { useAuth } from "@/App";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
+import { eventsAPI } from "@/services/api";
 import { Button } from "@/components/ui/button";
 import { Card, CardContent } from "@/components/ui/card";
 import { Tabs, TabsContent, TabsList, TabsTrigger } from "@/components/ui/tabs";
@@ -11,30 +12,72 @@ import { LogOut, Ticket, Filter } from "lucide-react";
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 50;
+// Espera antes de recargar las colas tras un cambio en vivo (agrupa ráfagas)
+const LIVE_REFRESH_DELAY = 2000;
+const PRIORITY_ORDER = { urgente: 0, alta: 1, media: 2, baja: 3 };
 
 export default function TechnicianDashboard() {
   const { user, token, logout } = useAuth();
   const navigate = useNavigate();
-  const [allTickets, setAllTickets] = useState([]);
-  const [assignedTickets, setAssignedTickets] = useState([]);
-  const [resolvedTickets, setResolvedTickets] = useState([]);
+  // Cada cola se pagina en el servidor: { tickets, nextCursor }
+  const [backlog, setBacklog] = useState({ tickets: [], nextCursor: null });
+  const [assigned, setAssigned] = useState({ tickets: [], nextCursor: null });
+  const [resolved, setResolved] = useState({ tickets: [], nextCursor: null });
+  const [workload, setWorkload] = useState(null);
   const [loading, setLoading] = useState(true);
   const [activeTab, setActiveTab] = useState("all");
 
+  const QUEUES = {
+    all: { path: "tickets/backlog", setter: setBacklog },
+    assigned: { path: "tickets/my-assigned", setter: setAssigned },
+    resolved: { path: "tickets/my-resolved", setter: setResolved }
+  };
+
   useEffect(() => {
     fetchData();
   }, []);
 
+  // Un cambio puede mover tickets entre colas y contadores: recargar las
+  // primeras páginas y la carga, una vez por ráfaga de eventos
+  useEffect(() => {
+    let timer = null;
+    const schedule = () => {
+      clearTimeout(timer);
+      timer = setTimeout(fetchData, LIVE_REFRESH_DELAY);
+    };
+    const close = eventsAPI.subscribeTickets({
+      onCreated: schedule,
+      onUpdated: schedule,
+      onDeleted: schedule,
+      onReset: schedule
+    });
+    return () => {
+      clearTimeout(timer);
+      close();
+    };
+  }, []);
+
+  const fetchQueue = async (queue, cursor) => {
+    const res = await axios.get(`${API}/${QUEUES[queue].path}`, {
+      headers: { Authorization: `Bearer ${token}` },
+      params: { limit: PAGE_SIZE, cursor }
+    });
+    return { tickets: res.data, nextCursor: res.headers["x-next-cursor"] || null };
+  };
+
   const fetchData = async () => {
     try {
-      const [allRes, assignedRes, resolvedRes] = await Promise.all([
-        axios.get(`${API}/tickets`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/tickets/my-assigned`, { headers: { Authorization: `Bearer ${token}` } }),
-        axios.get(`${API}/tickets/my-resolved`, { headers: { Authorization: `Bearer ${token}` } })
+      const [backlogPage, assignedPage, resolvedPage, workloadRes] = await Promise.all([
+        fetchQueue("all"),
+        fetchQueue("assigned"),
+        fetchQueue("resolved"),
+        axios.get(`${API}/technicians/workload`, { headers: { Authorization: `Bearer ${token}` } })
       ]);
-      setAllTickets(allRes.data);
-      setAssignedTickets(assignedRes.data);
-      setResolvedTickets(resolvedRes.data);
+      setBacklog(backlogPage);
+      setAssigned(assignedPage);
+      setResolved(resolvedPage);
+      setWorkload(workloadRes.data);
     } catch (error) {
       toast.error("Error al cargar datos");
     } finally {
@@ -42,11 +85,21 @@ export default function TechnicianDashboard() {
     }
   };
 
+  const loadMore = async (queue, current) => {
+    try {
+      const page = await fetchQueue(queue, current.nextCursor);
+      QUEUES[queue].setter({ tickets: [...current.tickets, ...page.tickets], nextCursor: page.nextCursor });
+    } catch (error) {
+      toast.error("Error al cargar datos");
+    }
+  };
+
   const getPriorityColor = (priority) => {
     switch (priority) {
       case "baja": return "bg-green-500";
       case "media": return "bg-yellow-500";
       case "alta": return "bg-red-500";
+      case "urgente": return "bg-red-700";
       default: return "bg-gray-500";
     }
   };
@@ -55,6 +108,7 @@ export default function TechnicianDashboard() {
     const colors = {
       "abierto": "bg-blue-100 text-blue-800",
       "en_proceso": "bg-amber-100 text-amber-800",
+      "resuelto": "bg-teal-100 text-teal-800",
       "cerrado": "bg-green-100 text-green-800"
     };
     return colors[status] || "bg-gray-100 text-gray-800";
@@ -80,12 +134,8 @@ export default function TechnicianDashboard() {
               </Badge>
             </div>
             <div className="flex flex-wrap gap-4 text-sm text-gray-500 mt-3">
-              <span>Cliente: <span className="font-medium text-gray-700">{ticket.user_name}</span></span>
-              <span>Categoría: <span className="font-medium text-gray-700">{ticket.category_name}</span></span>
+              <span>Cliente: <span className="font-medium text-gray-700">{ticket.created_by}</span></span>
               <span>Prioridad: <span className="font-medium text-gray-700">{ticket.priority}</span></span>
-              {ticket.technician_name && (
-                <span>Técnico: <span className="font-medium text-gray-700">{ticket.technician_name}</span></span>
-              )}
               <span className="ml-auto">{new Date(ticket.created_at).toLocaleDateString('es-ES')}</span>
             </div>
           </div>
@@ -94,6 +144,21 @@ export default function TechnicianDashboard() {
     </Card>
   );
 
+  const LoadMore = ({ queue, page }) => page.nextCursor && (
+    <div className="text-center">
+      <Button variant="outline" onClick={() => loadMore(queue, page)} data-testid={`${queue}-load-more`}>
+        Ver más
+      </Button>
+    </div>
+  );
+
+  // Contadores del servidor (vista de carga), no del largo de las listas
+  const mine = workload?.technicians.find(t => t.id === user.id);
+  const unassigned = workload?.unassigned;
+  const resolvedCount = (mine?.by_status.resuelto || 0) + (mine?.by_status.cerrado || 0);
+  const pendingCount = (unassigned?.open || 0)
+    + (workload?.technicians.reduce((sum, t) => sum + t.open, 0) || 0);
+
   if (loading) {
     return (
       <div className="min-h-screen flex items-center justify-center">
@@ -136,31 +201,31 @@ export default function TechnicianDashboard() {
         <div className="grid grid-cols-1 md:grid-cols-5 gap-4 mb-8">
           <Card className="bg-white/70 backdrop-blur border-0 shadow-lg">
             <CardContent className="pt-6">
-              <div className="text-3xl font-bold text-gray-900">{allTickets.length}</div>
-              <div className="text-sm text-gray-600">Total Tickets</div>
+              <div className="text-3xl font-bold text-gray-900">{pendingCount}</div>
+              <div className="text-sm text-gray-600">Pendientes</div>
             </CardContent>
           </Card>
           <Card className="bg-white/70 backdrop-blur border-0 shadow-lg">
             <CardContent className="pt-6">
-              <div className="text-3xl font-bold text-blue-600">{allTickets.filter(t => t.status === "abierto").length}</div>
-              <div className="text-sm text-gray-600">Abiertos</div>
+              <div className="text-3xl font-bold text-blue-600">{unassigned?.open || 0}</div>
+              <div className="text-sm text-gray-600">Sin asignar</div>
             </CardContent>
           </Card>
           <Card className="bg-white/70 backdrop-blur border-0 shadow-lg">
             <CardContent className="pt-6">
-              <div className="text-3xl font-bold text-amber-600">{assignedTickets.length}</div>
+              <div className="text-3xl font-bold text-amber-600">{mine?.open || 0}</div>
               <div className="text-sm text-gray-600">Asignados</div>
             </CardContent>
           </Card>
           <Card className="bg-white/70 backdrop-blur border-0 shadow-lg">
             <CardContent className="pt-6">
-              <div className="text-3xl font-bold text-green-600">{resolvedTickets.length}</div>
+              <div className="text-3xl font-bold text-green-600">{resolvedCount}</div>
               <div className="text-sm text-gray-600">Resueltos</div>
             </CardContent>
           </Card>
           <Card className="bg-white/70 backdrop-blur border-0 shadow-lg">
             <CardContent className="pt-6">
-              <div className="text-3xl font-bold text-red-600">{allTickets.filter(t => t.priority === "alta").length}</div>
+              <div className="text-3xl font-bold text-red-600">{mine?.high_priority || 0}</div>
               <div className="text-sm text-gray-600">Alta Prioridad</div>
             </CardContent>
           </Card>
@@ -172,37 +237,35 @@ export default function TechnicianDashboard() {
             <TabsList data-testid="tech-tabs">
               <TabsTrigger value="all" data-testid="all-tickets-tab">
                 <Filter className="w-4 h-4 mr-2" />
-                Todos ({allTickets.length})
+                Sin asignar ({unassigned?.open || 0})
               </TabsTrigger>
               <TabsTrigger value="assigned" data-testid="assigned-tickets-tab">
-                Asignados a mí ({assignedTickets.length})
+                Asignados a mí ({mine?.open || 0})
               </TabsTrigger>
               <TabsTrigger value="resolved" data-testid="resolved-tickets-tab">
-                Resueltos por mí ({resolvedTickets.length})
+                Resueltos por mí ({resolvedCount})
               </TabsTrigger>
             </TabsList>
           </div>
 
           <TabsContent value="all" className="space-y-4" data-testid="all-tickets-content">
-            {allTickets.length === 0 ? (
+            {backlog.tickets.length === 0 ? (
               <Card className="bg-white/70 backdrop-blur">
                 <CardContent className="py-12 text-center">
                   <Ticket className="w-16 h-16 mx-auto text-gray-300 mb-4" />
-                  <p className="text-gray-500">No hay tickets disponibles.</p>
+                  <p className="text-gray-500">No hay tickets sin asignar.</p>
                 </CardContent>
               </Card>
             ) : (
-              allTickets
-                .sort((a, b) => {
-                  const priorityOrder = { alta: 0, media: 1, baja: 2 };
-                  return priorityOrder[a.priority] - priorityOrder[b.priority];
-                })
+              [...backlog.tickets]
+                .sort((a, b) => PRIORITY_ORDER[a.priority] - PRIORITY_ORDER[b.priority])
                 .map(ticket => <TicketCard key={ticket.id} ticket={ticket} />)
             )}
+            <LoadMore queue="all" page={backlog} />
           </TabsContent>
 
           <TabsContent value="assigned" className="space-y-4" data-testid="assigned-tickets-content">
-            {assignedTickets.length === 0 ? (
+            {assigned.tickets.length === 0 ? (
               <Card className="bg-white/70 backdrop-blur">
                 <CardContent className="py-12 text-center">
                   <Ticket className="w-16 h-16 mx-auto text-gray-300 mb-4" />
@@ -210,12 +273,13 @@ export default function TechnicianDashboard() {
                 </CardContent>
               </Card>
             ) : (
-              assignedTickets.map(ticket => <TicketCard key={ticket.id} ticket={ticket} />)
+              assigned.tickets.map(ticket => <TicketCard key={ticket.id} ticket={ticket} />)
             )}
+            <LoadMore queue="assigned" page={assigned} />
           </TabsContent>
 
           <TabsContent value="resolved" className="space-y-4" data-testid="resolved-tickets-content">
-            {resolvedTickets.length === 0 ? (
+            {resolved.tickets.length === 0 ? (
               <Card className="bg-white/70 backdrop-blur">
                 <CardContent className="py-12 text-center">
                   <Ticket className="w-16 h-16 mx-auto text-gray-300 mb-4" />
@@ -223,8 +287,9 @@ export default function TechnicianDashboard() {
                 </CardContent>
               </Card>
             ) : (
-              resolvedTickets.map(ticket => <TicketCard key={ticket.id} ticket={ticket} />)
+              resolved.tickets.map(ticket => <TicketCard key={ticket.id} ticket={ticket} />)
             )}
+            <LoadMore queue="resolved" page={resolved} />
           </TabsContent>
         </Tabs>
       </div>
@@ -22,6 +22,10 @@ export default function TicketDetail() {
   const navigate = useNavigate();
   const [ticket, setTicket] = useState(null);
   const [technicians, setTechnicians] = useState([]);
+  const [comments, setComments] = useState([]);
+  const [commentsCursor, setCommentsCursor] = useState(null);
+  const [attachments, setAttachments] = useState([]);
+  const [attachmentsCursor, setAttachmentsCursor] = useState(null);
   const [newComment, setNewComment] = useState("");
   const [loading, setLoading] = useState(true);
   const [updating, setUpdating] = useState(false);
@@ -33,6 +37,8 @@ export default function TicketDetail() {
 
   useEffect(() => {
     fetchTicket();
+    fetchComments();
+    fetchAttachments();
     if (user.role !== "cliente") {
       fetchTechnicians();
     }
@@ -52,6 +58,36 @@ export default function TicketDetail() {
     }
   };
 
+  // Comentarios y adjuntos se paginan aparte (X-Next-Cursor); los totales
+  // vienen en el ticket (comments_count / attachments_count)
+  const fetchPage = async (kind, cursor) => {
+    const response = await axios.get(`${API}/tickets/${ticketId}/${kind}`, {
+      headers: { Authorization: `Bearer ${token}` },
+      params: { limit: 50, cursor }
+    });
+    return { items: response.data, nextCursor: response.headers["x-next-cursor"] || null };
+  };
+
+  const fetchComments = async (cursor) => {
+    try {
+      const page = await fetchPage("comments", cursor);
+      setComments(prev => cursor ? [...prev, ...page.items] : page.items);
+      setCommentsCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error loading comments:", error);
+    }
+  };
+
+  const fetchAttachments = async (cursor) => {
+    try {
+      const page = await fetchPage("attachments", cursor);
+      setAttachments(prev => cursor ? [...prev, ...page.items] : page.items);
+      setAttachmentsCursor(page.nextCursor);
+    } catch (error) {
+      console.error("Error loading attachments:", error);
+    }
+  };
+
   const fetchTechnicians = async () => {
     try {
       const response = await axios.get(`${API}/users/technicians`, {
@@ -85,13 +121,18 @@ export default function TicketDetail() {
     if (!newComment.trim()) return;
 
     try {
-      await axios.post(
+      const response = await axios.post(
         `${API}/tickets/${ticketId}/comments`,
         { comment: newComment },
         { headers: { Authorization: `Bearer ${token}` } }
       );
       toast.success("Comentario agregado");
       setNewComment("");
+      // Solo se agrega al final si ya se cargaron todas las páginas
+      if (!commentsCursor) {
+        setComments(prev => [...prev, response.data]);
+      }
+      // El contador cambia la versión (ETag) del ticket: releerlo completo
       fetchTicket();
     } catch (error) {
       toast.error("Error al agregar comentario");
@@ -189,26 +230,38 @@ export default function TicketDetail() {
                 </div>
 
                 {/* Attachments */}
-                {ticket.attachments && ticket.attachments.length > 0 && (
+                {ticket.attachments_count > 0 && (
                   <div>
                     <h3 className="font-semibold text-gray-900 mb-3 flex items-center gap-2">
                       <ImageIcon className="w-4 h-4" />
-                      Archivos Adjuntos ({ticket.attachments.length})
+                      Archivos Adjuntos ({ticket.attachments_count})
                     </h3>
                     <div className="grid grid-cols-2 md:grid-cols-3 gap-4">
-                      {ticket.attachments.map(att => (
-                        <div key={att.id} className="relative group">
-                          <img
-                            src={`data:image/jpeg;base64,${att.file_data}`}
-                            alt={att.filename}
-                            className="w-full h-40 object-cover rounded-lg border border-gray-200"
-                          />
+                      {attachments.map(att => (
+                        <a key={att.id} href={`${BACKEND_URL}${att.file_url}`} target="_blank" rel="noreferrer" className="relative group block">
+                          {att.thumbnail_url ? (
+                            <img
+                              src={`${BACKEND_URL}${att.thumbnail_url}`}
+                              alt={att.filename}
+                              loading="lazy"
+                              className="w-full h-40 object-cover rounded-lg border border-gray-200"
+                            />
+                          ) : (
+                            <div className="w-full h-40 rounded-lg border border-gray-200 bg-gray-50 flex items-center justify-center">
+                              <FileText className="w-10 h-10 text-gray-400" />
+                            </div>
+                          )}
                           <div className="absolute inset-0 bg-black/50 opacity-0 group-hover:opacity-100 transition-opacity rounded-lg flex items-center justify-center">
                             <span className="text-white text-xs text-center px-2">{att.filename}</span>
                           </div>
-                        </div>
+                        </a>
                       ))}
                     </div>
+                    {attachmentsCursor && (
+                      <Button variant="ghost" size="sm" className="mt-2" onClick={() => fetchAttachments(attachmentsCursor)}>
+                        Ver más adjuntos
+                      </Button>
+                    )}
                   </div>
                 )}
 
@@ -218,13 +271,13 @@ export default function TicketDetail() {
                 <div>
                   <h3 className="font-semibold text-gray-900 mb-4 flex items-center gap-2">
                     <MessageSquare className="w-4 h-4" />
-                    Comentarios ({ticket.comments?.length || 0})
+                    Comentarios ({ticket.comments_count || 0})
                   </h3>
 
                   <ScrollArea className="h-80 pr-4">
                     <div className="space-y-4">
-                      {ticket.comments && ticket.comments.length > 0 ? (
-                        ticket.comments.map(comment => (
+                      {comments.length > 0 ? (
+                        comments.map(comment => (
                           <div key={comment.id} className="bg-gray-50 rounded-lg p-4">
                             <div className="flex items-start justify-between mb-2">
                               <span className="font-medium text-gray-900">{comment.user_name}</span>
@@ -238,6 +291,11 @@ export default function TicketDetail() {
                       ) : (
                         <p className="text-gray-500 text-center py-8">No hay comentarios aún</p>
                       )}
+                      {commentsCursor && (
+                        <Button variant="ghost" size="sm" className="w-full" onClick={() => fetchComments(commentsCursor)}>
+                          Ver más comentarios
+                        </Button>
+                      )}
                     </div>
                   </ScrollArea>
 
@@ -10,6 +10,24 @@ const api = axios.create({
   }
 });
 
+// Respuestas GET con ETag: se revalidan con If-None-Match y un 304 reutiliza el cuerpo guardado
+const ETAG_CACHE_SIZE = 100;
+const etagCache = new Map();
+
+const etagKey = (config) => `${config.url}?${JSON.stringify(config.params || {})}`;
+
+const rememberResponse = (response) => {
+  const etag = response.headers?.etag;
+  if (response.config.method !== 'get' || !etag) return;
+  
+  const key = etagKey(response.config);
+  etagCache.delete(key);
+  etagCache.set(key, { etag, data: response.data, headers: response.headers });
+  if (etagCache.size > ETAG_CACHE_SIZE) {
+    etagCache.delete(etagCache.keys().next().value);
+  }
+};
+
 // Interceptor para agregar token a las peticiones
 api.interceptors.request.use(
   (config) => {
@@ -17,6 +35,13 @@ api.interceptors.request.use(
     if (token) {
       config.headers.Authorization = `Bearer ${token}`;
     }
+    if (config.method === 'get') {
+      const cached = etagCache.get(etagKey(config));
+      if (cached) {
+        config.headers['If-None-Match'] = cached.etag;
+        config.validateStatus = (status) => (status >= 200 && status < 300) || status === 304;
+      }
+    }
     console.log(`🔵 ${config.method.toUpperCase()} ${config.url}`);
     return config;
   },
@@ -30,6 +55,14 @@ api.interceptors.request.use(
 api.interceptors.response.use(
   (response) => {
     console.log(`✅ ${response.config.method.toUpperCase()} ${response.config.url} - ${response.status}`);
+    
+    if (response.status === 304) {
+      const cached = etagCache.get(etagKey(response.config));
+      if (cached) {
+        return { ...response, data: cached.data, headers: { ...cached.headers, ...response.headers } };
+      }
+    }
+    rememberResponse(response);
     return response;
   },
   (error) => {
@@ -39,6 +72,7 @@ api.interceptors.response.use(
     if (error.response?.status === 401) {
       localStorage.removeItem('token');
       localStorage.removeItem('user');
+      etagCache.clear();
       window.location.href = '/login';
     }
     
@@ -82,6 +116,7 @@ export const authAPI = {
   logout: () => {
     localStorage.removeItem('token');
     localStorage.removeItem('user');
+    etagCache.clear();
     window.location.href = '/login';
   },
   
@@ -108,8 +143,44 @@ export const usersAPI = {
 // ==================== TICKETS ====================
 
 export const ticketsAPI = {
-  getAll: async () => {
-    const response = await api.get(config.endpoints.tickets);
+  getAll: async (params = {}) => {
+    const response = await api.get(config.endpoints.tickets, { params });
+    return response.data;
+  },
+  
+  // Página de tickets (keyset): { tickets, nextCursor }
+  getPage: async ({ limit = 50, cursor, ...filters } = {}) => {
+    const response = await api.get(config.endpoints.tickets, {
+      params: { ...filters, limit, cursor }
+    });
+    return {
+      tickets: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null
+    };
+  },
+  
+  // Colas del técnico (keyset): { tickets, nextCursor }
+  getQueue: async (queue, { limit = 50, cursor, ...filters } = {}) => {
+    const response = await api.get(config.endpoints[queue], {
+      params: { ...filters, limit, cursor }
+    });
+    return {
+      tickets: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null
+    };
+  },
+  
+  getMyAssigned: (params) => ticketsAPI.getQueue('myAssigned', params),
+  
+  getMyResolved: (params) => ticketsAPI.getQueue('myResolved', params),
+  
+  getBacklog: (params) => ticketsAPI.getQueue('backlog', params),
+  
+  // Búsqueda por relevancia (keyset): { tickets, nextCursor }
+  search: (q, params) => ticketsAPI.getQueue('search', { limit: 20, ...params, q }),
+  
+  getWorkload: async () => {
+    const response = await api.get(config.endpoints.workload);
     return response.data;
   },
   
@@ -133,16 +204,34 @@ export const ticketsAPI = {
     return response.data;
   },
   
-  // Filtros específicos
-  getByStatus: async (status) => {
-    const tickets = await ticketsAPI.getAll();
-    return tickets.filter(ticket => ticket.status === status);
+  // Comentarios / adjuntos de un ticket, en orden cronológico (keyset): { items, nextCursor }
+  getActivity: async (id, kind, { limit = 50, cursor } = {}) => {
+    const response = await api.get(`${config.endpoints.tickets}/${id}/${kind}`, {
+      params: { limit, cursor }
+    });
+    return {
+      items: response.data,
+      nextCursor: response.headers['x-next-cursor'] || null
+    };
   },
   
-  getByPriority: async (priority) => {
-    const tickets = await ticketsAPI.getAll();
-    return tickets.filter(ticket => ticket.priority === priority);
-  }
+  getComments: (id, params) => ticketsAPI.getActivity(id, 'comments', params),
+  
+  getAttachments: (id, params) => ticketsAPI.getActivity(id, 'attachments', params),
+  
+  addComment: async (id, comment) => {
+    const response = await api.post(`${config.endpoints.tickets}/${id}/comments`, { comment });
+    return response.data;
+  },
+  
+  deleteComment: (id, commentId) => api.delete(`${config.endpoints.tickets}/${id}/comments/${commentId}`),
+  
+  deleteAttachment: (id, attachmentId) => api.delete(`${config.endpoints.tickets}/${id}/attachments/${attachmentId}`),
+  
+  // Filtros específicos (resueltos en el servidor)
+  getByStatus: (status) => ticketsAPI.getAll({ status }),
+  
+  getByPriority: (priority) => ticketsAPI.getAll({ priority })
 };
 
 // ==================== UPLOADS ====================
@@ -185,6 +274,33 @@ export const statsAPI = {
   }
 };
 
+// ==================== EVENTOS EN VIVO ====================
+
+export const eventsAPI = {
+  // Suscribirse a los cambios de tickets (SSE). handlers: { onCreated, onUpdated, onDeleted, onReset }
+  // EventSource reconecta solo y reenvía Last-Event-ID; retorna una función para cerrar.
+  subscribeTickets: (handlers = {}) => {
+    const token = localStorage.getItem('token');
+    const url = `${config.apiUrl}${config.endpoints.events}?access_token=${encodeURIComponent(token || '')}`;
+    const source = new EventSource(url);
+    const listen = (type, handler) => {
+      if (handler) {
+        source.addEventListener(type, (event) => handler(JSON.parse(event.data).ticket));
+      }
+    };
+    
+    listen('ticket.created', handlers.onCreated);
+    listen('ticket.updated', handlers.onUpdated);
+    listen('ticket.deleted', handlers.onDeleted);
+    // Se perdieron eventos: recargar el listado completo
+    if (handlers.onReset) {
+      source.addEventListener('reset', () => handlers.onReset());
+    }
+    
+    return () => source.close();
+  }
+};
+
 // ==================== HEALTH CHECK ====================
 
 export const healthAPI = {
@@ -0,0 +1,31 @@
+-- ============================================
+-- Migración 001: rowversion en Tickets y escritura en un solo round-trip
+-- Aplica a bases creadas con una versión anterior de schema.sql
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF COL_LENGTH('Tickets', 'row_version') IS NULL
+    ALTER TABLE Tickets ADD row_version ROWVERSION;
+GO
+
+-- UPDATE ... OUTPUT no admite triggers habilitados; la API fija updated_at
+IF OBJECT_ID('trg_tickets_update', 'TR') IS NOT NULL
+    DROP TRIGGER trg_tickets_update;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_tickets_created_id')
+    CREATE INDEX idx_tickets_created_id ON Tickets(created_at DESC, id DESC);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_tickets_user_created')
+    CREATE INDEX idx_tickets_user_created ON Tickets(user_id, created_at DESC, id DESC);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_tickets_status_created')
+    CREATE INDEX idx_tickets_status_created ON Tickets(status, created_at DESC, id DESC);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_tickets_priority_created')
+    CREATE INDEX idx_tickets_priority_created ON Tickets(priority, created_at DESC, id DESC);
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_tickets_assigned_created')
+    CREATE INDEX idx_tickets_assigned_created ON Tickets(assigned_to, created_at DESC, id DESC);
+GO
+
+PRINT '✅ Migración 001 aplicada';
+GO
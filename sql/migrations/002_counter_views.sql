@@ -0,0 +1,35 @@
+-- ============================================
+-- Migración 002: contadores mantenidos para /api/stats (STATS_SOURCE=counters)
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF OBJECT_ID('dbo.vw_ticket_counters', 'V') IS NULL
+    EXEC('CREATE VIEW dbo.vw_ticket_counters
+    WITH SCHEMABINDING
+    AS
+    SELECT status, priority, COUNT_BIG(*) as total
+    FROM dbo.Tickets
+    GROUP BY status, priority');
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_vw_ticket_counters')
+    CREATE UNIQUE CLUSTERED INDEX idx_vw_ticket_counters ON dbo.vw_ticket_counters(status, priority);
+GO
+
+IF OBJECT_ID('dbo.vw_user_counters', 'V') IS NULL
+    EXEC('CREATE VIEW dbo.vw_user_counters
+    WITH SCHEMABINDING
+    AS
+    SELECT role, COUNT_BIG(*) as total
+    FROM dbo.Users
+    GROUP BY role');
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_vw_user_counters')
+    CREATE UNIQUE CLUSTERED INDEX idx_vw_user_counters ON dbo.vw_user_counters(role);
+GO
+
+PRINT '✅ Migración 002 aplicada';
+GO
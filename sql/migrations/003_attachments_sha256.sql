@@ -0,0 +1,15 @@
+-- ============================================
+-- Migración 003: hash de contenido y tipo MIME en Attachments
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF COL_LENGTH('Attachments', 'sha256') IS NULL
+    ALTER TABLE Attachments ADD sha256 CHAR(64) NULL;
+IF COL_LENGTH('Attachments', 'content_type') IS NULL
+    ALTER TABLE Attachments ADD content_type NVARCHAR(100) NULL;
+GO
+
+PRINT '✅ Migración 003 aplicada';
+GO
@@ -0,0 +1,19 @@
+-- ============================================
+-- Migración 004: checkpoints del importador masivo de tickets
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF OBJECT_ID('ImportCheckpoints', 'U') IS NULL
+    CREATE TABLE ImportCheckpoints (
+        job NVARCHAR(200) PRIMARY KEY,
+        position BIGINT NOT NULL DEFAULT 0,
+        imported INT NOT NULL DEFAULT 0,
+        rejected INT NOT NULL DEFAULT 0,
+        updated_at DATETIME2 DEFAULT GETDATE()
+    );
+GO
+
+PRINT '✅ Migración 004 aplicada';
+GO
@@ -0,0 +1,28 @@
+-- ============================================
+-- Migración 005: colas y carga de técnicos
+-- (/api/tickets/my-assigned, /api/tickets/backlog, /api/technicians/workload)
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_tickets_queue')
+    CREATE INDEX idx_tickets_queue ON Tickets(assigned_to, status, created_at DESC, id DESC)
+        INCLUDE (title, priority, user_id);
+GO
+
+IF OBJECT_ID('dbo.vw_ticket_workload', 'V') IS NULL
+    EXEC('CREATE VIEW dbo.vw_ticket_workload
+    WITH SCHEMABINDING
+    AS
+    SELECT assigned_to, status, priority, COUNT_BIG(*) as total
+    FROM dbo.Tickets
+    GROUP BY assigned_to, status, priority');
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_vw_ticket_workload')
+    CREATE UNIQUE CLUSTERED INDEX idx_vw_ticket_workload ON dbo.vw_ticket_workload(assigned_to, status, priority);
+GO
+
+PRINT '✅ Migración 005 aplicada';
+GO
@@ -0,0 +1,34 @@
+-- ============================================
+-- Migración 006: índices de texto completo para /api/tickets/search
+-- Requiere el componente Full-Text Search (imagen de sql/Dockerfile)
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_catalogs WHERE name = 'ftc_techassist')
+    CREATE FULLTEXT CATALOG ftc_techassist AS DEFAULT;
+GO
+
+-- La clave del índice es la PK, que en bases anteriores tiene nombre generado
+DECLARE @sql NVARCHAR(MAX);
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Tickets'))
+BEGIN
+    SELECT @sql = N'CREATE FULLTEXT INDEX ON Tickets(title LANGUAGE 3082, description LANGUAGE 3082)
+        KEY INDEX ' + QUOTENAME(name) + N' ON ftc_techassist WITH CHANGE_TRACKING AUTO'
+    FROM sys.indexes WHERE object_id = OBJECT_ID('Tickets') AND is_primary_key = 1;
+    EXEC sp_executesql @sql;
+END
+
+IF NOT EXISTS (SELECT 1 FROM sys.fulltext_indexes WHERE object_id = OBJECT_ID('Comments'))
+BEGIN
+    SELECT @sql = N'CREATE FULLTEXT INDEX ON Comments(comment LANGUAGE 3082)
+        KEY INDEX ' + QUOTENAME(name) + N' ON ftc_techassist WITH CHANGE_TRACKING AUTO'
+    FROM sys.indexes WHERE object_id = OBJECT_ID('Comments') AND is_primary_key = 1;
+    EXEC sp_executesql @sql;
+END
+GO
+
+PRINT '✅ Migración 006 aplicada';
+GO
@@ -0,0 +1,64 @@
+-- ============================================
+-- Migración 007: contadores de comentarios / adjuntos por ticket
+-- (/api/tickets/{id}/comments, /api/tickets/{id}/attachments)
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF COL_LENGTH('Tickets', 'comments_count') IS NULL
+    ALTER TABLE Tickets ADD comments_count INT NOT NULL CONSTRAINT DF_Tickets_comments_count DEFAULT 0;
+GO
+
+IF COL_LENGTH('Tickets', 'attachments_count') IS NULL
+    ALTER TABLE Tickets ADD attachments_count INT NOT NULL CONSTRAINT DF_Tickets_attachments_count DEFAULT 0;
+GO
+
+-- Cargar los contadores con lo que ya existe (la migración es re-ejecutable)
+UPDATE t SET
+    comments_count = (SELECT COUNT(*) FROM Comments c WHERE c.ticket_id = t.id),
+    attachments_count = (SELECT COUNT(*) FROM Attachments f WHERE f.ticket_id = t.id)
+FROM Tickets t;
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_comments_ticket_created')
+    CREATE INDEX idx_comments_ticket_created ON Comments(ticket_id, created_at, id);
+GO
+
+IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_attachments_ticket_uploaded')
+    CREATE INDEX idx_attachments_ticket_uploaded ON Attachments(ticket_id, uploaded_at, id);
+GO
+
+-- Los índices nuevos empiezan por ticket_id: los anteriores sobran
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_comments_ticket_id')
+    DROP INDEX idx_comments_ticket_id ON Comments;
+GO
+
+IF EXISTS (SELECT 1 FROM sys.indexes WHERE name = 'idx_attachments_ticket_id')
+    DROP INDEX idx_attachments_ticket_id ON Attachments;
+GO
+
+IF OBJECT_ID('dbo.vw_tickets_full', 'V') IS NOT NULL
+    EXEC('ALTER VIEW vw_tickets_full AS
+    SELECT
+        t.id,
+        t.title,
+        t.description,
+        t.status,
+        t.priority,
+        t.created_at,
+        t.updated_at,
+        u.username as created_by,
+        u.email as creator_email,
+        u.role as creator_role,
+        a.username as assigned_to_name,
+        a.email as assigned_to_email,
+        t.comments_count,
+        t.attachments_count
+    FROM Tickets t
+    LEFT JOIN Users u ON t.user_id = u.id
+    LEFT JOIN Users a ON t.assigned_to = a.id');
+GO
+
+PRINT '✅ Migración 007 aplicada';
+GO
@@ -0,0 +1,22 @@
+-- ============================================
+-- Migración 008: lease de importaciones masivas
+-- (una sola ejecución por job entre todos los procesos de la API y el CLI)
+-- ============================================
+
+USE TechAssistDB;
+GO
+
+IF COL_LENGTH('ImportCheckpoints', 'owner') IS NULL
+    ALTER TABLE ImportCheckpoints ADD owner NVARCHAR(200) NULL;
+GO
+
+IF COL_LENGTH('ImportCheckpoints', 'lease_expires_at') IS NULL
+    ALTER TABLE ImportCheckpoints ADD lease_expires_at DATETIME2 NULL;
+GO
+
+IF COL_LENGTH('ImportCheckpoints', 'completed_at') IS NULL
+    ALTER TABLE ImportCheckpoints ADD completed_at DATETIME2 NULL;
+GO
+
+PRINT '✅ Migración 008 aplicada';
+GO
@@ -45,7 +45,7 @@ GO
 -- Tabla: Tickets
 -- ============================================
 CREATE TABLE Tickets (
-    id INT IDENTITY(1,1) PRIMARY KEY,
+    id INT IDENTITY(1,1) CONSTRAINT PK_Tickets PRIMARY KEY,
     user_id INT NOT NULL,
     title NVARCHAR(255) NOT NULL,
     description NVARCHAR(MAX),
@@ -54,6 +54,11 @@ CREATE TABLE Tickets (
     assigned_to INT NULL,
     created_at DATETIME2 DEFAULT GETDATE(),
     updated_at DATETIME2 DEFAULT GETDATE(),
+    -- Contadores desnormalizados: la API los mantiene en la misma transacción
+    -- que el INSERT / DELETE de Comments y Attachments
+    comments_count INT NOT NULL DEFAULT 0,
+    attachments_count INT NOT NULL DEFAULT 0,
+    row_version ROWVERSION,
     CONSTRAINT FK_Tickets_Users FOREIGN KEY (user_id) REFERENCES Users(id) ON DELETE NO ACTION,
     CONSTRAINT FK_Tickets_Assigned FOREIGN KEY (assigned_to) REFERENCES Users(id) ON DELETE NO ACTION
 );
@@ -66,7 +71,7 @@ GO
 -- Tabla: Comments (Opcional - para comentarios en tickets)
 -- ============================================
 CREATE TABLE Comments (
-    id INT IDENTITY(1,1) PRIMARY KEY,
+    id INT IDENTITY(1,1) CONSTRAINT PK_Comments PRIMARY KEY,
     ticket_id INT NOT NULL,
     user_id INT NOT NULL,
     comment NVARCHAR(MAX) NOT NULL,
@@ -88,6 +93,8 @@ CREATE TABLE Attachments (
     filename NVARCHAR(255) NOT NULL,
     file_url NVARCHAR(500) NOT NULL,
     file_size INT NOT NULL,
+    sha256 CHAR(64) NULL,
+    content_type NVARCHAR(100) NULL,
     uploaded_by INT NOT NULL,
     uploaded_at DATETIME2 DEFAULT GETDATE(),
     CONSTRAINT FK_Attachments_Tickets FOREIGN KEY (ticket_id) REFERENCES Tickets(id) ON DELETE CASCADE,
@@ -98,6 +105,25 @@ GO
 PRINT '✅ Tabla Attachments creada';
 GO
 
+-- ============================================
+-- Tabla: ImportCheckpoints (avance de importaciones masivas)
+-- ============================================
+CREATE TABLE ImportCheckpoints (
+    job NVARCHAR(200) PRIMARY KEY,
+    position BIGINT NOT NULL DEFAULT 0,
+    imported INT NOT NULL DEFAULT 0,
+    rejected INT NOT NULL DEFAULT 0,
+    updated_at DATETIME2 DEFAULT GETDATE(),
+    -- Lease de la ejecución en curso (NULL = libre) y fin de la última completa
+    owner NVARCHAR(200) NULL,
+    lease_expires_at DATETIME2 NULL,
+    completed_at DATETIME2 NULL
+);
+GO
+
+PRINT '✅ Tabla ImportCheckpoints creada';
+GO
+
 -- ============================================
 -- ÍNDICES para mejorar performance
 -- ============================================
@@ -106,14 +132,43 @@ CREATE INDEX idx_tickets_assigned_to ON Tickets(assigned_to);
 CREATE INDEX idx_tickets_status ON Tickets(status);
 CREATE INDEX idx_tickets_priority ON Tickets(priority);
 CREATE INDEX idx_tickets_created_at ON Tickets(created_at DESC);
-CREATE INDEX idx_comments_ticket_id ON Comments(ticket_id);
+-- Índices compuestos para paginación keyset (created_at, id) con filtros
+CREATE INDEX idx_tickets_created_id ON Tickets(created_at DESC, id DESC);
+CREATE INDEX idx_tickets_user_created ON Tickets(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_tickets_status_created ON Tickets(status, created_at DESC, id DESC);
+CREATE INDEX idx_tickets_priority_created ON Tickets(priority, created_at DESC, id DESC);
+CREATE INDEX idx_tickets_assigned_created ON Tickets(assigned_to, created_at DESC, id DESC);
+-- Colas del técnico (asignados / sin asignar) y su carga: índice cubriente
+CREATE INDEX idx_tickets_queue ON Tickets(assigned_to, status, created_at DESC, id DESC)
+    INCLUDE (title, priority, user_id);
+-- Paginación keyset de comentarios / adjuntos de un ticket (ticket_id, fecha, id)
+CREATE INDEX idx_comments_ticket_created ON Comments(ticket_id, created_at, id);
 CREATE INDEX idx_comments_created_at ON Comments(created_at DESC);
-CREATE INDEX idx_attachments_ticket_id ON Attachments(ticket_id);
+CREATE INDEX idx_attachments_ticket_uploaded ON Attachments(ticket_id, uploaded_at, id);
 GO
 
 PRINT '✅ Índices creados';
 GO
 
+-- ============================================
+-- BÚSQUEDA DE TEXTO COMPLETO (/api/tickets/search)
+-- Requiere el componente Full-Text Search (imagen de sql/Dockerfile).
+-- CHANGE_TRACKING AUTO: SQL Server indexa cada escritura en segundo plano.
+-- ============================================
+CREATE FULLTEXT CATALOG ftc_techassist AS DEFAULT;
+GO
+
+CREATE FULLTEXT INDEX ON Tickets(title LANGUAGE 3082, description LANGUAGE 3082)
+    KEY INDEX PK_Tickets ON ftc_techassist WITH CHANGE_TRACKING AUTO;
+GO
+
+CREATE FULLTEXT INDEX ON Comments(comment LANGUAGE 3082)
+    KEY INDEX PK_Comments ON ftc_techassist WITH CHANGE_TRACKING AUTO;
+GO
+
+PRINT '✅ Índices de texto completo creados';
+GO
+
 -- ============================================
 -- TRIGGERS para updated_at automático
 -- ============================================
@@ -130,18 +185,8 @@ BEGIN
 END;
 GO
 
-CREATE TRIGGER trg_tickets_update 
-ON Tickets
-AFTER UPDATE
-AS
-BEGIN
-    SET NOCOUNT ON;
-    UPDATE Tickets
-    SET updated_at = GETDATE()
-    FROM Tickets t
-    INNER JOIN inserted i ON t.id = i.id;
-END;
-GO
+-- Tickets no usa trigger: la API fija updated_at en el mismo UPDATE
+-- (además, UPDATE ... OUTPUT no admite triggers habilitados en la tabla)
 
 PRINT '✅ Triggers creados';
 GO
@@ -188,6 +233,11 @@ INSERT INTO Comments (ticket_id, user_id, comment) VALUES
 (6, 2, 'Contraseña restablecida exitosamente');
 GO
 
+UPDATE t SET comments_count = n.total
+FROM Tickets t
+JOIN (SELECT ticket_id, COUNT(*) as total FROM Comments GROUP BY ticket_id) n ON n.ticket_id = t.id;
+GO
+
 PRINT '✅ Comentarios de prueba creados';
 GO
 
@@ -210,8 +260,8 @@ SELECT
     u.role as creator_role,
     a.username as assigned_to_name,
     a.email as assigned_to_email,
-    (SELECT COUNT(*) FROM Comments WHERE ticket_id = t.id) as comments_count,
-    (SELECT COUNT(*) FROM Attachments WHERE ticket_id = t.id) as attachments_count
+    t.comments_count,
+    t.attachments_count
 FROM Tickets t
 LEFT JOIN Users u ON t.user_id = u.id
 LEFT JOIN Users a ON t.assigned_to = a.id;
@@ -224,21 +274,73 @@ GO
 -- PROCEDIMIENTOS ALMACENADOS
 -- ============================================
 
--- Obtener estadísticas generales
+-- ============================================
+-- CONTADORES MANTENIDOS (vistas indexadas)
+-- SQL Server las actualiza en la misma transacción de cada
+-- INSERT/UPDATE/DELETE, por lo que leerlas es O(1)
+-- ============================================
+CREATE VIEW dbo.vw_ticket_counters
+WITH SCHEMABINDING
+AS
+SELECT status, priority, COUNT_BIG(*) as total
+FROM dbo.Tickets
+GROUP BY status, priority;
+GO
+
+CREATE UNIQUE CLUSTERED INDEX idx_vw_ticket_counters ON dbo.vw_ticket_counters(status, priority);
+GO
+
+CREATE VIEW dbo.vw_user_counters
+WITH SCHEMABINDING
+AS
+SELECT role, COUNT_BIG(*) as total
+FROM dbo.Users
+GROUP BY role;
+GO
+
+CREATE UNIQUE CLUSTERED INDEX idx_vw_user_counters ON dbo.vw_user_counters(role);
+GO
+
+-- Carga por técnico; assigned_to NULL es el backlog sin asignar
+CREATE VIEW dbo.vw_ticket_workload
+WITH SCHEMABINDING
+AS
+SELECT assigned_to, status, priority, COUNT_BIG(*) as total
+FROM dbo.Tickets
+GROUP BY assigned_to, status, priority;
+GO
+
+CREATE UNIQUE CLUSTERED INDEX idx_vw_ticket_workload ON dbo.vw_ticket_workload(assigned_to, status, priority);
+GO
+
+PRINT '✅ Vistas de contadores creadas';
+GO
+
+-- Obtener estadísticas generales (desde los contadores mantenidos)
 CREATE PROCEDURE sp_get_general_stats
 AS
 BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @tickets TABLE (status NVARCHAR(50), priority NVARCHAR(50), total BIGINT);
+    INSERT INTO @tickets
+    SELECT status, priority, total FROM dbo.vw_ticket_counters WITH (NOEXPAND);
+    
+    DECLARE @users TABLE (role NVARCHAR(50), total BIGINT);
+    INSERT INTO @users
+    SELECT role, total FROM dbo.vw_user_counters WITH (NOEXPAND);
+    
     SELECT 
-        (SELECT COUNT(*) FROM Users) as total_users,
-        (SELECT COUNT(*) FROM Users WHERE role = 'admin') as total_admins,
-        (SELECT COUNT(*) FROM Users WHERE role = 'tecnico') as total_tecnicos,
-        (SELECT COUNT(*) FROM Users WHERE role = 'cliente') as total_clientes,
-        (SELECT COUNT(*) FROM Tickets) as total_tickets,
-        (SELECT COUNT(*) FROM Tickets WHERE status = 'abierto') as tickets_abiertos,
-        (SELECT COUNT(*) FROM Tickets WHERE status = 'en_proceso') as tickets_en_proceso,
-        (SELECT COUNT(*) FROM Tickets WHERE status = 'resuelto') as tickets_resueltos,
-        (SELECT COUNT(*) FROM Tickets WHERE status = 'cerrado') as tickets_cerrados,
-        (SELECT COUNT(*) FROM Tickets WHERE priority = 'urgente') as tickets_urgentes,
+        (SELECT ISNULL(SUM(total), 0) FROM @users) as total_users,
+        (SELECT ISNULL(SUM(total), 0) FROM @users WHERE role = 'admin') as total_admins,
+        (SELECT ISNULL(SUM(total), 0) FROM @users WHERE role = 'tecnico') as total_tecnicos,
+        (SELECT ISNULL(SUM(total), 0) FROM @users WHERE role = 'cliente') as total_clientes,
+        (SELECT ISNULL(SUM(total), 0) FROM @tickets) as total_tickets,
+        (SELECT ISNULL(SUM(total), 0) FROM @tickets WHERE status = 'abierto') as tickets_abiertos,
+        (SELECT ISNULL(SUM(total), 0) FROM @tickets WHERE status = 'en_proceso') as tickets_en_proceso,
+        (SELECT ISNULL(SUM(total), 0) FROM @tickets WHERE status = 'resuelto') as tickets_resueltos,
+        (SELECT ISNULL(SUM(total), 0) FROM @tickets WHERE status = 'cerrado') as tickets_cerrados,
+        (SELECT ISNULL(SUM(total), 0) FROM @tickets WHERE priority = 'urgente') as tickets_urgentes,
         (SELECT COUNT(*) FROM Comments) as total_comments,
         (SELECT COUNT(*) FROM Attachments) as total_attachments;
 END;